@@ -0,0 +1,320 @@
+"""End-to-end csync benchmarks with stored baselines.
+
+Run from the csync directory:
+
+    uv run python benchmarks/run_benchmarks.py                # compare
+    uv run python benchmarks/run_benchmarks.py --update       # re-baseline
+
+A scenario regresses when its best time exceeds the baseline by more than
+``--tolerance`` (relative) plus ``--slack`` (absolute seconds). Bootstrap
+scenarios also record the objects and bytes each clone mode downloads, and
+regress when the bytes grow by more than ``--tolerance``.
+"""
+
+import json
+import shutil
+import sys
+import time
+from pathlib import Path
+
+import click
+import git
+from rich.console import Console
+from rich.table import Table
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from workspace import BenchWorkspace  # noqa: E402
+
+from csync.backup import BackupManager  # noqa: E402
+from csync.marked import MarkedFilesManager  # noqa: E402
+from csync.session import SyncSession  # noqa: E402
+from csync.status import StatusDisplay  # noqa: E402
+from csync.sync import Syncer  # noqa: E402
+
+console = Console()
+
+BASELINES_FILE = Path(__file__).resolve().parent / "baselines.json"
+# Baselines entry holding objects/bytes fetched by the bootstrap scenarios
+TRANSFER_KEY = "transfer"
+
+# name: (tracked files N, marked files M, backups K)
+SIZES = {
+    "small": (100, 10, 5),
+    "medium": (1000, 50, 10),
+    "large": (5000, 200, 20),
+}
+
+
+def _quiet_csync():
+    """Silence the rich consoles of every csync module."""
+    for name, module in list(sys.modules.items()):
+        if name.startswith("csync.") and hasattr(module, "console"):
+            if module.console is not console:
+                module.console.quiet = True
+
+
+def _best_of(repeat, setup, action):
+    best = None
+    for i in range(repeat):
+        if setup:
+            setup(i)
+        start = time.perf_counter()
+        action()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_sync_noop(ws, repeat):
+    config = ws.config()
+    Syncer(config).sync(background=True)
+    return _best_of(repeat, None, lambda: Syncer(config).sync(background=True))
+
+
+def bench_sync_changes(ws, repeat):
+    config = ws.config()
+    changed = max(1, ws.files // 100)
+    return _best_of(
+        repeat,
+        lambda i: ws.touch_files(changed, f"run{i}"),
+        lambda: Syncer(config, session=SyncSession(config, ttl=0)).sync(
+            background=True
+        ),
+    )
+
+
+def bench_status(ws, repeat):
+    config = ws.config()
+    return _best_of(repeat, None, lambda: StatusDisplay(config).show_status())
+
+
+def bench_backup_create(ws, repeat):
+    config = ws.config()
+    changed = max(1, ws.files // 100)
+    return _best_of(
+        repeat,
+        lambda i: ws.touch_files(changed, f"run{i}"),
+        lambda: BackupManager(config).create_backup(),
+    )
+
+
+def bench_backup_create_tar(ws, repeat):
+    config = ws.config()
+    config.backup_format = "tar"
+    changed = max(1, ws.files // 100)
+    return _best_of(
+        repeat,
+        lambda i: ws.touch_files(changed, f"tar{i}"),
+        lambda: BackupManager(config).create_backup(),
+    )
+
+
+def bench_backup_unchanged(ws, repeat):
+    config = ws.config()
+    BackupManager(config).create_backup()
+    return _best_of(repeat, None, lambda: BackupManager(config).create_backup())
+
+
+def bench_backup_restore(ws, repeat):
+    config = ws.config()
+    manager = BackupManager(config)
+    manager.create_backup()
+    latest = manager.backups()[-1].name
+    return _best_of(repeat, None, lambda: manager.restore_backup(latest))
+
+
+def bench_mark(ws, repeat):
+    config = ws.config()
+    paths = []
+    return _best_of(
+        repeat,
+        lambda i: paths.append(ws.new_home_file(f"mark{i}")),
+        lambda: MarkedFilesManager(config).mark_file(str(paths[-1])),
+    )
+
+
+def bench_bootstrap(ws, repeat, mode):
+    config = ws.config()
+    config.clone_mode = mode
+    target = ws.root / f"bootstrap-{mode}"
+
+    def setup(_):
+        shutil.rmtree(target, ignore_errors=True)
+        config.configs_dir = target
+
+    seconds = _best_of(repeat, setup, lambda: Syncer(config))
+    return seconds, _transferred(target)
+
+
+def _transferred(repo_dir):
+    """Objects and bytes a fresh clone holds, i.e. what it downloaded.
+
+    Includes the blobs a blobless checkout fetches lazily, since they land
+    in the same object store.
+    """
+    counts = dict(
+        line.split(": ")
+        for line in git.Repo(repo_dir).git.count_objects("-v").splitlines()
+    )
+    return {
+        "objects": int(counts["count"]) + int(counts["in-pack"]),
+        "bytes": (int(counts["size"]) + int(counts["size-pack"])) * 1024,
+    }
+
+
+SCENARIOS = {
+    "sync-noop": bench_sync_noop,
+    "sync-changes": bench_sync_changes,
+    "status": bench_status,
+    "backup-create": bench_backup_create,
+    "backup-create-tar": bench_backup_create_tar,
+    "backup-unchanged": bench_backup_unchanged,
+    "backup-restore": bench_backup_restore,
+    "mark": bench_mark,
+    "bootstrap-full": lambda ws, repeat: bench_bootstrap(ws, repeat, "full"),
+    "bootstrap-blobless": lambda ws, repeat: bench_bootstrap(ws, repeat, "blobless"),
+}
+
+
+def _add_history(ws, revisions=5):
+    """Give the remote some history so clone modes differ in bytes."""
+    repo = git.Repo(ws.configs_dir)
+    for revision in range(revisions):
+        ws.touch_files(ws.files, f"history{revision}")
+        repo.git.add("--all", ".")
+        repo.index.commit(f"History {revision}")
+    repo.git.push("origin", "main")
+
+
+def _transfer_note(transfer, before):
+    note = f"{transfer['objects']} objects, {transfer['bytes'] / 1024:.0f} KiB"
+    if before and before["bytes"]:
+        note += f" ({transfer['bytes'] / before['bytes'] - 1:+.0%} bytes)"
+    return note
+
+
+def _compare_clone_modes(results):
+    """Print what a blobless bootstrap saves over a full one, per size."""
+    for key, (seconds, transfer) in results.items():
+        if not key.startswith("bootstrap-blobless/"):
+            continue
+        full = results.get(key.replace("blobless", "full", 1))
+        if not full or not transfer or not full[1]:
+            continue
+        size = key.split("/", 1)[1]
+        saved = 1 - transfer["bytes"] / full[1]["bytes"] if full[1]["bytes"] else 0
+        console.print(
+            f"[cyan]{size}: blobless fetches {transfer['objects']} objects / "
+            f"{transfer['bytes'] / 1024:.0f} KiB vs full "
+            f"{full[1]['objects']} / {full[1]['bytes'] / 1024:.0f} KiB "
+            f"({saved:.0%} fewer bytes) in {seconds / full[0]:.1f}x the time[/cyan]"
+        )
+
+
+def run(sizes, scenarios, repeat):
+    results = {}
+    for size in sizes:
+        files, marked, backups = SIZES[size]
+        for scenario in scenarios:
+            _quiet_csync()
+            with BenchWorkspace(files, marked, backups) as ws:
+                if scenario.startswith("bootstrap"):
+                    _add_history(ws)
+                outcome = SCENARIOS[scenario](ws, repeat)
+            extra = None
+            if isinstance(outcome, tuple):
+                outcome, extra = outcome
+            results[f"{scenario}/{size}"] = (outcome, extra)
+    return results
+
+
+@click.command()
+@click.option(
+    "--size",
+    "sizes",
+    multiple=True,
+    type=click.Choice(list(SIZES)),
+    help="Workspace sizes to run (default: small, medium)",
+)
+@click.option(
+    "--scenario",
+    "scenarios",
+    multiple=True,
+    type=click.Choice(list(SCENARIOS)),
+    help="Scenarios to run (default: all)",
+)
+@click.option("--repeat", default=3, show_default=True, help="Runs per scenario")
+@click.option("--update", is_flag=True, help="Store results as the new baselines")
+@click.option(
+    "--baselines",
+    type=click.Path(path_type=Path),
+    default=BASELINES_FILE,
+    show_default=True,
+)
+@click.option("--tolerance", default=0.5, show_default=True, help="Allowed slowdown")
+@click.option("--slack", default=0.02, show_default=True, help="Absolute seconds")
+def main(sizes, scenarios, repeat, update, baselines, tolerance, slack):
+    """⏱️ Benchmark sync, status, backup and mark on synthetic repos."""
+    sizes = sizes or ("small", "medium")
+    scenarios = scenarios or tuple(SCENARIOS)
+    results = run(sizes, scenarios, repeat)
+
+    stored = json.loads(baselines.read_text()) if baselines.exists() else {}
+
+    table = Table(title="csync benchmarks", show_header=True)
+    table.add_column("Scenario", style="cyan")
+    table.add_column("Best", style="yellow", justify="right")
+    table.add_column("Baseline", justify="right")
+    table.add_column("Change", justify="right")
+    table.add_column("Notes", style="white")
+
+    stored_transfer = stored.get(TRANSFER_KEY, {})
+    regressions = []
+    for key, (seconds, transfer) in results.items():
+        baseline = stored.get(key)
+        notes = ""
+        if transfer is not None:
+            before = stored_transfer.get(key)
+            notes = _transfer_note(transfer, before)
+            if before and transfer["bytes"] > before["bytes"] * (1 + tolerance):
+                regressions.append(f"{key} (bytes)")
+        if baseline is None:
+            change = "[dim]new[/dim]"
+        else:
+            ratio = seconds / baseline - 1 if baseline else 0.0
+            limit = baseline * (1 + tolerance) + slack
+            style = "red" if seconds > limit else "green"
+            change = f"[{style}]{ratio:+.0%}[/{style}]"
+            if seconds > limit:
+                regressions.append(key)
+        table.add_row(
+            key,
+            f"{seconds * 1000:.1f} ms",
+            f"{baseline * 1000:.1f} ms" if baseline is not None else "-",
+            change,
+            notes,
+        )
+    console.print(table)
+    _compare_clone_modes(results)
+
+    if update:
+        stored.update({key: round(seconds, 6) for key, (seconds, _) in results.items()})
+        stored_transfer.update(
+            {key: transfer for key, (_, transfer) in results.items() if transfer}
+        )
+        if stored_transfer:
+            stored[TRANSFER_KEY] = stored_transfer
+        baselines.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n")
+        console.print(f"[green]✅ Baselines written to {baselines}[/green]")
+        return
+
+    if regressions:
+        console.print(f"[red]❌ Regressions: {', '.join(regressions)}[/red]")
+        sys.exit(1)
+    console.print("[green]✅ No regressions[/green]")
+
+
+if __name__ == "__main__":
+    main()
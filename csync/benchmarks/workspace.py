@@ -0,0 +1,119 @@
+"""Synthetic configs repositories for benchmarking csync."""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import git
+
+from csync.config import Config
+
+
+class BenchWorkspace:
+    """A configs clone, its bare remote and a fake $HOME, sized on demand.
+
+    ``files`` tracked files are spread over nested directories, ``marked``
+    files/directories under $HOME are marked for sync, and ``backups``
+    existing backups are left in ``.sync/backups``.
+    """
+
+    def __init__(self, files: int, marked: int, backups: int):
+        self.files = files
+        self.marked = marked
+        self.backups = backups
+        self.root = Path(tempfile.mkdtemp(prefix="csync-bench-"))
+        self.home = self.root / "home"
+        self.remote_dir = self.root / "remote.git"
+        self.configs_dir = self.home / "configs"
+        self._saved_env = {}
+
+    def __enter__(self):
+        self._saved_env = {key: os.environ.get(key) for key in ("HOME", "USER")}
+        self.home.mkdir(parents=True)
+        os.environ["HOME"] = str(self.home)
+        os.environ.setdefault("USER", "bench")
+        self._build()
+        return self
+
+    def __exit__(self, *exc):
+        for key, value in self._saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def config(self) -> Config:
+        config = Config(configs_dir=self.configs_dir, branch="main", name="bench")
+        config.remote_url = f"file://{self.remote_dir}"
+        return config
+
+    def tracked_paths(self):
+        return [
+            self.configs_dir / f"dir{i % 20}" / f"sub{i % 7}" / f"file{i}.conf"
+            for i in range(self.files)
+        ]
+
+    def _build(self):
+        bare = git.Repo.init(self.remote_dir, bare=True, initial_branch="main")
+        bare.git.config("uploadpack.allowFilter", "true")
+
+        repo = git.Repo.init(self.configs_dir, initial_branch="main")
+        with repo.config_writer() as writer:
+            writer.set_value("user", "name", "bench")
+            writer.set_value("user", "email", "bench@example.com")
+        (self.configs_dir / ".gitignore").write_text(".sync/\n*.local\n")
+        (self.configs_dir / "zshrc").write_text("# zshrc\n")
+        for i, path in enumerate(self.tracked_paths()):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(f"setting_{i} = {i}\n" * 20)
+        repo.git.add("--all", ".")
+        repo.index.commit("Synthetic configs")
+        repo.create_remote("origin", str(self.remote_dir))
+        repo.git.push("-u", "origin", "main")
+
+        self._mark_files()
+        self._make_backups()
+
+    def _mark_files(self):
+        from csync.marked import MarkedFilesManager
+
+        manager = MarkedFilesManager(self.config())
+        for i in range(self.marked):
+            if i % 5 == 0:
+                target = self.home / ".config" / f"app{i}"
+                target.mkdir(parents=True)
+                for j in range(5):
+                    (target / f"conf{j}").write_text(f"app{i} = {j}\n")
+            else:
+                target = self.home / f".rc{i}"
+                target.write_text(f"rc {i}\n")
+            manager.mark_file(str(target))
+        repo = git.Repo(self.configs_dir)
+        repo.git.push("origin", "main")
+
+    def _make_backups(self):
+        from csync.backup import BackupManager
+
+        config = self.config()
+        if not self.backups:
+            return
+        manager = BackupManager(config)
+        manager.create_backup()
+        (first,) = manager.backups()
+        # Backups share a one-second name resolution, so clone the first one
+        suffix = first.name.split(".", 1)[1]
+        for i in range(1, self.backups):
+            copy = config.backup_dir / f"backup-20000101-{i:06d}.{suffix}"
+            shutil.copy2(first.path, copy)
+
+    def touch_files(self, count: int, tag: str):
+        """Modify ``count`` tracked files so the next sync has work to do."""
+        for path in self.tracked_paths()[:count]:
+            path.write_text(f"changed {tag}\n")
+
+    def new_home_file(self, tag: str) -> Path:
+        path = self.home / f".bench-{tag}"
+        path.write_text(f"{tag}\n")
+        return path
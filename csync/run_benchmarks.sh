@@ -0,0 +1,18 @@
+#!/bin/bash
+# Script to run csync benchmarks against the stored baselines
+
+set -e  # Exit on error
+
+echo "⏱️  Running csync benchmarks..."
+echo "================================================"
+
+# Ensure we're in the csync directory
+cd "$(dirname "$0")"
+
+# Install dependencies if needed
+echo "📦 Installing dependencies..."
+uv sync --dev
+
+# Extra arguments are passed through, e.g. --size large or --update
+echo ""
+uv run python benchmarks/run_benchmarks.py "$@"
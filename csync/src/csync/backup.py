@@ -1,123 +1,561 @@
 """Backup and restore functionality."""
 
+import difflib
+import json
+import os
 import tarfile
+from collections import Counter
 from datetime import datetime
+from datetime import timedelta
 from pathlib import Path
 
 from rich.console import Console
 from rich.prompt import Prompt
+from rich.syntax import Syntax
 from rich.table import Table
 
+from csync.backup_catalog import BackupCatalog
+from csync.backup_diff import ADDED
+from csync.backup_diff import MODIFIED
+from csync.backup_diff import REMOVED
+from csync.backup_diff import diff_tree
+from csync.backup_git import GitBackups
+from csync.backup_index import BackupIndex
+from csync.backup_index import IndexedTarWriter
+from csync.backup_index import index_path
+from csync.backup_index import iter_tar_digests
+from csync.backup_index import iter_tar_entries
+from csync.backup_index import write_entry
+from csync.backup_store import MANIFEST_SUFFIX
+from csync.backup_store import BackupStore
+from csync.backup_store import tree_fingerprint
+from csync.compression import Compressor
 from csync.config import Config
+from csync.retention import RetentionPolicy
+from csync.walker import BackupWalker
 
 console = Console()
 
+BACKUP_FORMATS = ("store", "tar", "git")
+
+
+class Backup:
+    """One restore point: a tarball, a store manifest or a git ref."""
+
+    def __init__(
+        self,
+        name: str,
+        kind: str,
+        path: Path = None,
+        size: int = 0,
+        files: int = None,
+        fingerprint: str = None,
+    ):
+        self.name = name
+        self.kind = kind
+        self.path = path
+        # Bytes in .sync/backups the backup needs, counting store objects
+        # it shares with other backups (git backups: 0)
+        self.size = size
+        self.files = files
+        # Tree fingerprint at backup time, None if unknown
+        self.fingerprint = fingerprint
+
+    @property
+    def stamp(self) -> str:
+        return self.name[len("backup-") :].split(".", 1)[0]
+
+    @property
+    def created(self) -> datetime:
+        return datetime.strptime(self.stamp, "%Y%m%d-%H%M%S")
+
+
+def _text_diff(name: str, current: bytes, restored: bytes):
+    """Unified diff from the live file to the backed up one, if both are text."""
+    try:
+        before = current.decode().splitlines(keepends=True)
+        after = restored.decode().splitlines(keepends=True)
+    except UnicodeDecodeError:
+        return None
+    return "".join(
+        difflib.unified_diff(before, after, f"current/{name}", f"backup/{name}")
+    )
+
 
 class BackupManager:
-    """Manages backup and restore operations."""
+    """Manages backup and restore operations.
+
+    New backups use ``config.backup_format``: ``store`` writes a manifest
+    into the deduplicating store, ``tar`` a complete ``tar.gz`` and ``git``
+    a commit on a private ``refs/csync/backups/`` ref. Restore and listing
+    handle all of them, so older tarballs stay usable.
+    """
 
     def __init__(self, config: Config):
         self.config = config
+        self.store = BackupStore(config)
+        self.git_backups = GitBackups(config)
+        self.catalog = BackupCatalog(config)
+
+    def scan(self):
+        """Every backup found on disk and in the backup refs, oldest first."""
+        backup_dir = self.config.backup_dir
+        found = [
+            Backup(path.name, "tar", path)
+            for path in backup_dir.glob("backup-*.tar.gz")
+        ]
+        found += [
+            Backup(path.name, "store", path)
+            for path in backup_dir.glob(f"backup-*{MANIFEST_SUFFIX}")
+        ]
+        found += [Backup(f"backup-{stamp}", "git") for stamp in self.git_backups.list()]
+        return sorted(found, key=lambda backup: (backup.stamp, backup.name))
+
+    def backups(self):
+        """Every backup according to the catalog, oldest first.
 
-    def create_backup(self):
-        """Create a backup of current configuration."""
-        backup_name = f"backup-{datetime.now():%Y%m%d-%H%M%S}.tar.gz"
+        Nothing is globbed or stat'ed; the first call on a machine without
+        a catalog builds it from disk.
+        """
+        if not self.catalog.exists() and self.scan():
+            self.repair(quiet=True)
+        return [
+            Backup(
+                entry["name"],
+                entry["kind"],
+                self._backup_named(entry["name"]).path,
+                entry["size"],
+                entry.get("files"),
+                entry.get("fingerprint"),
+            )
+            for entry in self.catalog.entries()
+        ]
+
+    @property
+    def legacy_fingerprints_file(self) -> Path:
+        """Where fingerprints were kept before they moved into the catalog."""
+        return self.config.backup_dir / "fingerprints.json"
+
+    def unchanged_since(self, fingerprint: str):
+        """Name of the newest backup if the tree still matches it, else None."""
+        backups = self.backups()
+        if backups and backups[-1].fingerprint == fingerprint:
+            return backups[-1].name
+        return None
+
+    def _new_stamp(self) -> str:
+        """Timestamp for a new backup, later than every existing one.
+
+        Names have one-second resolution; a restore point taken right after
+        a backup must not overwrite the backup being restored, nor reuse
+        the stamp of a pruned one and sort before the backups after it.
+        """
+        backups = self.backups()
+        moment = datetime.now().replace(microsecond=0)
+        if backups and backups[-1].created >= moment:
+            moment = backups[-1].created + timedelta(seconds=1)
+        return f"{moment:%Y%m%d-%H%M%S}"
+
+    def create_backup(self, force: bool = False, report: bool = False, keep=()):
+        """Create a backup of current configuration.
+
+        Nothing is written when the tree fingerprint matches the newest
+        backup, so repeated syncs don't push real history out of retention.
+        With ``report``, list what the ignore rules left out afterwards.
+        Backups named in ``keep`` are spared by the pruning that follows.
+        """
         self.config.backup_dir.mkdir(parents=True, exist_ok=True)
-        backup_path = self.config.backup_dir / backup_name
+        # Build the catalog from disk before it gains the new backup
+        self.backups()
 
-        console.print(f"[blue]📦 Creating backup: {backup_name}[/blue]")
+        walker = BackupWalker(self.config.configs_dir)
+        entries = list(walker.walk())
+        if report:
+            walker.report()
 
-        with tarfile.open(backup_path, "w:gz") as tar:
-            for item in self.config.configs_dir.iterdir():
-                if item.name not in [".git", ".sync", "node_modules", ".DS_Store"]:
-                    if not item.name.endswith(".local"):
-                        tar.add(item, arcname=item.name)
+        fingerprint = tree_fingerprint(self.config.configs_dir, entries)
+        previous = None if force else self.unchanged_since(fingerprint)
+        if previous:
+            console.print(f"[green]✅ Nothing changed since {previous}[/green]")
+            return True
 
-        # Keep only last 10 backups
-        backups = sorted(self.config.backup_dir.glob("backup-*.tar.gz"))
-        for old_backup in backups[:-10]:
-            old_backup.unlink()
+        stamp = f"backup-{self._new_stamp()}"
+        backup_format = self.config.backup_format
+        if backup_format == "git" and not self.git_backups.available():
+            console.print("[yellow]⚠️  Not a git repository, using the store[/yellow]")
+            backup_format = "store"
+
+        if backup_format == "git":
+            backup_name = stamp
+            console.print(f"[blue]📦 Creating backup: {backup_name} (git)[/blue]")
+            self.git_backups.create(stamp[len("backup-") :])
+        elif backup_format == "store":
+            backup_name = f"{stamp}{MANIFEST_SUFFIX}"
+            console.print(f"[blue]📦 Creating backup: {backup_name}[/blue]")
+            manifest = self.store.load(self.store.create(backup_name, entries))
+            console.print(
+                f"[cyan]   {len(manifest['files'])} files, "
+                f"{manifest['stored'] / 1024:.1f} KB new data[/cyan]"
+            )
+        else:
+            backup_name = f"{stamp}.tar.gz"
+            console.print(f"[blue]📦 Creating backup: {backup_name}[/blue]")
+            writer = IndexedTarWriter(
+                self.config.backup_dir / backup_name,
+                Compressor.from_config(self.config),
+            )
+            writer.write(self.config.configs_dir, [rel for rel, _ in entries])
+
+        self.catalog.add(
+            self._catalog_entry(
+                self._backup_named(backup_name), len(entries), fingerprint
+            )
+        )
+        self.prune(keep=keep)
 
         console.print(f"[green]✅ Backup created: {backup_name}[/green]")
         return True
 
-    def restore_backup(self, backup_file: str = None):
-        """Restore from a backup."""
-        if not backup_file:
-            # Show available backups
-            backups = sorted(
-                self.config.backup_dir.glob("backup-*.tar.gz"), reverse=True
-            )
+    def _backup_named(self, name: str) -> Backup:
+        if name.endswith(MANIFEST_SUFFIX):
+            return Backup(name, "store", self.config.backup_dir / name)
+        if name.endswith(".tar.gz"):
+            return Backup(name, "tar", self.config.backup_dir / name)
+        return Backup(name, "git")
 
-            if not backups:
-                console.print("[yellow]No backups found[/yellow]")
-                return False
+    def _count_files(self, backup: Backup) -> int:
+        if backup.kind == "git":
+            return self.git_backups.count(backup.stamp)
+        if backup.kind == "store":
+            return len(self.store.load(backup.path)["files"])
+        index = BackupIndex.load(backup.path)
+        if index is not None:
+            return len(index.members)
+        with tarfile.open(backup.path, "r:gz") as tar:
+            return sum(1 for _ in tar)
 
-            table = Table(title="Available Backups", show_header=True)
-            table.add_column("#", style="cyan", width=3)
-            table.add_column("Backup File", style="white")
-            table.add_column("Size", style="green", width=10)
-            table.add_column("Modified", style="yellow")
+    def _catalog_entry(self, backup: Backup, files: int = None, fingerprint=None):
+        """Catalog record for a backup that was just written or found.
 
-            for idx, backup in enumerate(backups[:10], 1):
-                size = f"{backup.stat().st_size / 1024 / 1024:.1f} MB"
-                modified = datetime.fromtimestamp(backup.stat().st_mtime).strftime(
-                    "%Y-%m-%d %H:%M"
-                )
-                table.add_row(str(idx), backup.name, size, modified)
+        ``files`` is counted from the backup itself when not given.
+        """
+        size = 0
+        if backup.kind == "tar":
+            size = backup.path.stat().st_size
+            if index_path(backup.path).exists():
+                size += index_path(backup.path).stat().st_size
+        elif backup.kind == "store":
+            # The manifest plus every object it needs, even those it shares
+            manifest = self.store.load(backup.path)
+            size = backup.path.stat().st_size + self.store.referenced_size(manifest)
+        return {
+            "name": backup.name,
+            "kind": backup.kind,
+            "created": backup.created.isoformat(),
+            "size": size,
+            "files": self._count_files(backup) if files is None else files,
+            "fingerprint": fingerprint,
+        }
 
-            console.print(table)
+    def repair(self, quiet: bool = False):
+        """Rebuild the catalog from what is actually on disk.
 
-            choice = Prompt.ask("Select backup number to restore", default="1")
+        Fingerprints survive for backups the catalog already knew about
+        (and are picked up from an old ``fingerprints.json``); backups
+        found only on disk get none, so the next backup is never skipped
+        because of them.
+        """
+        known = {}
+        legacy = self.legacy_fingerprints_file
+        if legacy.exists():
             try:
-                backup_idx = int(choice) - 1
-                if 0 <= backup_idx < len(backups):
-                    backup_path = backups[backup_idx]
-                else:
-                    console.print("[red]Invalid selection[/red]")
-                    return False
+                known.update(json.loads(legacy.read_text()))
             except ValueError:
-                console.print("[red]Invalid selection[/red]")
+                pass
+        if self.catalog.exists():
+            known.update(
+                (entry["name"], entry.get("fingerprint"))
+                for entry in self.catalog.entries()
+            )
+            before = {entry["name"] for entry in self.catalog.entries()}
+        else:
+            before = set()
+
+        found = self.scan()
+        self.catalog.rewrite(
+            [
+                self._catalog_entry(backup, fingerprint=known.get(backup.name))
+                for backup in found
+            ]
+        )
+        legacy.unlink(missing_ok=True)
+
+        if not quiet:
+            names = {backup.name for backup in found}
+            console.print(
+                f"[green]✅ Catalog rebuilt: {len(found)} backups "
+                f"({len(names - before)} added, {len(before - names)} dropped)[/green]"
+            )
+        return found
+
+    def prune(self, policy: RetentionPolicy = None, keep=()):
+        """Apply the retention policy and drop data no backup refers to.
+
+        Decisions come from the catalog, so pruning never scans the
+        backup directory. Backups named in ``keep`` are never removed.
+        """
+        policy = policy or RetentionPolicy.from_config(self.config)
+        cache = {}
+        _, removed = policy.select(
+            self.backups(), measure=lambda kept: self._footprint(kept, cache)
+        )
+        removed = [backup for backup in removed if backup.name not in keep]
+        for old_backup in removed:
+            self._remove(old_backup)
+            self.catalog.remove(old_backup.name)
+        if any(backup.kind == "store" for backup in removed):
+            self.store.collect_garbage()
+
+    def _footprint(self, backups, cache) -> int:
+        """Bytes ``backups`` occupy together in ``.sync/backups``.
+
+        Store objects shared between manifests are counted once, which is
+        what pruning the other backups would leave on disk. ``cache`` keeps
+        each manifest's object sizes across calls.
+        """
+        total = 0
+        objects = {}
+        for backup in backups:
+            if backup.kind != "store":
+                total += backup.size
+                continue
+            if backup.name not in cache:
+                cache[backup.name] = (
+                    backup.path.stat().st_size,
+                    self.store.object_sizes(self.store.load(backup.path)),
+                )
+            manifest_size, sizes = cache[backup.name]
+            total += manifest_size
+            objects.update(sizes)
+        return total + sum(objects.values())
+
+    def _remove(self, backup: Backup):
+        if backup.kind == "git":
+            self.git_backups.remove(backup.stamp)
+        else:
+            backup.path.unlink(missing_ok=True)
+            index_path(backup.path).unlink(missing_ok=True)
+
+    @staticmethod
+    def _format_size(backup: Backup) -> str:
+        if backup.kind == "git":
+            return "-"
+        return f"{backup.size / 1024 / 1024:.1f} MB"
+
+    def _choose_backup(self):
+        """Let the user pick one of the ten newest backups."""
+        backups = self.backups()[::-1]
+
+        if not backups:
+            console.print("[yellow]No backups found[/yellow]")
+            return None
+
+        table = Table(title="Available Backups", show_header=True)
+        table.add_column("#", style="cyan", width=3)
+        table.add_column("Backup File", style="white")
+        table.add_column("Size", style="green", width=10)
+        table.add_column("Modified", style="yellow")
+
+        for idx, backup in enumerate(backups[:10], 1):
+            modified = backup.created.strftime("%Y-%m-%d %H:%M")
+            table.add_row(str(idx), backup.name, self._format_size(backup), modified)
+
+        console.print(table)
+
+        choice = Prompt.ask("Select backup number to restore", default="1")
+        try:
+            backup_idx = int(choice) - 1
+            if 0 <= backup_idx < len(backups):
+                return backups[backup_idx]
+        except ValueError:
+            pass
+        console.print("[red]Invalid selection[/red]")
+        return None
+
+    def iter_entries(self, backup: Backup, patterns=None):
+        """Yield ``(path, data, mode, link)`` for the backup's matching entries.
+
+        ``link`` is the target for symlinks (``data`` is then None).
+        """
+        if backup.kind == "git":
+            yield from self.git_backups.iter_entries(backup.stamp, patterns)
+        elif backup.kind == "store":
+            yield from self.store.iter_entries(backup.path, patterns)
+        else:
+            for info, data in iter_tar_entries(backup.path, patterns):
+                link = info.linkname if info.issym() else None
+                yield info.name, data, info.mode, link
+
+    def restore_backup(self, backup_file: str = None, paths=None, diff=False):
+        """Restore from a backup.
+
+        ``paths`` limits the restore to entries matching these globs (a
+        directory matches everything under it). With ``diff`` nothing is
+        written; the changes the restore would make are shown instead.
+        """
+        if not backup_file:
+            backup = self._choose_backup()
+            if backup is None:
                 return False
         else:
-            backup_path = self.config.backup_dir / backup_file
-            if not backup_path.exists():
-                # Try with full name
-                backup_path = self.config.backup_dir / f"backup-{backup_file}.tar.gz"
-                if not backup_path.exists():
-                    console.print(f"[red]❌ Backup file not found: {backup_file}[/red]")
-                    return False
+            backup = self._find_backup(backup_file)
+            if backup is None:
+                console.print(f"[red]❌ Backup file not found: {backup_file}[/red]")
+                return False
+
+        if diff:
+            return self.preview_restore(backup, paths)
 
-        console.print(f"[yellow]🔄 Restoring from {backup_path.name}...[/yellow]")
+        console.print(f"[yellow]🔄 Restoring from {backup.name}...[/yellow]")
 
-        # Create a restore point first
-        self.create_backup()
+        # Create a restore point first, without pruning what we restore from
+        self.create_backup(keep=[backup.name])
+
+        if paths:
+            restored = 0
+            for name, data, mode, link in self.iter_entries(backup, paths):
+                write_entry(self.config.configs_dir, name, data, mode, link)
+                restored += 1
+            if not restored:
+                console.print("[yellow]No backed up files match those paths[/yellow]")
+                return False
+            console.print(f"[green]✅ Restored {restored} files[/green]")
+            return True
 
         # Extract backup
-        with tarfile.open(backup_path, "r:gz") as tar:
-            tar.extractall(self.config.configs_dir)
+        if backup.kind == "git":
+            self.git_backups.restore(backup.stamp)
+        elif backup.kind == "store":
+            self.store.restore(backup.path)
+        else:
+            with tarfile.open(backup.path, "r:gz") as tar:
+                tar.extractall(self.config.configs_dir)
 
         console.print("[green]✅ Restored from backup successfully[/green]")
         return True
 
+    def preview_restore(self, backup: Backup, paths=None):
+        """Show which files restoring ``backup`` would create or overwrite."""
+        table = Table(title=f"Restore preview: {backup.name}", show_header=True)
+        table.add_column("File", style="cyan")
+        table.add_column("Change", style="yellow")
+        diffs = []
+
+        for name, data, _, link in self.iter_entries(backup, paths):
+            current = self.config.configs_dir / name
+            if link is not None:
+                if current.is_symlink() and os.readlink(current) == link:
+                    continue
+                table.add_row(name, f"symlink → {link}")
+            elif not current.exists() and not current.is_symlink():
+                table.add_row(name, "[green]create[/green]")
+            elif current.is_symlink() or not current.is_file():
+                table.add_row(name, "[red]replace[/red]")
+            else:
+                existing = current.read_bytes()
+                if existing == data:
+                    continue
+                table.add_row(name, "[yellow]overwrite[/yellow]")
+                diffs.append(_text_diff(name, existing, data))
+
+        if not table.rows:
+            console.print("[green]✅ Restore would not change anything[/green]")
+            return True
+
+        console.print(table)
+        for text in filter(None, diffs):
+            console.print(Syntax(text, "diff", theme="ansi_dark"))
+        return True
+
+    def iter_digests(self, backup: Backup):
+        """Stream ``(path, size, link, digest)`` for every file in a backup."""
+        if backup.kind == "git":
+            return self.git_backups.iter_digests(backup.stamp)
+        if backup.kind == "store":
+            return self.store.iter_digests(backup.path)
+        return iter_tar_digests(backup.path)
+
+    def diff_backup(self, backup_file: str):
+        """Show what changed in the live tree since a backup.
+
+        Nothing is extracted: the backup is streamed once and compared by
+        size and hash against ``configs_dir``.
+        """
+        backup = self._find_backup(backup_file)
+        if backup is None:
+            console.print(f"[red]❌ Backup file not found: {backup_file}[/red]")
+            return None
+
+        changes = diff_tree(
+            self.config.configs_dir,
+            BackupWalker(self.config.configs_dir).walk(),
+            self.iter_digests(backup),
+            "git" if backup.kind == "git" else "sha256",
+        )
+        if not changes:
+            console.print(f"[green]✅ No changes since {backup.name}[/green]")
+            return changes
+
+        table = Table(title=f"Changes since {backup.name}", show_header=True)
+        table.add_column("File", style="cyan")
+        table.add_column("Change", style="yellow")
+        table.add_column("Detail", style="white")
+        styles = {ADDED: "green", REMOVED: "red", MODIFIED: "yellow"}
+        for entry in changes:
+            style = styles[entry.change]
+            table.add_row(
+                entry.path, f"[{style}]{entry.change}[/{style}]", entry.detail
+            )
+        console.print(table)
+
+        counts = Counter(entry.change for entry in changes)
+        console.print(
+            f"[cyan]{counts[ADDED]} added, {counts[REMOVED]} removed, "
+            f"{counts[MODIFIED]} modified[/cyan]"
+        )
+        return changes
+
+    def _find_backup(self, backup_file: str):
+        """Resolve a backup name or bare timestamp, newest match first."""
+        backups = self.backups()[::-1]
+        for backup in backups:
+            if backup.name == backup_file:
+                return backup
+        for backup in backups:
+            if backup_file in (backup.stamp, f"backup-{backup.stamp}"):
+                return backup
+        return None
+
     def list_backups(self):
         """List available backups."""
-        backups = sorted(self.config.backup_dir.glob("backup-*.tar.gz"), reverse=True)
+        backups = self.backups()[::-1]
 
         if not backups:
             console.print("[yellow]No backups found[/yellow]")
             return
 
         table = Table(title="Available Backups", show_header=True)
-        table.add_column("Backup File", style="cyan")
+        table.add_column("Backup", style="cyan")
+        table.add_column("Format", style="magenta")
+        table.add_column("Files", style="white", justify="right")
         table.add_column("Size", style="green", width=10)
         table.add_column("Created", style="yellow")
 
         for backup in backups:
-            size = f"{backup.stat().st_size / 1024 / 1024:.1f} MB"
-            created = datetime.fromtimestamp(backup.stat().st_mtime).strftime(
-                "%Y-%m-%d %H:%M:%S"
+            created = backup.created.strftime("%Y-%m-%d %H:%M:%S")
+            files = "?" if backup.files is None else str(backup.files)
+            table.add_row(
+                backup.name, backup.kind, files, self._format_size(backup), created
             )
-            table.add_row(backup.name, size, created)
 
         console.print(table)
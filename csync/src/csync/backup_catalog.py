@@ -0,0 +1,90 @@
+"""Append-only catalog of the backups in ``.sync/backups``.
+
+Every backup written or removed appends one JSON line to
+``catalog.jsonl``, so keeping track of backups never needs a directory
+glob or a ``stat`` per archive. The log is compacted once removals
+outnumber live entries.
+"""
+
+import json
+import os
+
+from csync.config import Config
+
+
+class BackupCatalog:
+    """Reads and appends to the backup catalog."""
+
+    def __init__(self, config: Config):
+        self.config = config
+        self.path = config.backup_dir / "catalog.jsonl"
+        self._entries = None
+        self._removed = 0
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def _load(self):
+        entries = {}
+        removed = 0
+        if self.path.exists():
+            for line in self.path.read_text().splitlines():
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn last line from an interrupted write
+                    continue
+                if record.get("op") == "remove":
+                    entries.pop(record["name"], None)
+                    removed += 1
+                else:
+                    entries[record["name"]] = record["entry"]
+        self._entries = entries
+        self._removed = removed
+
+    def entries(self):
+        """Live entries, oldest first."""
+        if self._entries is None:
+            self._load()
+        return sorted(self._entries.values(), key=lambda e: (e["created"], e["name"]))
+
+    def get(self, name: str):
+        if self._entries is None:
+            self._load()
+        return self._entries.get(name)
+
+    def _append(self, record):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a") as log:
+            log.write(json.dumps(record, sort_keys=True) + "\n")
+
+    def add(self, entry):
+        """Record a new backup; ``entry`` needs at least name, kind, created."""
+        if self._entries is None:
+            self._load()
+        self._append({"op": "add", "name": entry["name"], "entry": entry})
+        self._entries[entry["name"]] = entry
+
+    def remove(self, name: str):
+        if self._entries is None:
+            self._load()
+        self._append({"op": "remove", "name": name})
+        self._entries.pop(name, None)
+        self._removed += 1
+        if self._removed > max(len(self._entries), 16):
+            self.compact()
+
+    def rewrite(self, entries):
+        """Replace the whole log with ``entries``, atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f".{self.path.name}.tmp")
+        with open(tmp, "w") as log:
+            for entry in entries:
+                record = {"op": "add", "name": entry["name"], "entry": entry}
+                log.write(json.dumps(record, sort_keys=True) + "\n")
+        os.replace(tmp, self.path)
+        self._entries = {entry["name"]: entry for entry in entries}
+        self._removed = 0
+
+    def compact(self):
+        self.rewrite(self.entries())
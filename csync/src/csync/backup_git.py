@@ -0,0 +1,138 @@
+"""Backups stored as commits on private refs inside the configs repository.
+
+Each backup snapshots the working tree, including untracked files that are
+not ignored, through a throwaway index and points
+``refs/csync/backups/<timestamp>`` at the resulting commit. Sync only ever
+pushes ``branch:branch``, so these refs stay on the machine.
+"""
+
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+
+import git
+
+from csync.backup_index import matches
+from csync.config import Config
+
+REF_PREFIX = "refs/csync/backups/"
+
+SYMLINK_MODE = 0o120000
+
+# Backup commits are authored by csync, whatever the user's git identity
+IDENTITY = {
+    "GIT_AUTHOR_NAME": "csync",
+    "GIT_AUTHOR_EMAIL": "csync@localhost",
+    "GIT_COMMITTER_NAME": "csync",
+    "GIT_COMMITTER_EMAIL": "csync@localhost",
+}
+
+
+class GitBackups:
+    """Create, list, restore and drop backups kept as private git refs."""
+
+    def __init__(self, config: Config):
+        self.config = config
+        self._repo = None
+
+    @property
+    def repo(self):
+        if self._repo is None:
+            self._repo = git.Repo(self.config.configs_dir)
+        return self._repo
+
+    def available(self) -> bool:
+        try:
+            return self.repo is not None
+        except (git.InvalidGitRepositoryError, git.NoSuchPathError):
+            return False
+
+    def _temp_index(self) -> Path:
+        return Path(self.repo.git_dir) / "csync-backup-index"
+
+    def list(self):
+        """Timestamps of every backup ref, oldest first.
+
+        Refs are read straight from ``refs/`` and ``packed-refs``, so listing
+        backups (e.g. in ``csync status``) never spawns git.
+        """
+        if not self.available():
+            return []
+        refs = git.Reference.iter_items(self.repo, common_path=REF_PREFIX)
+        return sorted(ref.path[len(REF_PREFIX) :] for ref in refs)
+
+    def create(self, stamp: str = None) -> str:
+        """Snapshot the working tree and return the backup commit sha.
+
+        The temporary index starts as a copy of the real one, so git only
+        hashes files whose stat data changed since the last ``git add``.
+        """
+        stamp = stamp or f"{datetime.now():%Y%m%d-%H%M%S}"
+        index = self._temp_index()
+        real_index = Path(self.repo.git_dir) / "index"
+        if real_index.exists():
+            shutil.copyfile(real_index, index)
+        env = {"GIT_INDEX_FILE": str(index), **IDENTITY}
+        try:
+            self.repo.git.add("--all", ".", env=env)
+            tree = self.repo.git.write_tree(env=env)
+            commit = self.repo.git.commit_tree(
+                tree, "-m", f"csync backup {stamp}", env=env
+            )
+            self.repo.git.update_ref(f"{REF_PREFIX}{stamp}", commit)
+        finally:
+            index.unlink(missing_ok=True)
+        return commit
+
+    def restore(self, stamp: str, target: Path = None):
+        """Check the backup tree out over ``target`` without touching HEAD."""
+        index = self._temp_index()
+        env = {"GIT_INDEX_FILE": str(index)}
+        args = ["-a", "-f"]
+        if target is not None:
+            args.append(f"--prefix={os.path.join(target, '')}")
+        try:
+            self.repo.git.read_tree(f"{REF_PREFIX}{stamp}", env=env)
+            self.repo.git.checkout_index(*args, env=env)
+        finally:
+            index.unlink(missing_ok=True)
+
+    def iter_entries(self, stamp: str, patterns=None):
+        """Yield ``(path, data, mode, link)`` for matching files of a backup.
+
+        Blobs are read through GitPython's persistent ``cat-file`` process,
+        not one git process per file.
+        """
+        commit = self.repo.commit(f"{REF_PREFIX}{stamp}")
+        for item in commit.tree.traverse():
+            if item.type != "blob" or not matches(item.path, patterns):
+                continue
+            data = item.data_stream.read()
+            if item.mode == SYMLINK_MODE:
+                yield item.path, None, 0o777, data.decode()
+            else:
+                yield item.path, data, item.mode & 0o777, None
+
+    def iter_digests(self, stamp: str):
+        """Yield ``(path, size, link, digest)`` with git blob ids as digests.
+
+        Only the tree is walked; file contents are never read, except for
+        symlink targets.
+        """
+        commit = self.repo.commit(f"{REF_PREFIX}{stamp}")
+        for item in commit.tree.traverse():
+            if item.type != "blob":
+                continue
+            if item.mode == SYMLINK_MODE:
+                yield item.path, None, item.data_stream.read().decode(), None
+            else:
+                yield item.path, None, None, item.hexsha
+
+    def count(self, stamp: str) -> int:
+        """Number of files in a backup, without reading any blob."""
+        commit = self.repo.commit(f"{REF_PREFIX}{stamp}")
+        return sum(1 for item in commit.tree.traverse() if item.type == "blob")
+
+    def remove(self, stamp: str):
+        self.repo.git.update_ref("-d", f"{REF_PREFIX}{stamp}")
@@ -0,0 +1,263 @@
+"""Indexed tar.gz backups that can be read a few files at a time.
+
+Archives are written as a sequence of independent gzip members, each
+holding whole tar entries, so the file stays a normal ``tar.gz`` for any
+gunzip/tar. A JSON sidecar ``<archive>.idx`` records every entry's
+member, size and mode plus each member's byte offset, letting a selective
+restore decompress only the members that hold the requested paths.
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import os
+import tarfile
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from fnmatch import fnmatch
+from functools import partial
+from pathlib import Path
+
+from csync.compression import GZIP_WBITS
+from csync.compression import Compressor
+
+INDEX_SUFFIX = ".idx"
+
+# Uncompressed bytes per gzip member; a new member starts at the next entry
+CHUNK_SIZE = 1024 * 1024
+
+
+def index_path(archive: Path) -> Path:
+    return archive.with_name(archive.name + INDEX_SUFFIX)
+
+
+def matches(name: str, patterns) -> bool:
+    """True if ``name`` matches a glob, or lies under a matching directory."""
+    if not patterns:
+        return True
+    return any(
+        fnmatch(name, pattern) or fnmatch(name, pattern.rstrip("/") + "/*")
+        for pattern in patterns
+    )
+
+
+class ChunkedGzipWriter:
+    """File-like sink that gzips its input as a series of gzip members.
+
+    Each finished member is handed to the compressor's thread pool; results
+    are written back in order, with at most two members per thread in
+    flight so memory stays bounded.
+    """
+
+    def __init__(self, raw, compressor: Compressor = None):
+        self.raw = raw
+        self.compressor = compressor or Compressor("serial")
+        self.position = 0
+        self.chunks = []
+        self._buffer = bytearray()
+        self._pending = deque()
+        self._pool = None
+        if self.compressor.threads > 1:
+            self._pool = ThreadPoolExecutor(max_workers=self.compressor.threads)
+
+    def tell(self) -> int:
+        """Uncompressed position, as tarfile expects."""
+        return self.position
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self.position += len(data)
+        return len(data)
+
+    @property
+    def chunk_length(self) -> int:
+        """Uncompressed bytes buffered for the open member."""
+        return len(self._buffer)
+
+    @property
+    def chunk_number(self) -> int:
+        """Position of the open member in the archive."""
+        return len(self.chunks) + len(self._pending)
+
+    def end_chunk(self):
+        """Close the open member and queue it for compression."""
+        if not self._buffer:
+            return
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        if self._pool:
+            job = self._pool.submit(self.compressor.gzip_member, data)
+        else:
+            job = self.compressor.gzip_member(data)
+        self._pending.append((job, len(data)))
+        self._flush_pending(self.compressor.threads * 2)
+
+    def _flush_pending(self, keep: int):
+        while len(self._pending) > keep:
+            job, length = self._pending.popleft()
+            member = job.result() if self._pool else job
+            self.chunks.append(
+                {"offset": self.raw.tell(), "compressed": len(member), "length": length}
+            )
+            self.raw.write(member)
+
+    def close(self):
+        """Compress what is left and wait for every member to be written."""
+        self.end_chunk()
+        try:
+            self._flush_pending(0)
+        finally:
+            if self._pool:
+                self._pool.shutdown()
+
+
+class IndexedTarWriter:
+    """Write a chunked tar.gz and its member index."""
+
+    def __init__(
+        self,
+        archive: Path,
+        compressor: Compressor = None,
+        chunk_size: int = CHUNK_SIZE,
+    ):
+        self.archive = archive
+        self.compressor = compressor
+        self.chunk_size = chunk_size
+        self.members = []
+
+    def write(self, root: Path, entries):
+        """Archive ``entries`` (relative paths under ``root``) and index them."""
+        with open(self.archive, "wb") as raw:
+            sink = ChunkedGzipWriter(raw, self.compressor)
+            try:
+                with tarfile.open(
+                    fileobj=sink, mode="w", format=tarfile.PAX_FORMAT
+                ) as tar:
+                    for rel in entries:
+                        if sink.chunk_length >= self.chunk_size:
+                            sink.end_chunk()
+                        info = tar.gettarinfo(root / rel, arcname=rel)
+                        self.members.append(
+                            {
+                                "name": rel,
+                                "type": "symlink" if info.issym() else "file",
+                                "size": info.size,
+                                "mode": info.mode,
+                                "chunk": sink.chunk_number,
+                            }
+                        )
+                        tar.add(root / rel, arcname=rel, recursive=False)
+            finally:
+                sink.close()
+
+        index = {"version": 1, "chunks": sink.chunks, "members": self.members}
+        index_path(self.archive).write_text(json.dumps(index))
+        return index
+
+
+class BackupIndex:
+    """Random access to an indexed tar.gz backup."""
+
+    def __init__(self, archive: Path):
+        self.archive = archive
+        self.data = json.loads(index_path(archive).read_text())
+
+    @classmethod
+    def load(cls, archive: Path):
+        """The archive's index, or None for tarballs written without one."""
+        if not index_path(archive).exists():
+            return None
+        return cls(archive)
+
+    @property
+    def members(self):
+        return self.data["members"]
+
+    def select(self, patterns):
+        return [m for m in self.members if matches(m["name"], patterns)]
+
+    def _read_chunk(self, raw, chunk) -> bytes:
+        raw.seek(chunk["offset"])
+        return zlib.decompress(raw.read(chunk["compressed"]), GZIP_WBITS)
+
+    def iter_entries(self, patterns=None):
+        """Yield ``(TarInfo, data)`` for matching members, one chunk at a time."""
+        wanted = {}
+        for member in self.select(patterns):
+            wanted.setdefault(member["chunk"], set()).add(member["name"])
+
+        with open(self.archive, "rb") as raw:
+            for chunk_number in sorted(wanted):
+                chunk = self.data["chunks"][chunk_number]
+                data = self._read_chunk(raw, chunk)
+                with tarfile.open(fileobj=io.BytesIO(data), mode="r:") as tar:
+                    for info in tar:
+                        if info.name in wanted[chunk_number]:
+                            content = tar.extractfile(info) if info.isfile() else None
+                            yield info, content.read() if content else None
+
+
+@contextmanager
+def open_stream(archive: Path):
+    """Stream a tar.gz from the start, across all of its gzip members.
+
+    ``tarfile``'s own ``r|gz`` mode stops at the end of the first member,
+    which in a chunked archive is the first chunk.
+    """
+    with gzip.open(archive, "rb") as raw:
+        with tarfile.open(fileobj=raw, mode="r|") as tar:
+            yield tar
+
+
+def iter_tar_entries(archive: Path, patterns=None):
+    """Yield ``(TarInfo, data)`` for matching members of any tar.gz backup.
+
+    Indexed archives only decompress the members they need; older archives
+    are streamed once from the start.
+    """
+    index = BackupIndex.load(archive)
+    if index is not None:
+        yield from index.iter_entries(patterns)
+        return
+
+    with open_stream(archive) as tar:
+        for info in tar:
+            if info.isdir() or not matches(info.name, patterns):
+                continue
+            content = tar.extractfile(info) if info.isfile() else None
+            yield info, content.read() if content else None
+
+
+def iter_tar_digests(archive: Path, block_size: int = 64 * 1024):
+    """Yield ``(path, size, link, sha256)`` for every member of a tar.gz.
+
+    The archive is streamed once and each member hashed ``block_size``
+    bytes at a time, so memory stays flat however big the archive is.
+    """
+    with open_stream(archive) as tar:
+        for info in tar:
+            if info.issym():
+                yield info.name, None, info.linkname, None
+            elif info.isfile():
+                digest = hashlib.sha256()
+                content = tar.extractfile(info)
+                for block in iter(partial(content.read, block_size), b""):
+                    digest.update(block)
+                yield info.name, info.size, None, digest.hexdigest()
+
+
+def write_entry(target: Path, name: str, data: bytes, mode: int, link: str = None):
+    """Write one restored file or symlink, replacing what is there."""
+    path = target / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.is_symlink() or (link is not None and path.is_file()):
+        path.unlink()
+    if link is not None:
+        if not path.exists():
+            os.symlink(link, path)
+        return
+    path.write_bytes(data)
+    path.chmod(mode)
@@ -0,0 +1,251 @@
+"""Content-addressed, deduplicating backup store.
+
+Each file's content is stored once under ``.sync/backups/objects`` keyed by
+its SHA-256, zlib-compressed. A backup is a small JSON manifest mapping
+paths to object hashes, so creating one only costs hashing and storing what
+changed since the previous backup.
+"""
+
+import hashlib
+import json
+import os
+import stat
+import threading
+import zlib
+from datetime import datetime
+from pathlib import Path
+
+from csync.backup_index import matches
+from csync.compression import Compressor
+from csync.config import Config
+from csync.walker import BackupWalker
+
+MANIFEST_SUFFIX = ".json"
+
+
+def tree_fingerprint(root: Path, entries) -> str:
+    """Hash of path, size, mode and mtime of everything a backup would hold.
+
+    ``entries`` come from ``BackupWalker.walk``; only ``lstat`` data is
+    used, so comparing trees costs a directory walk rather than reading or
+    compressing any file.
+    """
+    digest = hashlib.sha256()
+    for rel, st in entries:
+        if stat.S_ISLNK(st.st_mode):
+            detail = os.readlink(root / rel)
+        else:
+            detail = f"{st.st_size}:{st.st_mode}:{st.st_mtime_ns}"
+        digest.update(f"{rel}\0{detail}\n".encode())
+    return digest.hexdigest()
+
+
+class BackupStore:
+    """Stores backups as manifests over a shared object directory."""
+
+    def __init__(self, config: Config):
+        self.config = config
+        self.backup_dir = config.backup_dir
+        self.objects_dir = config.backup_dir / "objects"
+
+    def manifests(self):
+        """Manifest paths, oldest first."""
+        return sorted(self.backup_dir.glob(f"backup-*{MANIFEST_SUFFIX}"))
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest[2:]
+
+    def _previous_entries(self):
+        manifests = self.manifests()
+        if not manifests:
+            return {}
+        return self.load(manifests[-1])["files"]
+
+    def _store_object(self, data: bytes, digest: str, compressor) -> int:
+        """Write ``data`` unless already present; return the bytes written."""
+        path = self._object_path(digest)
+        if path.exists():
+            return 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        compressed = compressor.deflate(data)
+        # Per-thread temp name: two files with equal content may race here
+        tmp = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(compressed)
+        os.replace(tmp, path)
+        return len(compressed)
+
+    def _object_size(self, digest: str) -> int:
+        try:
+            return self._object_path(digest).stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def _ingest(self, rel: str, compressor):
+        """Hash and store one file.
+
+        Returns ``(digest, bytes written, bytes the object takes)``.
+        """
+        data = (self.config.configs_dir / rel).read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        written = self._store_object(data, digest, compressor)
+        return digest, written, written or self._object_size(digest)
+
+    def create(self, name: str = None, entries=None):
+        """Write a new manifest for the current tree and return its path.
+
+        Files whose size and mtime match the previous manifest reuse its
+        hash without being read, like git's index stat cache. Changed files
+        are hashed and compressed on the configured compressor's threads.
+        """
+        if entries is None:
+            entries = BackupWalker(self.config.configs_dir).walk()
+        name = name or f"backup-{datetime.now():%Y%m%d-%H%M%S}{MANIFEST_SUFFIX}"
+        previous = self._previous_entries()
+        files = {}
+        symlinks = {}
+        total_size = 0
+        stored_bytes = 0
+        changed = []
+
+        for rel, st in entries:
+            path = self.config.configs_dir / rel
+            if stat.S_ISLNK(st.st_mode):
+                symlinks[rel] = os.readlink(path)
+                continue
+            if not stat.S_ISREG(st.st_mode):
+                continue
+
+            entry = {
+                "size": st.st_size,
+                "mode": stat.S_IMODE(st.st_mode),
+                "mtime_ns": st.st_mtime_ns,
+            }
+            known = previous.get(rel)
+            if (
+                known
+                and known["size"] == st.st_size
+                and known["mtime_ns"] == st.st_mtime_ns
+                and self._object_path(known["hash"]).exists()
+            ):
+                entry["hash"] = known["hash"]
+                if "stored" in known:
+                    entry["stored"] = known["stored"]
+                else:
+                    entry["stored"] = self._object_size(known["hash"])
+            else:
+                changed.append(rel)
+            files[rel] = entry
+            total_size += st.st_size
+
+        compressor = Compressor.from_config(self.config)
+        results = compressor.map(lambda rel: self._ingest(rel, compressor), changed)
+        for rel, (digest, written, size) in zip(changed, results):
+            files[rel]["hash"] = digest
+            files[rel]["stored"] = size
+            stored_bytes += written
+
+        manifest = {
+            "version": 1,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "size": total_size,
+            "stored": stored_bytes,
+            "referenced": sum(self.object_sizes({"files": files}).values()),
+            "files": files,
+            "symlinks": symlinks,
+        }
+        self.backup_dir.mkdir(parents=True, exist_ok=True)
+        path = self.backup_dir / name
+        tmp = path.with_name(f".{path.name}.tmp")
+        tmp.write_text(json.dumps(manifest, sort_keys=True))
+        os.replace(tmp, path)
+        return path
+
+    def load(self, manifest_path: Path):
+        return json.loads(manifest_path.read_text())
+
+    def object_sizes(self, manifest):
+        """``{digest: bytes on disk}`` for every object ``manifest`` uses.
+
+        Manifests written before sizes were recorded fall back to a stat.
+        """
+        return {
+            entry["hash"]: (
+                entry["stored"]
+                if "stored" in entry
+                else self._object_size(entry["hash"])
+            )
+            for entry in manifest["files"].values()
+        }
+
+    def referenced_size(self, manifest) -> int:
+        """Bytes of every object ``manifest`` uses, shared ones included."""
+        if "referenced" in manifest:
+            return manifest["referenced"]
+        return sum(self.object_sizes(manifest).values())
+
+    def read_object(self, digest: str) -> bytes:
+        return zlib.decompress(self._object_path(digest).read_bytes())
+
+    def iter_entries(self, manifest_path: Path, patterns=None):
+        """Yield ``(path, data, mode, link)`` for matching manifest entries."""
+        manifest = self.load(manifest_path)
+        for rel, entry in manifest["files"].items():
+            if matches(rel, patterns):
+                yield rel, self.read_object(entry["hash"]), entry["mode"], None
+        for rel, link in manifest["symlinks"].items():
+            if matches(rel, patterns):
+                yield rel, None, 0o777, link
+
+    def iter_digests(self, manifest_path: Path):
+        """Yield ``(path, size, link, digest)`` straight from the manifest.
+
+        No object is read; digests are SHA-256 (see ``backup_diff``).
+        """
+        manifest = self.load(manifest_path)
+        for rel, entry in manifest["files"].items():
+            yield rel, entry["size"], None, entry["hash"]
+        for rel, link in manifest["symlinks"].items():
+            yield rel, None, link, None
+
+    def restore(self, manifest_path: Path, target: Path = None):
+        """Write every file and symlink of a manifest back under ``target``."""
+        target = target or self.config.configs_dir
+        manifest = self.load(manifest_path)
+
+        for rel, entry in manifest["files"].items():
+            path = target / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if path.is_symlink():
+                path.unlink()
+            path.write_bytes(self.read_object(entry["hash"]))
+            path.chmod(entry["mode"])
+
+        for rel, link in manifest["symlinks"].items():
+            path = target / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if path.is_symlink() or path.is_file():
+                path.unlink()
+            elif path.exists():
+                continue
+            path.symlink_to(link)
+
+        return len(manifest["files"]) + len(manifest["symlinks"])
+
+    def remove(self, manifest_path: Path):
+        manifest_path.unlink(missing_ok=True)
+
+    def collect_garbage(self) -> int:
+        """Delete objects no manifest refers to; return the bytes freed."""
+        if not self.objects_dir.exists():
+            return 0
+        live = set()
+        for manifest_path in self.manifests():
+            live.update(e["hash"] for e in self.load(manifest_path)["files"].values())
+
+        freed = 0
+        for bucket in self.objects_dir.iterdir():
+            for obj in bucket.iterdir():
+                if bucket.name + obj.name not in live:
+                    freed += obj.stat().st_size
+                    obj.unlink()
+        return freed
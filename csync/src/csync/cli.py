@@ -1,6 +1,7 @@
 """Command-line interface for csync."""
 
 import sys
+from datetime import datetime
 from pathlib import Path
 
 import click
@@ -9,9 +10,16 @@ from rich.console import Console
 from csync.addons import AddonManager
 from csync.backup import BackupManager
 from csync.config import Config
+from csync.config import load_repositories
+from csync.daemon import SyncDaemon
+from csync.gittrace import GitStats
 from csync.marked import MarkedFilesManager
+from csync.multi import MultiSyncer
+from csync.profiler import Profiler
+from csync.session import SyncSession
 from csync.status import StatusDisplay
 from csync.symlinks import SymlinkManager
+from csync.sync import CLONE_MODES
 from csync.sync import Syncer
 
 console = Console()
@@ -28,6 +36,12 @@ def cli(ctx, version):
         console.print(f"[bold cyan]csync version {__version__}[/bold cyan]")
         sys.exit(0)
 
+    # CSYNC_GIT_STATS=1 reports every git process the command spawned
+    git_stats = GitStats.from_env()
+    if git_stats:
+        command = ctx.invoked_subcommand or "sync"
+        ctx.call_on_close(lambda: _finish_git_stats(git_stats, command))
+
     # If no command provided, run default sync
     if ctx.invoked_subcommand is None:
         sync()
@@ -42,8 +56,41 @@ def cli(ctx, version):
 )
 @click.option("--dry-run", is_flag=True, help="Preview changes without syncing")
 @click.option("--background", is_flag=True, help="Run sync quietly in background")
-def sync(force_push=False, force_pull=False, dry_run=False, background=False):
+@click.option(
+    "--all",
+    "all_repos",
+    is_flag=True,
+    help="Sync every repository listed in ~/.config/csync/repos.yaml",
+)
+@click.option(
+    "--jobs",
+    default=4,
+    show_default=True,
+    help="Repositories synced at once with --all",
+)
+@click.option(
+    "--profile", is_flag=True, help="Time each phase and write a Chrome trace"
+)
+def sync(
+    force_push=False,
+    force_pull=False,
+    dry_run=False,
+    background=False,
+    all_repos=False,
+    jobs=4,
+    profile=False,
+):
     """⚡ Synchronize configurations with remote repository."""
+    if all_repos:
+        if force_push or force_pull:
+            console.print("[red]❌ --force-push/--force-pull need a single repo[/red]")
+            sys.exit(1)
+        multi = MultiSyncer(load_repositories(), max_workers=jobs)
+        results = multi.sync_all(dry_run, background)
+        if not all(result.ok for result in results):
+            sys.exit(1)
+        return
+
     config = Config()
 
     # Check if configs directory exists
@@ -57,20 +104,61 @@ def sync(force_push=False, force_pull=False, dry_run=False, background=False):
         )
         sys.exit(1)
 
-    syncer = Syncer(config)
+    # One session per run so sync and status share a single fetch
+    session = SyncSession(config)
+    profiler = Profiler(enabled=profile).start()
+    syncer = Syncer(config, session=session, profiler=profiler)
     result = syncer.sync(force_push, force_pull, dry_run, background)
-    
+
     # Show status after sync (unless running in background mode)
     if not background and result:
         console.print()  # Add a blank line between sync output and status
-        status_display = StatusDisplay(config)
-        status_display.show_status()
+        status_display = StatusDisplay(config, session=session, profiler=profiler)
+        with profiler.phase("status"):
+            status_display.show_status()
+
+    _finish_profile(config, profiler, "sync")
 
 
 @cli.command()
-def setup():
+@click.option(
+    "--debounce",
+    default=2.0,
+    show_default=True,
+    help="Seconds of quiet before a burst of edits is synced",
+)
+@click.option(
+    "--fetch-interval",
+    default=300.0,
+    show_default=True,
+    help="Seconds between remote fetches",
+)
+def daemon(debounce, fetch_interval):
+    """👀 Stay resident and sync whenever configs change."""
+    config = Config()
+
+    if not config.configs_dir.exists():
+        console.print(
+            f"[red]❌ Config directory not found at {config.configs_dir}[/red]"
+        )
+        sys.exit(1)
+
+    sync_daemon = SyncDaemon(config, debounce=debounce, fetch_interval=fetch_interval)
+    if not sync_daemon.run():
+        sys.exit(1)
+
+
+@cli.command()
+@click.option(
+    "--clone-mode",
+    type=click.Choice(CLONE_MODES),
+    help="How to clone on a fresh machine (default: $CSYNC_CLONE_MODE or full)",
+)
+def setup(clone_mode):
     """🔧 Initial setup on new machine."""
     config = Config()
+    if clone_mode:
+        config.clone_mode = clone_mode
 
     console.print("[bold blue]🔧 Setting up sync environment...[/bold blue]")
 
@@ -79,6 +167,9 @@ def setup():
     config.backup_dir.mkdir(parents=True, exist_ok=True)
     config.external_dir.mkdir(parents=True, exist_ok=True)
 
+    # Initialize git if needed, before any tracked files are created locally
+    Syncer(config)
+
     # Get machine ID
     machine_id = config.get_machine_id()
     console.print(f"[green]📍 Machine ID: {machine_id}[/green]")
@@ -119,9 +210,6 @@ def setup():
             gitignore.write_text(content + "\n# Sync system files\n.sync/\n*.local\n")
             console.print("[green]✅ Updated .gitignore[/green]")
 
-    # Initialize git if needed
-    syncer = Syncer(config)
-
     # Initial status
     config.update_sync_status("")
 
@@ -135,29 +223,66 @@ def setup():
 
 
 @cli.command()
-def status():
+@click.option("--depth", type=int, help="Fetch this many more commits only")
+def deepen(depth):
+    """📜 Fetch history skipped by a shallow or blobless setup."""
+    config = Config()
+    syncer = Syncer(config)
+    syncer.deepen_history(depth)
+
+
+@cli.command()
+@click.option(
+    "--profile", is_flag=True, help="Time each phase and write a Chrome trace"
+)
+def status(profile):
     """📊 Show sync status and information."""
     config = Config()
-    status_display = StatusDisplay(config)
-    status_display.show_status()
+    profiler = Profiler(enabled=profile).start()
+    status_display = StatusDisplay(config, profiler=profiler)
+    with profiler.phase("status"):
+        status_display.show_status()
+
+    _finish_profile(config, profiler, "status")
+
+
+def _finish_profile(config, profiler, command):
+    """Print the phase summary and save the trace of a profiled command."""
+    if not profiler.enabled:
+        return
+    profiler.stop()
+    profiler.print_summary(f"csync {command} profile")
+    trace_name = f"{command}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    trace_file = profiler.write_chrome_trace(config.sync_dir / "profiles" / trace_name)
+    console.print(f"[cyan]📈 Chrome trace written to {trace_file}[/cyan]")
+
+
+def _finish_git_stats(git_stats, command):
+    git_stats.stop()
+    git_stats.print_summary(command)
 
 
 @cli.command()
-@click.argument("path", type=click.Path())
-def mark(path):
-    """📌 Mark a file/directory for syncing."""
+@click.argument("paths", nargs=-1, required=True, type=click.Path())
+@click.option(
+    "--copy",
+    is_flag=True,
+    help="Keep real files in $HOME and sync them both ways instead of linking",
+)
+def mark(paths, copy):
+    """📌 Mark files/directories (paths or quoted globs) for syncing."""
     config = Config()
     manager = MarkedFilesManager(config)
-    manager.mark_file(path)
+    manager.mark_files(paths, copy=copy)
 
 
 @cli.command()
-@click.argument("path", type=click.Path())
-def unmark(path):
-    """🚫 Stop syncing a file/directory."""
+@click.argument("paths", nargs=-1, required=True, type=click.Path())
+def unmark(paths):
+    """🚫 Stop syncing files/directories (paths or quoted globs)."""
     config = Config()
     manager = MarkedFilesManager(config)
-    manager.unmark_file(path)
+    manager.unmark_files(paths)
 
 
 @cli.command("list-marked")
@@ -168,21 +293,52 @@ def list_marked():
     manager.list_marked()
 
 
-@cli.command()
-def backup():
+@cli.group(invoke_without_command=True)
+@click.option("--force", is_flag=True, help="Back up even if nothing changed")
+@click.option(
+    "--report", is_flag=True, help="Show what was excluded and the space saved"
+)
+@click.pass_context
+def backup(ctx, force, report):
     """💾 Create backup only, no sync."""
+    if ctx.invoked_subcommand is not None:
+        return
     config = Config()
     backup_mgr = BackupManager(config)
-    backup_mgr.create_backup()
+    backup_mgr.create_backup(force=force, report=report)
+
+
+@backup.command("diff")
+@click.argument("backup_file")
+def backup_diff(backup_file):
+    """🔍 Show what changed since a backup, without extracting it."""
+    config = Config()
+    backup_mgr = BackupManager(config)
+    backup_mgr.diff_backup(backup_file)
+
+
+@backup.command()
+def repair():
+    """🔧 Rebuild the backup catalog from disk."""
+    config = Config()
+    backup_mgr = BackupManager(config)
+    backup_mgr.repair()
 
 
 @cli.command()
 @click.argument("backup_file", required=False)
-def restore(backup_file):
+@click.option(
+    "--path",
+    "paths",
+    multiple=True,
+    help="Only restore files matching this glob (repeatable)",
+)
+@click.option("--diff", is_flag=True, help="Preview the changes without restoring")
+def restore(backup_file, paths, diff):
     """♻️ Restore from backup."""
     config = Config()
     backup_mgr = BackupManager(config)
-    backup_mgr.restore_backup(backup_file)
+    backup_mgr.restore_backup(backup_file, paths=paths, diff=diff)
 
 
 @cli.command("list-backups")
@@ -4,18 +4,47 @@ import os
 import platform
 from pathlib import Path
 
+import yaml
 from rich.console import Console
 
 console = Console()
 
+# Invalid environment settings already reported by _env_int
+_warned = set()
+
 
 class Config:
-    """Manages configuration paths and environment detection."""
+    """Manages configuration paths and environment detection.
+
+    Without arguments the configs directory is detected from the machine
+    type. Entries in the repositories file pass their own directory, branch,
+    external dir and marked-files list instead.
+    """
 
-    def __init__(self):
+    def __init__(
+        self,
+        configs_dir=None,
+        branch=None,
+        external_dir=None,
+        marked_files=None,
+        remote_url=None,
+        name=None,
+    ):
         self.detect_environment()
+        if configs_dir is not None:
+            self.configs_dir = Path(configs_dir).expanduser()
         self.setup_paths()
 
+        if branch:
+            self.branch = branch
+        if external_dir:
+            self.external_dir = self.configs_dir / Path(external_dir).expanduser()
+        if marked_files:
+            self.marked_files = self.configs_dir / Path(marked_files).expanduser()
+        if remote_url:
+            self.remote_url = remote_url
+        self.name = name or self.configs_dir.name
+
     def detect_environment(self):
         """Detect machine type and set configs directory."""
         # Check if we're on EC2
@@ -40,9 +69,32 @@ class Config:
         self.machine_id_file = self.sync_dir / "machine-id"
         self.last_sync_file = self.sync_dir / "last-sync"
         self.sync_status_file = self.sync_dir / "sync-status"
+        self.remote_snapshot_file = self.sync_dir / "remote-snapshot.json"
+        self.sync_state_file = self.sync_dir / "sync-state.json"
+        # Last synced state of copy-mode marked files (machine-local)
+        self.copy_state_file = self.sync_dir / "copy-state.json"
         self.marked_files = self.configs_dir / ".marked-files"
         self.external_dir = self.configs_dir / "external"
         self.branch = os.environ.get("SYNC_BRANCH", "main")
+        # Seconds a fetched remote snapshot is reused before fetching again
+        self.fetch_ttl = float(os.environ.get("CSYNC_FETCH_TTL", "30"))
+        self.remote_url = os.environ.get(
+            "CSYNC_REMOTE_URL", "git@github.com:jtele2/configs.git"
+        )
+        # How a fresh machine clones: "full", "blobless" or "shallow"
+        self.clone_mode = os.environ.get("CSYNC_CLONE_MODE", "full")
+        # New backups: "store" (deduplicated manifests) or "tar" (full tarballs)
+        self.backup_format = os.environ.get("CSYNC_BACKUP_FORMAT", "store")
+        # Backup compression: "parallel" or "serial" gzip, level 1 (fast) to 9
+        self.backup_compression = os.environ.get("CSYNC_BACKUP_COMPRESSION", "parallel")
+        self.backup_level = _env_int("CSYNC_BACKUP_LEVEL", 6, 1, 9)
+        # 0 picks the CPU count
+        self.backup_threads = _env_int("CSYNC_BACKUP_THREADS", 0, 0) or None
+        # Tiered retention ("last=5,hourly=24,daily=7,weekly=4") and size budget
+        self.backup_retention = os.environ.get(
+            "CSYNC_BACKUP_RETENTION", "last=5,hourly=24,daily=7,weekly=4"
+        )
+        self.backup_max_size = os.environ.get("CSYNC_BACKUP_MAX_SIZE", "1G")
 
     def get_machine_id(self):
         """Get or create machine identifier."""
@@ -59,3 +111,64 @@ class Config:
         """Update sync status for shell prompt."""
         self.sync_dir.mkdir(parents=True, exist_ok=True)
         self.sync_status_file.write_text(status)
+
+
+def _env_int(name: str, default: int, low: int, high: int = None) -> int:
+    """Integer setting from the environment, or ``default`` if it is invalid.
+
+    A bad value only affects backups, so it is reported once per process
+    rather than breaking every command that builds a Config.
+    """
+    raw = os.environ.get(name)
+    if raw is None:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        value = None
+    if value is not None and low <= value and (high is None or value <= high):
+        return value
+    if (name, raw) not in _warned:
+        _warned.add((name, raw))
+        allowed = f"{low}-{high}" if high is not None else f">= {low}"
+        console.print(
+            f"[yellow]⚠️  Ignoring {name}={raw!r} (expected an integer "
+            f"{allowed}); using {default}[/yellow]"
+        )
+    return default
+
+
+def repositories_file() -> Path:
+    """Location of the optional multi-repository list."""
+    default = Path.home() / ".config" / "csync" / "repos.yaml"
+    return Path(os.environ.get("CSYNC_REPOS_FILE", default)).expanduser()
+
+
+def load_repositories():
+    """Return a Config for every repository listed in the repositories file.
+
+    The file is YAML with a ``repositories`` list whose entries take
+    ``path`` plus optional ``name``, ``branch``, ``external_dir``,
+    ``marked_files`` and ``remote``. Without the file, only the detected
+    configs directory is returned.
+    """
+    path = repositories_file()
+    if not path.exists():
+        return [Config()]
+
+    data = yaml.safe_load(path.read_text()) or {}
+    configs = []
+    for entry in data.get("repositories", []):
+        if "path" not in entry:
+            raise ValueError(f"Repository entry without a path in {path}: {entry}")
+        configs.append(
+            Config(
+                configs_dir=entry["path"],
+                branch=entry.get("branch"),
+                external_dir=entry.get("external_dir"),
+                marked_files=entry.get("marked_files"),
+                remote_url=entry.get("remote"),
+                name=entry.get("name"),
+            )
+        )
+    return configs
@@ -0,0 +1,224 @@
+"""Two-way sync for marked entries kept as real copies instead of links.
+
+Some apps refuse to read a symlinked config, or replace the link with a
+plain file when they save. Entries marked with ``sync: copy`` keep a real
+file (or directory) in ``$HOME`` and csync copies changes across in both
+directions. ``.sync/copy-state.json`` remembers each file's size and mtime
+on both sides plus its hash at the last sync, so a sync only stats files
+and copies just the ones that changed since.
+
+When both sides changed, ``external/`` (what came from the repository)
+wins and the ``$HOME`` version is kept next to it as ``*.csync-conflict``.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from csync import transfer
+from csync.config import Config
+from csync.marked_manifest import COPY
+from csync.marked_manifest import MarkedManifest
+
+CONFLICT_SUFFIX = ".csync-conflict"
+
+TO_HOME = "to-home"
+TO_EXTERNAL = "to-external"
+DELETE_HOME = "delete-home"
+DELETE_EXTERNAL = "delete-external"
+CONFLICT = "conflict"
+# Bookkeeping only: the state file changes, no file does
+RECORD = "record"
+FORGET = "forget"
+
+
+def _signature(path: Path):
+    """``[mtime_ns, size]`` of a regular file, or None if there is none."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(64 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _files(root: Path, rel: str):
+    """Paths of files under ``root / rel`` relative to ``root``."""
+    base = root / rel
+    if base.is_file():
+        return {rel}
+    found = set()
+    for dirpath, _, filenames in os.walk(base):
+        for name in filenames:
+            path = Path(dirpath) / name
+            if not name.endswith(CONFLICT_SUFFIX) and not path.is_symlink():
+                found.add(path.relative_to(root).as_posix())
+    return found
+
+
+class CopyAction:
+    """One file copied, deleted or in conflict during a copy sync."""
+
+    def __init__(self, path: str, action: str):
+        self.path = path
+        self.action = action
+
+
+class CopySync:
+    """Keeps copy-mode entries identical in ``$HOME`` and ``external/``."""
+
+    def __init__(self, config: Config, home: Path = None):
+        self.config = config
+        self.home = Path(home) if home is not None else Path.home()
+        self.state_file = config.copy_state_file
+        self._state = None
+
+    @property
+    def state(self):
+        if self._state is None:
+            try:
+                self._state = json.loads(self.state_file.read_text())
+            except (OSError, ValueError):
+                self._state = {}
+        return self._state
+
+    def _save_state(self):
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_file.with_name(f".{self.state_file.name}.tmp")
+        tmp.write_text(json.dumps(self.state, indent=1, sort_keys=True))
+        os.replace(tmp, self.state_file)
+
+    def entries(self):
+        manifest = MarkedManifest.load(self.config.marked_files)
+        return [entry.path for entry in manifest if entry.sync == COPY]
+
+    def _known_files(self, rel: str):
+        return {p for p in self.state if p == rel or p.startswith(f"{rel}/")}
+
+    def _candidates(self, rel: str):
+        return (
+            _files(self.home, rel)
+            | _files(self.config.external_dir, rel)
+            | self._known_files(rel)
+        )
+
+    def _plan_file(self, path: str):
+        """Decide what one file needs; None when both sides are in sync."""
+        home_sig = _signature(self.home / path)
+        external_sig = _signature(self.config.external_dir / path)
+        known = self.state.get(path)
+
+        if known is None:
+            if home_sig and external_sig:
+                if _hash(self.home / path) == _hash(self.config.external_dir / path):
+                    return RECORD
+                return CONFLICT
+            if home_sig:
+                return TO_EXTERNAL
+            return TO_HOME if external_sig else None
+
+        home_changed = home_sig != known["home"]
+        external_changed = external_sig != known["external"]
+        if not (home_changed or external_changed):
+            return None
+        if home_changed and external_changed:
+            if home_sig is None and external_sig is None:
+                return FORGET
+            if home_sig is None or external_sig is None:
+                # An edit beats a delete
+                return TO_EXTERNAL if external_sig is None else TO_HOME
+            if _hash(self.home / path) == _hash(self.config.external_dir / path):
+                return RECORD
+            return CONFLICT
+        if home_changed:
+            if home_sig is None:
+                return DELETE_EXTERNAL
+            # Touched or saved unchanged: nothing to copy
+            if _hash(self.home / path) == known["hash"]:
+                return RECORD
+            return TO_EXTERNAL
+        if external_sig is None:
+            return DELETE_HOME
+        if _hash(self.config.external_dir / path) == known["hash"]:
+            return RECORD
+        return TO_HOME
+
+    def plan(self):
+        """``(path, action)`` for every file that needs work."""
+        work = []
+        for rel in self.entries():
+            for path in sorted(self._candidates(rel)):
+                action = self._plan_file(path)
+                if action:
+                    work.append((path, action))
+        return work
+
+    def has_changes(self) -> bool:
+        """True if any copy-mode file changed since the last sync.
+
+        Files whose size and mtime match the state are only stat'ed.
+        """
+        return any(action not in (RECORD, FORGET) for _, action in self.plan())
+
+    def _copy(self, src: Path, dst: Path):
+        """Copy atomically, so apps never see a half-written config."""
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dst.with_name(f".{dst.name}.csync-tmp")
+        transfer.copy_file(src, tmp)
+        os.replace(tmp, dst)
+
+    def _record(self, path: str):
+        home_path = self.home / path
+        external_path = self.config.external_dir / path
+        self.state[path] = {
+            "home": _signature(home_path),
+            "external": _signature(external_path),
+            "hash": _hash(external_path),
+        }
+
+    def sync(self, dry_run: bool = False):
+        """Bring both sides up to date; return the actions taken."""
+        actions = []
+        for path, action in self.plan():
+            home_path = self.home / path
+            external_path = self.config.external_dir / path
+            if action not in (RECORD, FORGET):
+                actions.append(CopyAction(path, action))
+            if dry_run:
+                continue
+
+            if action == CONFLICT:
+                conflict = home_path.with_name(home_path.name + CONFLICT_SUFFIX)
+                os.replace(home_path, conflict)
+                self._copy(external_path, home_path)
+            elif action == TO_HOME:
+                self._copy(external_path, home_path)
+            elif action == TO_EXTERNAL:
+                self._copy(home_path, external_path)
+            elif action == DELETE_HOME:
+                home_path.unlink()
+            elif action == DELETE_EXTERNAL:
+                external_path.unlink()
+
+            if action in (DELETE_HOME, DELETE_EXTERNAL, FORGET):
+                self.state.pop(path, None)
+            else:
+                self._record(path)
+
+        if not dry_run:
+            self._save_state()
+        return actions
+
+    def forget(self, rel: str):
+        """Drop the recorded state of an entry that is no longer marked."""
+        for path in self._known_files(rel):
+            del self.state[path]
+        self._save_state()
@@ -0,0 +1,291 @@
+"""Long-running sync daemon driven by filesystem events."""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import signal
+import struct
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from rich.console import Console
+
+from csync.config import Config
+from csync.session import SyncSession
+from csync.sync import Syncer
+
+console = Console()
+
+# Directories whose churn never warrants a sync
+IGNORED_DIRS = {".git", ".sync", "__pycache__", "node_modules", ".venv", "venv"}
+
+# inotify constants from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """Recursive inotify watch over a set of directory trees (Linux only)."""
+
+    def __init__(self, roots):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watches = {}
+        for root in roots:
+            self._watch_tree(Path(root))
+
+    @classmethod
+    def available(cls) -> bool:
+        return sys.platform.startswith("linux")
+
+    def _watch_tree(self, root: Path):
+        for dirpath, dirnames, _ in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d not in IGNORED_DIRS]
+            self._add_watch(dirpath)
+
+    def _add_watch(self, path):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd >= 0:
+            self._watches[wd] = path
+
+    def wait(self, timeout: float) -> bool:
+        """Block up to ``timeout`` seconds; True if anything relevant changed."""
+        ready, _, _ = select.select([self.fd], [], [], max(timeout, 0))
+        if not ready:
+            return False
+        return self._read_events()
+
+    def drain(self):
+        """Discard queued events, e.g. those caused by our own sync."""
+        while select.select([self.fd], [], [], 0)[0]:
+            self._read_events()
+
+    def _read_events(self) -> bool:
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return False
+
+        changed = False
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, name_len = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset : offset + name_len].rstrip(b"\0"))
+            offset += name_len
+
+            if mask & IN_Q_OVERFLOW:
+                changed = True
+                continue
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            if name in IGNORED_DIRS:
+                continue
+
+            parent = self._watches.get(wd)
+            if parent and mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                self._watch_tree(Path(parent) / name)
+            changed = True
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Portable fallback that compares mtimes between polls."""
+
+    def __init__(self, roots, poll_interval: float = 2.0):
+        self.roots = [Path(root) for root in roots]
+        self.poll_interval = poll_interval
+        self._state = self._scan()
+
+    def _scan(self):
+        state = {}
+        for root in self.roots:
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames[:] = [d for d in dirnames if d not in IGNORED_DIRS]
+                for name in filenames:
+                    path = os.path.join(dirpath, name)
+                    try:
+                        st = os.lstat(path)
+                    except FileNotFoundError:
+                        continue
+                    state[path] = (st.st_mtime_ns, st.st_size)
+        return state
+
+    def wait(self, timeout: float) -> bool:
+        deadline = time.monotonic() + max(timeout, 0)
+        while True:
+            time.sleep(max(min(self.poll_interval, deadline - time.monotonic()), 0))
+            state = self._scan()
+            if state != self._state:
+                self._state = state
+                return True
+            if time.monotonic() >= deadline:
+                return False
+
+    def drain(self):
+        self._state = self._scan()
+
+    def close(self):
+        pass
+
+
+class SyncDaemon:
+    """Keeps the repository synced without paying startup cost per sync."""
+
+    def __init__(self, config: Config, debounce: float = 2.0, fetch_interval=300.0):
+        self.config = config
+        self.debounce = debounce
+        self.fetch_interval = fetch_interval
+        self.session = SyncSession(config, ttl=fetch_interval)
+        self.syncer = Syncer(config, session=self.session)
+        self.pid_file = config.sync_dir / "daemon.pid"
+        self._syncing = False
+        self._stop_requested = False
+
+    def _watch_roots(self):
+        roots = [self.config.configs_dir]
+        external = self.config.external_dir
+        if external.exists() and self.config.configs_dir not in external.parents:
+            roots.append(external)
+        return roots
+
+    def _create_watcher(self):
+        roots = self._watch_roots()
+        if InotifyWatcher.available():
+            try:
+                return InotifyWatcher(roots)
+            except OSError as e:
+                self._log(f"[yellow]⚠️  inotify unavailable ({e}), polling[/yellow]")
+        return PollingWatcher(roots)
+
+    def _log(self, message: str):
+        console.print(f"[dim]{datetime.now():%H:%M:%S}[/dim] {message}")
+
+    def _claim_pid_file(self) -> bool:
+        self.config.sync_dir.mkdir(parents=True, exist_ok=True)
+        if self.pid_file.exists():
+            try:
+                pid = int(self.pid_file.read_text().strip())
+                os.kill(pid, 0)
+                console.print(f"[red]❌ csync daemon already running (pid {pid})[/red]")
+                return False
+            except (ValueError, ProcessLookupError):
+                pass
+            except PermissionError:
+                return False
+        self.pid_file.write_text(str(os.getpid()))
+        return True
+
+    def _stop(self, *_):
+        # Never interrupt a rebase/stash halfway; stop once the sync is done
+        self._stop_requested = True
+        if not self._syncing:
+            # select() restarts after a handled signal, so unwind explicitly
+            raise KeyboardInterrupt
+
+    def _sync(self, reason: str):
+        self._log(f"[blue]🔄 Syncing ({reason})[/blue]")
+        self._syncing = True
+        try:
+            # The sync fetches the current remote tip itself before pushing
+            if self.syncer.sync(background=True):
+                self._log("[green]✅ Synced[/green]")
+            else:
+                self._log("[red]❌ Sync failed[/red]")
+        except Exception as e:
+            self.config.update_sync_status("✗")
+            self._log(f"[red]❌ Sync error: {e}[/red]")
+        finally:
+            self._syncing = False
+        if self._stop_requested:
+            raise KeyboardInterrupt
+
+    def _poll_remote(self):
+        """Fetch and pull when the remote moved; keeps sync-status honest."""
+        try:
+            snapshot = self.session.fetch(force=True)
+        except Exception as e:
+            self.config.update_sync_status("✗")
+            self._log(f"[red]❌ Fetch failed: {e}[/red]")
+            return
+        if snapshot.refs.get(self.config.branch) != self.syncer.repo.head.commit.hexsha:
+            self._sync("remote changed")
+        else:
+            self.config.update_sync_status("✓")
+
+    def run(self):
+        """Watch for changes until interrupted."""
+        if not self._claim_pid_file():
+            return False
+
+        signal.signal(signal.SIGTERM, self._stop)
+        watcher = self._create_watcher()
+        self._log(
+            f"[bold blue]👀 Watching {self.config.configs_dir} "
+            f"(debounce {self.debounce:g}s, fetch every {self.fetch_interval:g}s)"
+            "[/bold blue]"
+        )
+
+        last_event = None
+        next_fetch = time.monotonic()
+        try:
+            while True:
+                now = time.monotonic()
+                timeout = next_fetch - now
+                if last_event is not None:
+                    timeout = min(timeout, last_event + self.debounce - now)
+
+                if watcher.wait(timeout):
+                    last_event = time.monotonic()
+                    continue
+
+                now = time.monotonic()
+                if last_event is not None and now - last_event >= self.debounce:
+                    last_event = None
+                    self._sync("local changes")
+                    watcher.drain()
+                if now >= next_fetch:
+                    self._poll_remote()
+                    watcher.drain()
+                    next_fetch = time.monotonic() + self.fetch_interval
+        except KeyboardInterrupt:
+            pass
+        finally:
+            watcher.close()
+            self.pid_file.unlink(missing_ok=True)
+            self._log("[yellow]👋 csync daemon stopped[/yellow]")
+
+        return True
@@ -0,0 +1,190 @@
+"""Observation of the git processes GitPython spawns."""
+
+import os
+import threading
+import time
+
+import git
+from rich.console import Console
+from rich.table import Table
+
+# git subcommands that talk to a remote
+NETWORK_COMMANDS = {"fetch", "pull", "push", "ls-remote", "clone"}
+
+_listeners = []
+_lock = threading.Lock()
+_originals = {}
+
+
+class GitCall:
+    """One git invocation, or one network round trip made through a Remote."""
+
+    def __init__(self, command, start: float, end: float, network: bool, spawn: bool):
+        self.command = command
+        self.start = start
+        self.end = end
+        self.network = network
+        # False for the Remote-level records that time an already-counted spawn
+        self.spawn = spawn
+        self.thread_id = threading.get_ident()
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    @property
+    def subcommand(self) -> str:
+        args = iter(self.command[1:])
+        for arg in args:
+            if arg in ("-c", "-C"):
+                next(args, None)
+            elif not arg.startswith("-"):
+                return arg
+        return ""
+
+    @property
+    def label(self) -> str:
+        return " ".join(self.command[:3])
+
+
+def _emit(call: GitCall):
+    for listener in list(_listeners):
+        listener(call)
+
+
+def _traced_execute(self, command, *args, **kwargs):
+    start = time.perf_counter()
+    try:
+        return _originals["execute"](self, command, *args, **kwargs)
+    finally:
+        if isinstance(command, (list, tuple)):
+            argv = [str(arg) for arg in command]
+        else:
+            argv = [str(command)]
+        call = GitCall(argv, start, time.perf_counter(), False, True)
+        call.network = call.subcommand in NETWORK_COMMANDS
+        # Async spawns (fetch/pull/push, cat-file --batch) return immediately;
+        # the Remote wrappers below record how long the round trip really took
+        if kwargs.get("as_process"):
+            call.end = call.start
+        _emit(call)
+
+
+def _traced_remote(name):
+    def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return _originals[name](self, *args, **kwargs)
+        finally:
+            end = time.perf_counter()
+            _emit(GitCall(["git", name, self.name], start, end, True, False))
+
+    return wrapper
+
+
+def _install():
+    _originals["execute"] = git.cmd.Git.execute
+    git.cmd.Git.execute = _traced_execute
+    for name in ("fetch", "pull", "push"):
+        _originals[name] = getattr(git.Remote, name)
+        setattr(git.Remote, name, _traced_remote(name))
+
+
+def _uninstall():
+    git.cmd.Git.execute = _originals.pop("execute")
+    for name in ("fetch", "pull", "push"):
+        setattr(git.Remote, name, _originals.pop(name))
+
+
+def add_listener(listener):
+    """Call ``listener(GitCall)`` for every git invocation from now on."""
+    with _lock:
+        if not _listeners:
+            _install()
+        _listeners.append(listener)
+
+
+def remove_listener(listener):
+    with _lock:
+        _listeners.remove(listener)
+        if not _listeners:
+            _uninstall()
+
+
+class GitStats:
+    """Counts and times git invocations, grouped by subcommand.
+
+    Enabled for any csync command by setting ``CSYNC_GIT_STATS=1``; the
+    tests use it directly to hold hot paths to a spawn budget.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self._active = False
+
+    @classmethod
+    def from_env(cls):
+        """A started collector if ``CSYNC_GIT_STATS`` is set, else None."""
+        if os.environ.get("CSYNC_GIT_STATS", "").lower() in ("", "0", "false", "no"):
+            return None
+        return cls().start()
+
+    def _record(self, call: GitCall):
+        self.calls.append(call)
+
+    def start(self):
+        if not self._active:
+            add_listener(self._record)
+            self._active = True
+        return self
+
+    def stop(self):
+        if self._active:
+            remove_listener(self._record)
+            self._active = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def spawns(self) -> int:
+        """Number of git processes started."""
+        return sum(1 for call in self.calls if call.spawn)
+
+    @property
+    def network_round_trips(self) -> int:
+        return sum(1 for call in self.calls if call.spawn and call.network)
+
+    def by_subcommand(self):
+        """``{subcommand: (processes, seconds)}`` ordered by time spent."""
+        totals = {}
+        for call in self.calls:
+            if call.spawn:
+                name = call.subcommand or "?"
+            elif call.network:
+                # Remote-level round trip: attribute its time, not a second spawn
+                name = call.command[1]
+            else:
+                continue
+            count, seconds = totals.get(name, (0, 0.0))
+            totals[name] = (count + call.spawn, seconds + call.duration)
+        return dict(sorted(totals.items(), key=lambda item: -item[1][1]))
+
+    def print_summary(self, command: str):
+        table = Table(title=f"git processes for csync {command}", show_header=True)
+        table.add_column("Subcommand", style="cyan")
+        table.add_column("Processes", justify="right")
+        table.add_column("Time", style="yellow", justify="right")
+        for name, (count, seconds) in self.by_subcommand().items():
+            table.add_row(name, str(count), f"{seconds * 1000:.1f} ms")
+
+        # stderr keeps the report out of scripted stdout
+        console = Console(stderr=True)
+        console.print(table)
+        console.print(
+            f"[cyan]{self.spawns} git processes, "
+            f"{self.network_round_trips} network round trips[/cyan]"
+        )
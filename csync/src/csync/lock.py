@@ -0,0 +1,114 @@
+"""Cross-process serialization of sync runs."""
+
+import fcntl
+import json
+import os
+import time
+
+from rich.console import Console
+
+from csync.config import Config
+
+console = Console()
+
+
+class FileLock:
+    """Exclusive ``flock`` on a file, usable as a context manager."""
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+
+    def acquire(self, blocking=True) -> bool:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+        try:
+            fcntl.flock(fd, flags)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class SyncLock:
+    """Serializes sync runs and folds concurrent requests into one follow-up.
+
+    ``.sync/sync.lock`` is held for the duration of a run. A caller that
+    arrives mid-run queues on ``.sync/sync.queue``; whoever holds the queue
+    slot runs the follow-up sync, and every caller that requested a sync
+    before that run started is handed its result from ``.sync/sync-result.json``
+    instead of running again.
+    """
+
+    def __init__(self, config: Config):
+        self.config = config
+        self.run_lock = FileLock(config.sync_dir / "sync.lock")
+        self.queue_lock = FileLock(config.sync_dir / "sync.queue")
+        self.result_file = config.sync_dir / "sync-result.json"
+
+    def run(self, fn, coalesce=True, wait=True):
+        """Run ``fn`` under the lock, or share a run that started after us.
+
+        With ``wait=False`` a caller that finds a follow-up already queued
+        returns None immediately, since that follow-up will cover its request.
+        """
+        requested_at = time.time()
+
+        if not coalesce:
+            with self.run_lock:
+                return fn()
+
+        queued = self.queue_lock.acquire(blocking=False)
+        if not queued and not wait:
+            return None
+
+        try:
+            self.run_lock.acquire()
+        finally:
+            if queued:
+                self.queue_lock.release()
+
+        try:
+            shared = self._read_result()
+            if shared is not None and shared["started_at"] >= requested_at:
+                return shared["result"]
+
+            started_at = time.time()
+            result = fn()
+            self._write_result(started_at, result)
+            return result
+        finally:
+            self.run_lock.release()
+
+    def _read_result(self):
+        try:
+            data = json.loads(self.result_file.read_text())
+            return {"started_at": float(data["started_at"]), "result": data["result"]}
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _write_result(self, started_at, result):
+        data = {
+            "started_at": started_at,
+            "finished_at": time.time(),
+            "pid": os.getpid(),
+            "result": result,
+        }
+        tmp_file = self.result_file.with_suffix(".tmp")
+        tmp_file.write_text(json.dumps(data))
+        os.replace(tmp_file, self.result_file)
@@ -1,16 +1,28 @@
 """Management of marked external files for syncing."""
 
-import shutil
+import glob
+import os
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatch
 from pathlib import Path
 
 import git
 from rich.console import Console
 from rich.table import Table
 
+from csync import transfer
 from csync.config import Config
+from csync.copysync import CopySync
+from csync.marked_manifest import COPY
+from csync.marked_manifest import LINK
+from csync.marked_manifest import MarkedEntry
+from csync.marked_manifest import MarkedManifest
+from csync.staging import StagingVerifier
 
 console = Console()
 
+IGNORED = "ignored by .gitignore"
+
 
 class MarkedFilesManager:
     """Manages files marked for synchronization."""
@@ -19,105 +31,307 @@ class MarkedFilesManager:
         self.config = config
         self.repo = git.Repo(self.config.configs_dir)
 
-    def mark_file(self, file_path: str):
-        """Mark a file for syncing."""
-        file_path = Path(file_path).expanduser().resolve()
-
-        if not file_path.exists():
-            console.print(f"[red]❌ File not found: {file_path}[/red]")
-            return False
-
-        # Calculate relative path from HOME
-        rel_path = str(file_path.relative_to(Path.home()))
-
-        # Check if already marked
-        marked_files = self._get_marked_files()
-        if rel_path in marked_files:
-            console.print(f"[yellow]ℹ️  File already marked: {file_path}[/yellow]")
-            return True
+    def _expand(self, patterns):
+        """Paths named by ``patterns``; globs are expanded, plain paths kept.
 
-        external_path = self.config.external_dir / rel_path
-        external_path.parent.mkdir(parents=True, exist_ok=True)
-
-        # Copy file to external directory
-        if file_path.is_dir():
-            shutil.copytree(file_path, external_path, dirs_exist_ok=True)
-        else:
-            shutil.copy2(file_path, external_path)
-
-        # Create symlink
-        if file_path.exists():
-            if file_path.is_dir():
-                shutil.rmtree(file_path)
+        Unmatched globs are returned as-is so they get reported as missing.
+        """
+        paths = []
+        for pattern in patterns:
+            expanded = os.path.expanduser(pattern)
+            if glob.has_magic(expanded):
+                paths.extend(sorted(glob.glob(expanded)) or [expanded])
             else:
-                file_path.unlink()
+                paths.append(expanded)
+        return paths
 
-        file_path.symlink_to(external_path)
-
-        # Add to marked files list
-        marked_files.append(rel_path)
-        self._save_marked_files(marked_files)
-
-        # Add to git
-        self.repo.index.add([str(external_path), str(self.config.marked_files)])
-        self.repo.index.commit(f"Mark file for sync: {rel_path}")
-
-        console.print(f"[green]✅ Marked for sync: {file_path}[/green]")
-        console.print(f"   [cyan]Linked to: {external_path}[/cyan]")
-
-        return True
+    def _home_path(self, path: str) -> Path:
+        """Absolute path with only its parent resolved, so links stay links."""
+        path = Path(path)
+        return path.parent.resolve() / path.name
 
-    def unmark_file(self, file_path: str):
-        """Unmark a file from syncing."""
-        file_path = Path(file_path).expanduser().resolve()
-        rel_path = str(file_path.relative_to(Path.home()))
+    def _relative(self, file_path: Path):
+        try:
+            return file_path.relative_to(Path.home()).as_posix()
+        except ValueError:
+            return None
 
-        marked_files = self._get_marked_files()
-        if rel_path not in marked_files:
-            console.print(f"[yellow]ℹ️  File not marked: {file_path}[/yellow]")
-            return True
+    def _move_in(self, file_path: Path, external_path: Path):
+        """Move a file or directory into external/ and link it back.
 
-        external_path = self.config.external_dir / rel_path
+        A rename on the same filesystem, a kernel-side copy otherwise.
+        """
+        transfer.move(file_path, external_path)
+        file_path.symlink_to(external_path)
 
-        # Replace symlink with actual file
-        if file_path.is_symlink() and external_path.exists():
-            file_path.unlink()
-            if external_path.is_dir():
-                shutil.copytree(external_path, file_path)
+    def _copy_in(self, file_path: Path, external_path: Path):
+        """Copy a file or directory into external/, leaving $HOME as it is."""
+        external_path.parent.mkdir(parents=True, exist_ok=True)
+        transfer.copy_tree(file_path, external_path)
+
+    def _move_out(self, file_path: Path, external_path: Path, copy: bool = False):
+        """Put the marked content back in place of the link in $HOME.
+
+        Copy-mode entries already have a real copy in $HOME, so only the
+        one in external/ goes. A linked entry whose link is gone still has
+        its only copy in external/; it is moved home, or left where it is
+        if something else now sits in $HOME.
+        """
+        if copy:
+            if external_path.exists() or external_path.is_symlink():
+                transfer.remove(external_path)
+        elif external_path.exists():
+            if file_path.is_symlink():
+                file_path.unlink()
+            elif file_path.exists():
+                return
+            transfer.move(external_path, file_path)
+
+    def _run(self, action, jobs):
+        """Run ``action(file_path, external_path)`` for each job on a pool.
+
+        Returns ``{rel: error}`` for the jobs that raised.
+        """
+        failed = {}
+        if not jobs:
+            return failed
+        with ThreadPoolExecutor() as pool:
+            futures = {
+                rel: pool.submit(action, file_path, external_path)
+                for rel, file_path, external_path in jobs
+            }
+            for rel, future in futures.items():
+                try:
+                    future.result()
+                except OSError as error:
+                    failed[rel] = str(error)
+        return failed
+
+    def _commit(self, single: str, plural: str, rels):
+        """One commit naming the single path, or listing all of them."""
+        if len(rels) == 1:
+            self.repo.index.commit(f"{single}: {rels[0]}")
+        else:
+            listing = "\n".join(f"- {rel}" for rel in rels)
+            self.repo.index.commit(f"{plural.format(len(rels))}\n\n{listing}")
+
+    def _summary(self, title: str, done, skipped, failed):
+        table = Table(title=title, show_header=True)
+        table.add_column("Path", style="white")
+        table.add_column("Result", style="cyan")
+        for rel in done:
+            table.add_row(f"~/{rel}", "[green]done[/green]")
+        for path, reason in skipped:
+            table.add_row(path, f"[yellow]{reason}[/yellow]")
+        for rel, error in failed.items():
+            table.add_row(f"~/{rel}", f"[red]{error}[/red]")
+        console.print(table)
+        console.print(
+            f"[cyan]{len(done)} done, {len(skipped)} skipped, "
+            f"{len(failed)} failed[/cyan]"
+        )
+
+    def mark_files(self, patterns, copy: bool = False):
+        """Mark every path or glob match for syncing, in a single commit.
+
+        Files are moved into external/ on a thread pool; the manifest is
+        saved once and everything is staged into one commit. With ``copy``
+        $HOME keeps real files that sync copies both ways (see
+        ``copysync``) instead of links.
+        """
+        manifest = MarkedManifest.load(self.config.marked_files)
+        candidates = {}
+        skipped = []
+
+        for path in self._expand(patterns):
+            file_path = self._home_path(path)
+            rel_path = self._relative(file_path)
+            if rel_path is None:
+                skipped.append((str(file_path), "outside $HOME"))
+            elif not file_path.exists() and not file_path.is_symlink():
+                skipped.append((str(file_path), "not found"))
+            elif rel_path in manifest:
+                skipped.append((f"~/{rel_path}", "already marked"))
+            elif file_path.is_symlink():
+                skipped.append((f"~/{rel_path}", "is a symlink"))
             else:
-                shutil.copy2(external_path, file_path)
-
-        # Remove from marked files list
-        marked_files.remove(rel_path)
-        self._save_marked_files(marked_files)
+                candidates[rel_path] = file_path
 
-        # Remove from git
+        jobs = []
+        for rel_path, file_path in sorted(candidates.items()):
+            # A directory being marked carries everything under it
+            if any(rel_path.startswith(f"{rel}/") for rel, _, _ in jobs):
+                skipped.append((f"~/{rel_path}", "inside another marked path"))
+            else:
+                jobs.append((rel_path, file_path, self.config.external_dir / rel_path))
+
+        # git add refuses ignored paths; find them before anything moves
+        ignored = self._ignored([external_path for _, _, external_path in jobs])
+        for rel, _, external_path in jobs:
+            if external_path in ignored:
+                skipped.append((f"~/{rel}", IGNORED))
+        jobs = [job for job in jobs if job[2] not in ignored]
+
+        failed = self._run(self._copy_in if copy else self._move_in, jobs)
+        done = [rel for rel, _, _ in jobs if rel not in failed]
+
+        if done:
+            original = dict(manifest.entries)
+            mode = COPY if copy else LINK
+            for rel, _, external_path in jobs:
+                if rel not in failed:
+                    manifest.add(MarkedEntry.from_path(rel, external_path, mode))
+            manifest.save()
+            if copy:
+                # Both sides match now; record that as the sync baseline
+                CopySync(self.config).sync()
+            external = [str(self.config.external_dir / rel) for rel in done]
+            try:
+                # One "git add" for everything; index.add hashes file by file
+                self.repo.git.add("--", *external, str(self.config.marked_files))
+                self._commit("Mark file for sync", "Mark {} files for sync", done)
+            except git.GitCommandError as error:
+                console.print(f"[red]❌ Could not commit: {error}[/red]")
+                self._roll_back(jobs, done, copy, manifest, original)
+                failed.update((rel, "not committed, rolled back") for rel in done)
+                done = []
+
+        if len(jobs) == 1 and not skipped and done:
+            rel, file_path, external_path = jobs[0]
+            console.print(f"[green]✅ Marked for sync: {file_path}[/green]")
+            linked = "Copied to" if copy else "Linked to"
+            console.print(f"   [cyan]{linked}: {external_path}[/cyan]")
+        elif len(skipped) == 1 and not jobs and skipped[0][1] == "already marked":
+            console.print(f"[yellow]ℹ️  File already marked: {skipped[0][0]}[/yellow]")
+        else:
+            self._summary("Marked for sync", done, skipped, failed)
+
+        return not failed and not any(
+            reason in ("not found", "outside $HOME", IGNORED) for _, reason in skipped
+        )
+
+    def _ignored(self, external_paths):
+        """The paths among ``external_paths`` that the repo's ignore rules match."""
+        if not external_paths:
+            return set()
+        root = Path(self.repo.working_dir)
+        rels = {os.path.relpath(path, root): path for path in external_paths}
+        found = StagingVerifier(self.repo).find_ignored(list(rels))
+        return {rels[entry.path] for entry in found}
+
+    def _roll_back(self, jobs, done, copy, manifest, original):
+        """Undo a mark whose commit failed: content, manifest and index."""
+        self._run(
+            lambda file_path, external_path: self._move_out(
+                file_path, external_path, copy=copy
+            ),
+            [job for job in jobs if job[0] in done],
+        )
+        if copy:
+            copy_sync = CopySync(self.config)
+            for rel in done:
+                copy_sync.forget(rel)
+        manifest.entries = original
+        manifest.save()
+        external = [str(self.config.external_dir / rel) for rel in done]
         try:
-            self.repo.index.remove([str(external_path)], r=True)
-            self.repo.index.add([str(self.config.marked_files)])
-            self.repo.index.commit(f"Unmark file from sync: {rel_path}")
+            self.repo.git.reset("-q", "--", *external, str(self.config.marked_files))
         except git.GitCommandError:
             pass
 
-        console.print(f"[green]✅ Unmarked from sync: {file_path}[/green]")
+    def mark_file(self, file_path: str):
+        """Mark a file for syncing."""
+        return self.mark_files([file_path])
+
+    def unmark_files(self, patterns):
+        """Stop syncing every marked path matching ``patterns``, in one commit.
+
+        Globs are matched against the marked paths, so they work even when
+        the links in $HOME are gone.
+        """
+        manifest = MarkedManifest.load(self.config.marked_files)
+        jobs = []
+        skipped = []
+
+        for pattern in patterns:
+            file_path = self._home_path(os.path.expanduser(pattern))
+            rel_pattern = self._relative(file_path)
+            if rel_pattern is None:
+                skipped.append((str(file_path), "outside $HOME"))
+                continue
+            if glob.has_magic(rel_pattern):
+                found = [rel for rel in manifest.paths() if fnmatch(rel, rel_pattern)]
+            else:
+                found = [rel_pattern] if rel_pattern in manifest else []
+            if not found:
+                skipped.append((f"~/{rel_pattern}", "not marked"))
+            for rel in found:
+                if rel not in (job[0] for job in jobs):
+                    jobs.append(
+                        (rel, Path.home() / rel, self.config.external_dir / rel)
+                    )
+
+        copies = {
+            self.config.external_dir / rel
+            for rel, _, _ in jobs
+            if manifest.get(rel).sync == COPY
+        }
+        failed = self._run(
+            lambda file_path, external_path: self._move_out(
+                file_path, external_path, copy=external_path in copies
+            ),
+            jobs,
+        )
+        done = [rel for rel, _, _ in jobs if rel not in failed]
+
+        if done:
+            copy_sync = CopySync(self.config)
+            for rel in done:
+                if manifest.get(rel).sync == COPY:
+                    copy_sync.forget(rel)
+                manifest.remove(rel)
+            manifest.save()
+            try:
+                external = [str(self.config.external_dir / rel) for rel in done]
+                self.repo.index.remove(external, r=True)
+                self.repo.index.add([str(self.config.marked_files)])
+                self._commit("Unmark file from sync", "Unmark {} files from sync", done)
+            except git.GitCommandError:
+                pass
+
+        if len(jobs) == 1 and not skipped and done:
+            console.print(f"[green]✅ Unmarked from sync: {jobs[0][1]}[/green]")
+        elif len(skipped) == 1 and not jobs:
+            console.print(f"[yellow]ℹ️  File not marked: {skipped[0][0]}[/yellow]")
+        else:
+            self._summary("Unmarked from sync", done, skipped, failed)
 
-        return True
+        return not failed
+
+    def unmark_file(self, file_path: str):
+        """Unmark a file from syncing."""
+        return self.unmark_files([file_path])
 
     def list_marked(self):
         """List all marked files."""
-        marked_files = self._get_marked_files()
+        manifest = MarkedManifest.load(self.config.marked_files)
 
-        if not marked_files:
+        if not manifest:
             console.print("[yellow]No files marked for sync[/yellow]")
             return
 
         table = Table(title="Files Marked for Sync", show_header=True)
         table.add_column("Status", style="cyan", width=8)
         table.add_column("File Path", style="white")
+        table.add_column("Type", style="magenta")
 
-        for rel_path in marked_files:
-            file_path = Path.home() / rel_path
-            if file_path.is_symlink():
+        for entry in manifest:
+            file_path = Path.home() / entry.path
+            if entry.sync == COPY:
+                healthy = file_path.exists() and not file_path.is_symlink()
+            else:
+                healthy = file_path.is_symlink()
+            if healthy:
                 status = "✓"
                 style = "green"
             elif file_path.exists():
@@ -127,21 +341,9 @@ class MarkedFilesManager:
                 status = "✗"
                 style = "red"
 
-            table.add_row(f"[{style}]{status}[/{style}]", str(file_path))
+            kind = entry.type or "?"
+            if entry.sync == COPY:
+                kind += " (copy)"
+            table.add_row(f"[{style}]{status}[/{style}]", str(file_path), kind)
 
         console.print(table)
-
-    def _get_marked_files(self):
-        """Get list of marked files."""
-        if not self.config.marked_files.exists():
-            return []
-
-        content = self.config.marked_files.read_text().strip()
-        if not content:
-            return []
-
-        return [line for line in content.split("\n") if line]
-
-    def _save_marked_files(self, marked_files):
-        """Save marked files list."""
-        self.config.marked_files.write_text("\n".join(marked_files))
@@ -0,0 +1,151 @@
+"""The ``.marked-files`` manifest.
+
+Each marked path (relative to ``$HOME``) maps to what was marked: its type,
+permission bits, size and mtime. These come from ``lstat`` alone, so marking
+a large directory never reads its contents. The manifest is JSON, written
+atomically, and parsed at most once per process for as long as the file
+itself is unchanged. Older checkouts hold a plain newline-separated list;
+it is read as entries without metadata and rewritten as JSON on the next
+save.
+"""
+
+import json
+import os
+import stat
+from pathlib import Path
+
+VERSION = 1
+
+FILE = "file"
+DIR = "dir"
+SYMLINK = "symlink"
+
+# How an entry reaches $HOME: a symlink into external/, or a synced copy
+LINK = "link"
+COPY = "copy"
+
+# Parsed manifests by path, with the (mtime_ns, size) they were read at
+_cache = {}
+
+
+class MarkedEntry:
+    """One marked path and what it held when it was marked."""
+
+    def __init__(
+        self,
+        path: str,
+        type=None,
+        mode=None,
+        size=None,
+        mtime=None,
+        sync=LINK,
+        hash=None,
+    ):
+        self.path = path
+        self.type = type
+        self.mode = mode
+        self.size = size
+        self.mtime = mtime
+        self.sync = sync
+        # Content hash written by older versions; kept, never computed
+        self.hash = hash
+
+    @classmethod
+    def from_path(cls, rel: str, source: Path, sync: str = LINK):
+        """Describe ``source``, the content being marked as ``rel``."""
+        st = source.lstat()
+        if stat.S_ISLNK(st.st_mode):
+            kind, size = SYMLINK, 0
+        elif stat.S_ISDIR(st.st_mode):
+            kind = DIR
+            size = sum(
+                os.lstat(os.path.join(dirpath, name)).st_size
+                for dirpath, _, filenames in os.walk(source)
+                for name in filenames
+            )
+        else:
+            kind, size = FILE, st.st_size
+        mode = stat.S_IMODE(st.st_mode)
+        return cls(rel, kind, mode, size, st.st_mtime_ns, sync)
+
+    def to_json(self):
+        data = {
+            "type": self.type,
+            "mode": self.mode,
+            "size": self.size,
+            "mtime": self.mtime,
+            "sync": self.sync,
+        }
+        if self.hash is not None:
+            data["hash"] = self.hash
+        return data
+
+
+class MarkedManifest:
+    """Marked entries indexed by path, in the order they were marked."""
+
+    def __init__(self, path: Path, entries=None):
+        self.path = Path(path)
+        self.entries = entries if entries is not None else {}
+
+    @classmethod
+    def load(cls, path: Path):
+        """The manifest at ``path``, parsed only if it changed since last time."""
+        path = Path(path)
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            _cache.pop(path, None)
+            return cls(path)
+        key = (st.st_mtime_ns, st.st_size)
+        cached = _cache.get(path)
+        if cached is None or cached[0] != key:
+            cached = (key, cls._parse(path.read_text()))
+            _cache[path] = cached
+        # Callers may add and remove entries; never hand out the cached dict
+        return cls(path, dict(cached[1]))
+
+    @staticmethod
+    def _parse(text: str):
+        text = text.strip()
+        if not text.startswith("{"):
+            # The plain list used before entries carried metadata
+            return {line: MarkedEntry(line) for line in text.splitlines() if line}
+        data = json.loads(text)
+        return {
+            rel: MarkedEntry(rel, **fields) for rel, fields in data["entries"].items()
+        }
+
+    def __contains__(self, rel: str) -> bool:
+        return rel in self.entries
+
+    def __iter__(self):
+        return iter(self.entries.values())
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def paths(self):
+        return list(self.entries)
+
+    def get(self, rel: str):
+        return self.entries.get(rel)
+
+    def add(self, entry: MarkedEntry):
+        self.entries[entry.path] = entry
+
+    def remove(self, rel: str):
+        self.entries.pop(rel, None)
+
+    def save(self):
+        """Write the manifest atomically and keep it as the cached copy."""
+        data = {
+            "version": VERSION,
+            "entries": {rel: e.to_json() for rel, e in self.entries.items()},
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f".{self.path.name}.tmp")
+        tmp.write_text(json.dumps(data, indent=2) + "\n")
+        os.replace(tmp, self.path)
+        st = self.path.stat()
+        _cache[self.path] = ((st.st_mtime_ns, st.st_size), dict(self.entries))
@@ -0,0 +1,194 @@
+"""Concurrent synchronization of several config repositories."""
+
+import contextvars
+import io
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from rich.console import Console
+from rich.table import Table
+
+from csync.config import Config
+from csync.session import SyncSession
+from csync.symlinks import SymlinkManager
+from csync.sync import Syncer
+
+console = Console()
+
+# Where console output of the current repository's sync is collected
+_repo_output = contextvars.ContextVar("repo_output", default=None)
+
+
+class RepoSyncResult:
+    """Outcome of syncing one repository."""
+
+    def __init__(self, config: Config, ok: bool, duration: float, error=None):
+        self.config = config
+        self.ok = ok
+        self.duration = duration
+        self.error = error
+
+
+class _RepoOutput(io.TextIOBase):
+    """Console file that writes to the current repository's buffer, if any.
+
+    The buffer is a context variable, so it follows a sync into the threads
+    it starts with a copied context; output outside a sync goes straight
+    through.
+    """
+
+    def __init__(self, target):
+        self.target = target
+
+    def write(self, text):
+        return (_repo_output.get() or self.target).write(text)
+
+    def flush(self):
+        self.target.flush()
+
+    def isatty(self):
+        return self.target.isatty()
+
+    def fileno(self):
+        return self.target.fileno()
+
+
+@contextmanager
+def _grouped_output():
+    """Route every csync console through one :class:`_RepoOutput`."""
+    output = _RepoOutput(sys.stdout)
+    consoles = [
+        module.console
+        for name, module in list(sys.modules.items())
+        if name.startswith("csync.")
+        and isinstance(getattr(module, "console", None), Console)
+        and module.console is not console
+    ]
+    for each in consoles:
+        each.file = output
+    try:
+        yield
+    finally:
+        for each in consoles:
+            # Back to following sys.stdout, as they were created
+            each.file = None
+
+
+class MultiSyncer:
+    """Syncs a list of repositories on a bounded worker pool.
+
+    Each repository gets its own session, lock and git process, so the
+    network round trips overlap and wall-clock time tracks the slowest repo
+    rather than the sum of all of them. A repository's output is held back
+    and printed as one block when its sync ends.
+    """
+
+    def __init__(self, configs, max_workers: int = 4):
+        self.configs = list(configs)
+        self.max_workers = max(1, min(max_workers, len(self.configs) or 1))
+        self._print_lock = threading.Lock()
+
+    def _sync_one(
+        self, config: Config, dry_run: bool, background: bool
+    ) -> RepoSyncResult:
+        buffer = io.StringIO()
+        token = _repo_output.set(buffer)
+        try:
+            return self._run_one(config, dry_run, background)
+        finally:
+            _repo_output.reset(token)
+            self._print_block(config, buffer.getvalue())
+
+    def _run_one(self, config: Config, dry_run: bool, background: bool):
+        start = time.perf_counter()
+        if not config.configs_dir.exists():
+            error = FileNotFoundError(f"{config.configs_dir} does not exist")
+            return RepoSyncResult(config, False, 0.0, error)
+        try:
+            # ~/.zshrc and ~/.direnvrc are shared; they're linked once, after
+            syncer = Syncer(config, session=SyncSession(config), symlinks=False)
+            ok = syncer.sync(dry_run=dry_run, background=background)
+            return RepoSyncResult(config, ok, time.perf_counter() - start)
+        except Exception as e:
+            config.update_sync_status("✗")
+            return RepoSyncResult(config, False, time.perf_counter() - start, e)
+
+    def _print_block(self, config: Config, text: str):
+        if not text:
+            return
+        with self._print_lock:
+            console.rule(f"[cyan]{config.name}[/cyan]", align="left")
+            console.file.write(text)
+            console.file.flush()
+
+    def _link_primary(self, results):
+        """Create the standard symlinks for the detected configs repo only."""
+        primary = Config().configs_dir.resolve()
+        for result in results:
+            if result.ok and result.config.configs_dir.resolve() == primary:
+                SymlinkManager(result.config).create_symlinks()
+
+    def sync_all(self, dry_run: bool = False, background: bool = False):
+        """Sync every repository concurrently and print a combined summary.
+
+        Each repository is synced as a single-repo ``csync sync`` would be:
+        interactive runs take backups, ``background`` runs skip them. The
+        shared symlinks in $HOME are refreshed once, from the primary repo,
+        after every sync has finished.
+        """
+        console.print(
+            f"[blue]🔄 Syncing {len(self.configs)} repositories "
+            f"({self.max_workers} at a time)...[/blue]"
+        )
+        start = time.perf_counter()
+        with _grouped_output():
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                results = list(
+                    pool.map(
+                        lambda config: self._sync_one(config, dry_run, background),
+                        self.configs,
+                    )
+                )
+        if not (dry_run or background):
+            self._link_primary(results)
+        self.print_summary(results, time.perf_counter() - start)
+        return results
+
+    @staticmethod
+    def print_summary(results, elapsed: float):
+        table = Table(title="Repository Sync Summary", show_header=True)
+        table.add_column("Repository", style="cyan")
+        table.add_column("Branch", style="white")
+        table.add_column("Result", width=10)
+        table.add_column("Time", style="yellow", justify="right")
+        table.add_column("Details", style="white")
+
+        for result in results:
+            status = "[green]✓ synced[/green]" if result.ok else "[red]✗ failed[/red]"
+            if result.error:
+                details = str(result.error)
+            else:
+                details = str(result.config.configs_dir)
+            table.add_row(
+                result.config.name,
+                result.config.branch,
+                status,
+                f"{result.duration:.1f}s",
+                details,
+            )
+
+        console.print(table)
+        failed = sum(1 for result in results if not result.ok)
+        if failed:
+            console.print(
+                f"[red]❌ {failed} of {len(results)} repositories failed "
+                f"({elapsed:.1f}s total)[/red]"
+            )
+        else:
+            console.print(
+                f"[green]✅ All {len(results)} repositories synced "
+                f"({elapsed:.1f}s total)[/green]"
+            )
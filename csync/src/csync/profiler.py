@@ -0,0 +1,180 @@
+"""Per-phase timing of csync commands with Chrome trace export."""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextlib import nullcontext
+
+from rich.console import Console
+from rich.table import Table
+
+from csync import gittrace
+
+console = Console()
+
+
+class PhaseRecord:
+    """Wall and CPU time spent in one named phase."""
+
+    def __init__(self, name: str, start: float, depth: int):
+        self.name = name
+        self.start = start
+        self.end = start
+        self.cpu = 0.0
+        self.depth = depth
+        self.thread_id = threading.get_ident()
+        self.git_calls = []
+
+    @property
+    def wall(self) -> float:
+        return self.end - self.start
+
+
+class Profiler:
+    """Records phases and the git commands spawned inside them.
+
+    A disabled profiler (the default everywhere) costs one attribute lookup
+    per phase. When enabled, every git invocation is attributed to the
+    innermost phase open on the calling thread.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.phases = []
+        self.git_calls = []
+        self._stacks = threading.local()
+        self._origin = time.perf_counter()
+        self._tracing = False
+
+    @classmethod
+    def disabled(cls):
+        return cls(enabled=False)
+
+    def start(self):
+        """Begin observing git invocations."""
+        if self.enabled and not self._tracing:
+            gittrace.add_listener(self._on_git_call)
+            self._tracing = True
+        return self
+
+    def stop(self):
+        if self._tracing:
+            gittrace.remove_listener(self._on_git_call)
+            self._tracing = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _stack(self):
+        if not hasattr(self._stacks, "phases"):
+            self._stacks.phases = []
+        return self._stacks.phases
+
+    def _on_git_call(self, call):
+        self.git_calls.append(call)
+        stack = self._stack()
+        if stack:
+            stack[-1].git_calls.append(call)
+
+    def phase(self, name: str):
+        """Context manager timing the enclosed block as ``name``."""
+        if not self.enabled:
+            return nullcontext()
+        return self._phase(name)
+
+    @contextmanager
+    def _phase(self, name: str):
+        stack = self._stack()
+        record = PhaseRecord(name, time.perf_counter(), len(stack))
+        cpu_start = time.thread_time()
+        stack.append(record)
+        try:
+            yield record
+        finally:
+            stack.pop()
+            record.end = time.perf_counter()
+            record.cpu = time.thread_time() - cpu_start
+            self.phases.append(record)
+
+    def _micros(self, timestamp: float) -> int:
+        return int((timestamp - self._origin) * 1_000_000)
+
+    def chrome_trace(self):
+        """Trace-event JSON understood by chrome://tracing and Perfetto."""
+        pid = os.getpid()
+        events = [
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": pid,
+                "args": {"name": "csync"},
+            }
+        ]
+        for record in sorted(self.phases, key=lambda r: r.start):
+            events.append(
+                {
+                    "name": record.name,
+                    "cat": "phase",
+                    "ph": "X",
+                    "ts": self._micros(record.start),
+                    "dur": self._micros(record.end) - self._micros(record.start),
+                    "pid": pid,
+                    "tid": record.thread_id,
+                    "args": {
+                        "cpu_ms": round(record.cpu * 1000, 3),
+                        "git_commands": sum(1 for c in record.git_calls if c.spawn),
+                    },
+                }
+            )
+        for call in self.git_calls:
+            events.append(
+                {
+                    "name": call.label,
+                    "cat": "network" if call.network else "git",
+                    "ph": "X",
+                    "ts": self._micros(call.start),
+                    "dur": self._micros(call.end) - self._micros(call.start),
+                    "pid": pid,
+                    "tid": call.thread_id,
+                    "args": {"argv": call.command, "spawn": call.spawn},
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.chrome_trace()))
+        return path
+
+    def print_summary(self, title: str = "Profile"):
+        """Print wall/CPU time and git activity per phase."""
+        table = Table(title=title, show_header=True)
+        table.add_column("Phase", style="cyan")
+        table.add_column("Wall", style="yellow", justify="right")
+        table.add_column("CPU", style="green", justify="right")
+        table.add_column("Git cmds", justify="right")
+        table.add_column("Git time", style="magenta", justify="right")
+
+        for record in sorted(self.phases, key=lambda r: r.start):
+            spawns = [call for call in record.git_calls if call.spawn]
+            # Network records carry the real duration of async spawns
+            git_time = sum(call.duration for call in record.git_calls)
+            table.add_row(
+                "  " * record.depth + record.name,
+                f"{record.wall * 1000:.1f} ms",
+                f"{record.cpu * 1000:.1f} ms",
+                str(len(spawns)),
+                f"{git_time * 1000:.1f} ms",
+            )
+
+        console.print(table)
+        spawns = sum(1 for call in self.git_calls if call.spawn)
+        network = sum(1 for call in self.git_calls if call.network and call.spawn)
+        console.print(
+            f"[cyan]git processes: {spawns} ({network} network round trips)[/cyan]"
+        )
@@ -0,0 +1,111 @@
+"""Reconciliation of marked-file links in ``$HOME``.
+
+The desired state is one symlink per marked entry, from ``~/<path>`` to
+``external/<path>``. Each entry is checked with a single ``readlink`` (plus
+an ``lstat`` of the external copy) instead of ``resolve()``, which walks
+every path component; checks and fixes run on a thread pool, and only
+entries that differ are touched.
+"""
+
+import errno
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from csync.config import Config
+from csync.marked_manifest import COPY
+from csync.marked_manifest import MarkedManifest
+
+OK = "ok"
+LINK = "link"
+RELINK = "relink"
+REPLACE = "replace"
+MISSING = "missing"
+CONFLICT = "conflict"
+
+# Actions that change something in $HOME
+CHANGES = (LINK, RELINK, REPLACE)
+
+
+class LinkAction:
+    """What reconciling one marked entry needs, or did."""
+
+    def __init__(self, path: str, action: str, link: Path, target: Path):
+        self.path = path
+        self.action = action
+        self.link = link
+        self.target = target
+        self.error = None
+
+
+class LinkReconciler:
+    """Brings the marked-file links in ``$HOME`` in line with the manifest."""
+
+    def __init__(self, config: Config, home: Path = None, workers: int = None):
+        self.config = config
+        self.home = Path(home) if home is not None else Path.home()
+        self.workers = workers
+
+    def desired(self):
+        """``(path, link, target)`` for every linked (not copied) entry."""
+        manifest = MarkedManifest.load(self.config.marked_files)
+        return [
+            (entry.path, self.home / entry.path, self.config.external_dir / entry.path)
+            for entry in manifest
+            if entry.sync != COPY
+        ]
+
+    def check(self, rel: str, link: Path, target: Path) -> LinkAction:
+        """Compare one entry's actual state with the desired link."""
+        try:
+            os.lstat(target)
+        except FileNotFoundError:
+            return LinkAction(rel, MISSING, link, target)
+
+        try:
+            current = os.readlink(link)
+        except FileNotFoundError:
+            return LinkAction(rel, LINK, link, target)
+        except OSError as error:
+            if error.errno != errno.EINVAL:
+                raise
+            # Something real is in the way; files are replaced, dirs kept
+            if stat.S_ISDIR(os.lstat(link).st_mode):
+                return LinkAction(rel, CONFLICT, link, target)
+            return LinkAction(rel, REPLACE, link, target)
+
+        if current == str(target):
+            return LinkAction(rel, OK, link, target)
+        # Relative or differently spelled links may still point at the target
+        if os.path.realpath(link) == os.path.realpath(target):
+            return LinkAction(rel, OK, link, target)
+        return LinkAction(rel, RELINK, link, target)
+
+    def apply(self, action: LinkAction) -> LinkAction:
+        """Create or fix one link; errors are recorded on the action."""
+        try:
+            action.link.parent.mkdir(parents=True, exist_ok=True)
+            if action.action in (RELINK, REPLACE):
+                action.link.unlink()
+            action.link.symlink_to(action.target)
+        except OSError as error:
+            action.error = str(error)
+        return action
+
+    def plan(self):
+        """Check every entry in parallel; one action per entry, in order."""
+        desired = self.desired()
+        if not desired:
+            return []
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(lambda entry: self.check(*entry), desired))
+
+    def reconcile(self, dry_run: bool = False):
+        """Fix every entry that differs and return the full action list."""
+        actions = self.plan()
+        pending = [action for action in actions if action.action in CHANGES]
+        if pending and not dry_run:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                list(pool.map(self.apply, pending))
+        return actions
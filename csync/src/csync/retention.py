@@ -0,0 +1,101 @@
+"""Tiered backup retention with a disk budget.
+
+The newest ``last`` backups are always kept. Beyond those, the newest
+backup of each of the ``hourly`` most recent hours that have backups is
+kept, and likewise for ``daily`` days and ``weekly`` ISO weeks. If what
+is kept still takes more than ``max_bytes`` on disk, the oldest backups go
+first; the newest backup is never removed.
+"""
+
+import re
+
+DEFAULT_POLICY = "last=5,hourly=24,daily=7,weekly=4"
+DEFAULT_MAX_SIZE = "1G"
+
+_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+
+def parse_size(text: str) -> int:
+    """Parse sizes like ``500M`` or ``2G``; ``0`` or empty means no limit."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)i?B?\s*", text or "0", re.I)
+    if not match:
+        raise ValueError(f"Invalid size: {text!r}")
+    number, unit = match.groups()
+    return int(float(number) * _UNITS[unit.upper()])
+
+
+class RetentionPolicy:
+    """Decides which backups to keep."""
+
+    TIERS = ("hourly", "daily", "weekly")
+
+    def __init__(self, last=5, hourly=24, daily=7, weekly=4, max_bytes=0):
+        self.last = last
+        self.hourly = hourly
+        self.daily = daily
+        self.weekly = weekly
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def parse(cls, spec: str = DEFAULT_POLICY, max_size: str = DEFAULT_MAX_SIZE):
+        """Build a policy from ``last=5,hourly=24,...`` and a size budget."""
+        counts = {}
+        for part in filter(None, (p.strip() for p in spec.split(","))):
+            key, _, value = part.partition("=")
+            if key not in ("last",) + cls.TIERS or not value.isdigit():
+                raise ValueError(f"Invalid retention rule: {part!r}")
+            counts[key] = int(value)
+        return cls(max_bytes=parse_size(max_size), **counts)
+
+    @classmethod
+    def from_config(cls, config):
+        return cls.parse(config.backup_retention, config.backup_max_size)
+
+    @staticmethod
+    def _bucket(tier: str, created):
+        if tier == "hourly":
+            return created.strftime("%Y%m%d%H")
+        if tier == "daily":
+            return created.strftime("%Y%m%d")
+        year, week, _ = created.isocalendar()
+        return f"{year}-{week}"
+
+    def select(self, backups, measure=None):
+        """Split backups into ``(keep, remove)`` lists.
+
+        ``backups`` are oldest first and need ``created`` and ``size``; both
+        returned lists are oldest first too. ``measure(backups)`` gives the
+        bytes a set of backups takes together, for backups that share data;
+        it is only asked once the sum of their sizes exceeds the budget.
+        """
+        newest_first = list(reversed(backups))
+        keep = set(range(min(self.last, len(newest_first))))
+
+        for tier in self.TIERS:
+            remaining = getattr(self, tier)
+            seen = set()
+            for position, backup in enumerate(newest_first):
+                if remaining <= 0:
+                    break
+                bucket = self._bucket(tier, backup.created)
+                if bucket in seen:
+                    continue
+                seen.add(bucket)
+                keep.add(position)
+                remaining -= 1
+
+        if newest_first:
+            keep.add(0)
+
+        if self.max_bytes and sum(newest_first[p].size for p in keep) > self.max_bytes:
+            measure = measure or (lambda chosen: sum(b.size for b in chosen))
+            for position in sorted(keep, reverse=True):
+                if position == 0:
+                    break
+                if measure([newest_first[p] for p in keep]) <= self.max_bytes:
+                    break
+                keep.discard(position)
+
+        kept = [b for p, b in enumerate(newest_first) if p in keep]
+        removed = [b for p, b in enumerate(newest_first) if p not in keep]
+        return kept[::-1], removed[::-1]
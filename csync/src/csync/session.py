@@ -0,0 +1,131 @@
+"""Shared remote state for a single csync run."""
+
+import json
+import time
+
+import git
+from rich.console import Console
+
+from csync.config import Config
+
+console = Console()
+
+
+class RemoteSnapshot:
+    """Remote ref state captured by a single fetch."""
+
+    def __init__(self, refs: dict, fetched_at: float):
+        self.refs = refs
+        self.fetched_at = fetched_at
+
+    def age(self) -> float:
+        """Seconds since the snapshot was fetched."""
+        return time.time() - self.fetched_at
+
+    def to_dict(self):
+        return {"fetched_at": self.fetched_at, "refs": self.refs}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(dict(data["refs"]), float(data["fetched_at"]))
+
+
+class SyncSession:
+    """Fetches origin once and shares the resulting ref snapshot.
+
+    The snapshot is also persisted to ``.sync/remote-snapshot.json`` so that
+    later commands reuse it until ``Config.fetch_ttl`` seconds have passed.
+    """
+
+    def __init__(self, config: Config, repo: git.Repo = None, ttl: float = None):
+        self.config = config
+        self._repo = repo
+        self._ttl = ttl
+        self.snapshot = None
+
+    @property
+    def repo(self) -> git.Repo:
+        if self._repo is None:
+            self._repo = git.Repo(self.config.configs_dir)
+        return self._repo
+
+    @repo.setter
+    def repo(self, repo: git.Repo):
+        self._repo = repo
+
+    @property
+    def ttl(self) -> float:
+        if self._ttl is None:
+            self._ttl = self.config.fetch_ttl
+        return self._ttl
+
+    def fetch(self, force=False) -> RemoteSnapshot:
+        """Return the remote snapshot, fetching only if the cached one expired."""
+        if not force:
+            snapshot = self.snapshot or self._load_snapshot()
+            if snapshot is not None and snapshot.age() < self.ttl:
+                self.snapshot = snapshot
+                return snapshot
+
+        self.repo.remotes.origin.fetch()
+        self.snapshot = RemoteSnapshot(self._read_remote_refs(), time.time())
+        self._save_snapshot()
+        return self.snapshot
+
+    def cached(self) -> RemoteSnapshot:
+        """Return the snapshot if it is still fresh, without touching the network."""
+        snapshot = self.snapshot or self._load_snapshot()
+        if snapshot is not None and snapshot.age() < self.ttl:
+            self.snapshot = snapshot
+            return snapshot
+        return None
+
+    def remote_sha(self, branch: str) -> str:
+        """Hex SHA of ``origin/<branch>`` according to the snapshot."""
+        if self.snapshot is None:
+            self.fetch()
+        return self.snapshot.refs[branch]
+
+    def remote_commit(self, branch: str) -> git.Commit:
+        """Commit object for ``origin/<branch>`` according to the snapshot."""
+        return self.repo.commit(self.remote_sha(branch))
+
+    def record_push(self, branch: str):
+        """Update the snapshot after a push moved ``origin/<branch>``."""
+        if self.snapshot is None:
+            return
+        self.snapshot.refs[branch] = self.repo.remotes.origin.refs[branch].commit.hexsha
+        self._save_snapshot()
+
+    def invalidate(self):
+        """Drop the cached snapshot so the next call fetches again."""
+        self.snapshot = None
+        try:
+            self.config.remote_snapshot_file.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _read_remote_refs(self):
+        refs = {}
+        for ref in self.repo.remotes.origin.refs:
+            try:
+                refs[ref.remote_head] = ref.commit.hexsha
+            except ValueError:
+                continue
+        return refs
+
+    def _load_snapshot(self):
+        try:
+            data = json.loads(self.config.remote_snapshot_file.read_text())
+            return RemoteSnapshot.from_dict(data)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _save_snapshot(self):
+        try:
+            self.config.sync_dir.mkdir(parents=True, exist_ok=True)
+            self.config.remote_snapshot_file.write_text(
+                json.dumps(self.snapshot.to_dict())
+            )
+        except OSError as e:
+            console.print(f"[yellow]⚠️  Could not cache remote state: {e}[/yellow]")
@@ -0,0 +1,92 @@
+"""Verification that staged changes respect the repository's ignore rules."""
+
+import tempfile
+
+import git
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+
+class IgnoredStagedPath:
+    """A staged path that the repository's ignore rules would exclude."""
+
+    def __init__(self, path: str, source: str, line: str, pattern: str):
+        self.path = path
+        self.source = source
+        self.line = line
+        self.pattern = pattern
+
+    @property
+    def rule(self) -> str:
+        return f"{self.source}:{self.line}"
+
+
+class StagingVerifier:
+    """Checks newly staged files against the real ignore rules in one pass.
+
+    Only paths the index adds are checked: git never applies ignore rules
+    to files that are already tracked, so editing a tracked file that
+    happens to match .gitignore is fine. The new paths are matched with
+    ``git check-ignore --no-index`` against .gitignore, .git/info/exclude
+    and core.excludesFile exactly as git would for untracked files.
+    """
+
+    def __init__(self, repo: git.Repo):
+        self.repo = repo
+
+    def staged_paths(self):
+        """Paths the index adds, i.e. that HEAD does not track yet."""
+        output = self.repo.git.diff(
+            "--cached", "--name-only", "-z", "--no-renames", "--diff-filter=A"
+        )
+        return [path for path in output.split("\0") if path]
+
+    def find_ignored(self, paths=None):
+        """Return an IgnoredStagedPath for every newly staged ignored path."""
+        if paths is None:
+            paths = self.staged_paths()
+        if not paths:
+            return []
+
+        with tempfile.TemporaryFile() as stdin:
+            stdin.write(b"\0".join(path.encode() for path in paths) + b"\0")
+            stdin.seek(0)
+            # Exit status 1 just means nothing matched
+            _, output, _ = self.repo.git.check_ignore(
+                "--stdin",
+                "-z",
+                "--verbose",
+                "--no-index",
+                istream=stdin,
+                with_extended_output=True,
+                with_exceptions=False,
+            )
+
+        fields = output.split("\0")
+        ignored = []
+        for i in range(0, len(fields) - 3, 4):
+            source, line, pattern, path = fields[i : i + 4]
+            # --verbose also reports paths re-included by a negated pattern
+            if pattern.startswith("!"):
+                continue
+            ignored.append(IgnoredStagedPath(path, source, line, pattern))
+        return ignored
+
+    @staticmethod
+    def report(ignored):
+        """Print which rule excludes each offending staged path."""
+        table = Table(title="Staged Files Matching Ignore Rules", show_header=True)
+        table.add_column("Staged Path", style="red")
+        table.add_column("Rule", style="cyan")
+        table.add_column("Pattern", style="yellow")
+
+        for entry in ignored:
+            table.add_row(entry.path, entry.rule, entry.pattern)
+
+        console.print(table)
+        console.print(
+            "[yellow]💡 Untrack them with: git rm --cached <path>, "
+            "or adjust .gitignore[/yellow]"
+        )
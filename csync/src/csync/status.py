@@ -6,7 +6,13 @@ import git
 from rich.console import Console
 from rich.panel import Panel
 
+from csync.backup import BackupManager
 from csync.config import Config
+from csync.marked_manifest import MarkedManifest
+from csync.profiler import Profiler
+from csync.reconcile import OK
+from csync.reconcile import LinkReconciler
+from csync.session import SyncSession
 
 console = Console()
 
@@ -14,12 +20,18 @@ console = Console()
 class StatusDisplay:
     """Displays sync status information."""
 
-    def __init__(self, config: Config):
+    def __init__(
+        self, config: Config, session: SyncSession = None, profiler: Profiler = None
+    ):
         self.config = config
+        self.profiler = profiler if profiler is not None else Profiler.disabled()
         try:
             self.repo = git.Repo(self.config.configs_dir)
-        except git.InvalidGitRepositoryError:
+        except (git.InvalidGitRepositoryError, git.NoSuchPathError):
             self.repo = None
+        self.session = session if session is not None else SyncSession(config)
+        if self.repo is not None and session is None:
+            self.session.repo = self.repo
 
     def check_sync_status(self):
         """Check current sync status."""
@@ -27,10 +39,10 @@ class StatusDisplay:
             return "no-repo"
 
         try:
-            self.repo.remotes.origin.fetch()
+            self.session.fetch()
 
             local = self.repo.head.commit
-            remote = self.repo.remotes.origin.refs[self.config.branch].commit
+            remote = self.session.remote_commit(self.config.branch)
             base = self.repo.merge_base(local, remote)[0]
 
             if local == remote:
@@ -64,23 +76,9 @@ class StatusDisplay:
                     pass
 
         # Check marked files symlinks
-        if self.config.marked_files.exists():
-            marked_files = [
-                f for f in self.config.marked_files.read_text().strip().split("\n") if f
-            ]
-            for rel_path in marked_files:
-                file_path = Path.home() / rel_path
-                external_path = self.config.external_dir / rel_path
-
-                if file_path.is_symlink() and file_path.exists():
-                    try:
-                        resolved = file_path.resolve()
-                        if resolved == external_path.resolve():
-                            symlinks.append(
-                                (f"~/{rel_path}", f"configs/external/{rel_path}")
-                            )
-                    except Exception:
-                        pass
+        for action in LinkReconciler(self.config).plan():
+            if action.action == OK:
+                symlinks.append((f"~/{action.path}", f"configs/external/{action.path}"))
 
         return symlinks
 
@@ -98,7 +96,8 @@ class StatusDisplay:
         status_info.append("")
 
         # Sync status
-        status = self.check_sync_status()
+        with self.profiler.phase("sync-status"):
+            status = self.check_sync_status()
         status_info.append("[bold cyan]📊 Sync Status[/bold cyan]")
 
         status_messages = {
@@ -121,12 +120,8 @@ class StatusDisplay:
 
         # Marked files
         status_info.append("[bold cyan]📁 Marked Files[/bold cyan]")
-        marked_count = 0
-        if self.config.marked_files.exists():
-            marked_files = [
-                f for f in self.config.marked_files.read_text().strip().split("\n") if f
-            ]
-            marked_count = len(marked_files)
+        marked_files = MarkedManifest.load(self.config.marked_files).paths()
+        marked_count = len(marked_files)
 
         status_info.append(f"  Count: {marked_count} files")
 
@@ -137,7 +132,8 @@ class StatusDisplay:
 
         # Symlinked files
         status_info.append("[bold cyan]🔗 Symlinked Files[/bold cyan]")
-        symlinks = self._get_symlinked_files()
+        with self.profiler.phase("symlinks"):
+            symlinks = self._get_symlinked_files()
         symlink_count = len(symlinks)
         status_info.append(f"  Count: {symlink_count} symlinks")
 
@@ -150,20 +146,26 @@ class StatusDisplay:
 
         # Backups
         status_info.append("[bold cyan]💾 Backups[/bold cyan]")
-        backups = list(self.config.backup_dir.glob("backup-*.tar.gz"))
+        with self.profiler.phase("backups"):
+            backups = BackupManager(self.config).backups()
         backup_count = len(backups)
         status_info.append(f"  Count: {backup_count} backups")
 
         if backup_count > 0:
-            latest = sorted(backups)[-1]
+            latest = backups[-1]
             status_info.append(f"  Latest: {latest.name}")
+            total = sum(backup.size for backup in backups)
+            status_info.append(f"  Disk usage: {total / 1024 / 1024:.1f} MB")
         status_info.append("")
 
         # Git status
         if self.repo:
             status_info.append("[bold cyan]🔧 Git Status[/bold cyan]")
             status_info.append(f"  Branch: {self.config.branch}")
-            changes = len(self.repo.index.diff(None)) + len(self.repo.untracked_files)
+            with self.profiler.phase("git-status"):
+                changes = len(self.repo.index.diff(None)) + len(
+                    self.repo.untracked_files
+                )
             status_info.append(f"  Uncommitted changes: {changes}")
 
         # Display in a nice panel
@@ -1,84 +1,286 @@
 """Core synchronization functionality."""
 
-import tarfile
+import contextvars
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
 import git
 from rich.console import Console
 
+from csync.backup import BackupManager
 from csync.config import Config
+from csync.copysync import CONFLICT as COPY_CONFLICT
+from csync.copysync import CONFLICT_SUFFIX
+from csync.copysync import CopySync
+from csync.lock import SyncLock
+from csync.profiler import Profiler
+from csync.reconcile import CHANGES
+from csync.reconcile import CONFLICT
+from csync.reconcile import MISSING
+from csync.reconcile import LinkReconciler
+from csync.session import SyncSession
+from csync.staging import StagingVerifier
 
 console = Console()
 
+CLONE_MODES = ("blobless", "shallow", "full")
+# First git with "fetch --refetch", used to fill in a blobless clone
+REFETCH_GIT_VERSION = (2, 36)
+
+# PushInfo flags meaning the branch did not reach the remote
+PUSH_FAILED = git.PushInfo.REJECTED | git.PushInfo.REMOTE_REJECTED | git.PushInfo.ERROR
+
 
 class Syncer:
     """Handles all synchronization operations."""
 
-    def __init__(self, config: Config):
+    def __init__(
+        self,
+        config: Config,
+        session: SyncSession = None,
+        profiler: Profiler = None,
+        symlinks: bool = True,
+    ):
         self.config = config
+        # Whether interactive syncs refresh ~/.zshrc and friends
+        self.symlinks = symlinks
         self.repo = None
+        self.session = session if session is not None else SyncSession(config)
+        self.profiler = profiler if profiler is not None else Profiler.disabled()
+        # Backup running alongside the fetch during a sync, and its pool
+        self._backup = None
+        self._backup_pool = None
         self._init_repo()
+        self.session.repo = self.repo
 
     def _init_repo(self):
         """Initialize git repository."""
         try:
             self.repo = git.Repo(self.config.configs_dir)
-        except git.InvalidGitRepositoryError:
+        except (git.InvalidGitRepositoryError, git.NoSuchPathError):
             console.print("[yellow]Not a git repository. Initializing...[/yellow]")
-            self.repo = git.Repo.init(self.config.configs_dir)
-            self.repo.create_remote("origin", "git@github.com:jtele2/configs.git")
-            self.repo.remotes.origin.fetch()
-            self.repo.create_head("main", self.repo.remotes.origin.refs.main)
-            self.repo.heads.main.checkout()
+            self.repo = self._bootstrap(self.config.clone_mode)
+
+    def _bootstrap(self, mode: str) -> git.Repo:
+        """Clone the sync branch into configs_dir.
+
+        ``blobless`` fetches every commit and tree but only the blobs needed
+        for checkout, pulling older blobs on demand. ``shallow`` fetches just
+        the tip commit. ``full`` downloads the entire history.
+        """
+        if mode not in CLONE_MODES:
+            expected = ", ".join(CLONE_MODES)
+            raise ValueError(
+                f"Unknown clone mode '{mode}' (expected one of {expected})"
+            )
+
+        branch = self.config.branch
+        repo = git.Repo.init(self.config.configs_dir)
+        origin = repo.create_remote("origin", self.config.remote_url)
+        refspec = f"+refs/heads/{branch}:refs/remotes/origin/{branch}"
+
+        console.print(f"[blue]📥 Fetching {branch} ({mode} clone)...[/blue]")
+        if mode == "blobless":
+            # Records origin as a promisor remote so checkout fetches lazily
+            repo.git.fetch("--filter=blob:none", "origin", refspec)
+        elif mode == "shallow":
+            repo.git.fetch("--depth=1", "origin", refspec)
+        else:
+            origin.fetch()
+
+        head = repo.create_head(branch, origin.refs[branch])
+        head.set_tracking_branch(origin.refs[branch])
+        head.checkout()
+        return repo
+
+    def deepen_history(self, depth: int = None):
+        """Fetch history skipped by a shallow or blobless bootstrap.
+
+        Shallow clones are deepened by ``depth`` commits, or unshallowed when
+        no depth is given. Blobless clones already have every commit, so
+        without a depth their missing blobs are downloaded instead; git
+        before 2.36 can only drop the filter for later fetches.
+        """
+        shallow = (Path(self.repo.git_dir) / "shallow").exists()
+        reader = self.repo.config_reader()
+        blobless = reader.has_option('remote "origin"', "partialclonefilter")
+
+        if shallow:
+            if depth:
+                console.print(
+                    f"[blue]📥 Deepening history by {depth} commits...[/blue]"
+                )
+                self.repo.git.fetch(f"--deepen={depth}", "origin")
+            else:
+                console.print("[blue]📥 Fetching full history...[/blue]")
+                self.repo.git.fetch("--unshallow", "origin")
+        elif blobless and not depth:
+            console.print("[blue]📥 Fetching all missing file contents...[/blue]")
+            with self.repo.config_writer() as writer:
+                writer.remove_option('remote "origin"', "partialclonefilter")
+            if self.repo.git.version_info >= REFETCH_GIT_VERSION:
+                self.repo.git.fetch("--refetch", "origin")
+            else:
+                # No --refetch: new fetches come unfiltered, older blobs
+                # keep arriving from the promisor remote on demand
+                console.print(
+                    "[yellow]⚠️  git older than 2.36 cannot refetch; missing "
+                    "blobs will still download on demand[/yellow]"
+                )
+                self.repo.git.fetch("origin")
+        else:
+            console.print("[green]✅ Repository already has full history[/green]")
+            return False
+
+        self.session.invalidate()
+        console.print("[green]✅ History deepened[/green]")
+        return True
 
     def check_network(self) -> bool:
-        """Check network connectivity to GitHub."""
+        """Fetch the remote, which doubles as the connectivity check.
+
+        Always a real fetch: a snapshot cached by another process may be
+        older than a push made elsewhere since, and rebasing or pushing
+        against it would fail.
+        """
         try:
-            self.repo.remotes.origin.fetch()
+            self.session.fetch(force=True)
             return True
         except Exception as e:
             console.print(f"[red]❌ Cannot reach remote repository: {e}[/red]")
             self.config.update_sync_status("✗")
             return False
 
+    def _push(self, force: bool = False) -> bool:
+        """Push the branch; on rejection report it, mark "✗" and return False."""
+        branch = self.config.branch
+        try:
+            with self.profiler.phase("push"):
+                results = self.repo.remotes.origin.push(
+                    refspec=f"{branch}:{branch}", force=force
+                )
+            failed = [info for info in results if info.flags & PUSH_FAILED]
+            error = "; ".join(info.summary.strip() for info in failed)
+            if not results:
+                error = "no result from git push"
+        except git.GitCommandError as e:
+            error = str(e)
+        if error:
+            console.print(f"[red]❌ Push failed: {error}[/red]")
+            self.config.update_sync_status("✗")
+            return False
+        self.session.record_push(branch)
+        return True
+
     def create_backup(self) -> bool:
         """Create timestamped backup."""
-        backup_name = f"backup-{datetime.now():%Y%m%d-%H%M%S}.tar.gz"
-        self.config.backup_dir.mkdir(parents=True, exist_ok=True)
-        backup_path = self.config.backup_dir / backup_name
-
-        console.print(f"[blue]📦 Creating backup: {backup_name}[/blue]")
-
-        with tarfile.open(backup_path, "w:gz") as tar:
-            for item in self.config.configs_dir.iterdir():
-                if item.name not in [".git", ".sync", "node_modules", ".DS_Store"]:
-                    if not item.name.endswith(".local"):
-                        tar.add(item, arcname=item.name)
+        return BackupManager(self.config).create_backup()
 
-        # Keep only last 10 backups
-        backups = sorted(self.config.backup_dir.glob("backup-*.tar.gz"))
-        for old_backup in backups[:-10]:
-            old_backup.unlink()
+    def sync(self, force_push=False, force_pull=False, dry_run=False, background=False):
+        """Perform full sync operation, serialized with other csync processes.
+
+        Plain syncs requested while another one is running are coalesced into
+        a single follow-up run whose result is shared with every waiter.
+        Background callers don't wait if a follow-up is already queued.
+        """
+        plain = not (force_push or force_pull or dry_run)
+        with self.profiler.phase("sync"):
+            result = SyncLock(self.config).run(
+                lambda: self._sync(force_push, force_pull, dry_run, background),
+                coalesce=plain,
+                wait=not background,
+            )
+        if result is None:
+            # A queued follow-up sync will pick up this request
+            return True
+        return result
+
+    def _sync(self, force_push, force_pull, dry_run, background):
+        """Run one sync while holding the sync lock.
+
+        The backup is disk/CPU work and the fetch is network wait, so the
+        backup runs on a worker thread while the remote is fetched. It only
+        starts once the sync is known to have work, so a no-op sync never
+        walks the tree. Leaving the pool waits for it, even when the sync
+        stops early.
+        """
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="backup") as pool:
+            if not dry_run and not background:
+                self._backup_pool = pool
+            try:
+                return self._run_sync(force_push, force_pull, dry_run, background)
+            finally:
+                self._backup = None
+                self._backup_pool = None
+
+    def _start_backup(self):
+        """Start the sync's backup, if this sync takes one and it hasn't yet."""
+        if self._backup_pool is not None:
+            # A copied context keeps caller state, e.g. where output goes
+            context = contextvars.copy_context()
+            self._backup = self._backup_pool.submit(context.run, self._run_backup)
+            self._backup_pool = None
+
+    def _run_backup(self):
+        with self.profiler.phase("backup"):
+            return self.create_backup()
+
+    def _await_backup(self):
+        """Block until the concurrent backup is done.
+
+        Called before any step that modifies the worktree (stash, reset,
+        rebase/merge), so the backup never sees a half-synced tree.
+        """
+        if self._backup is None:
+            return
+        backup, self._backup = self._backup, None
+        with self.profiler.phase("backup-wait"):
+            backup.result()
+
+    def _run_sync(self, force_push, force_pull, dry_run, background):
+        # A clean tree and a recent enough snapshot prove a no-op without the
+        # network; nothing is written then, so a stale snapshot costs nothing
+        with self.profiler.phase("fast-path"):
+            plain = not (force_push or force_pull or dry_run)
+            local_noop = plain and self._local_noop()
+            noop = local_noop and self._remote_unchanged(self.session.cached())
+        if noop:
+            if not background:
+                console.print("[green]✅ Nothing to sync[/green]")
+            return True
 
-        return True
+        # Local changes mean real work, so the backup can overlap the fetch;
+        # a locally clean tree waits to hear whether the remote moved
+        if not local_noop:
+            self._start_backup()
 
-    def sync(self, force_push=False, force_pull=False, dry_run=False, background=False):
-        """Perform full sync operation."""
-        if not self.check_network():
+        with self.profiler.phase("fetch"):
+            online = self.check_network()
+        if not online:
             if not background:
                 console.print("[red]❌ Network check failed[/red]")
             return False
 
+        with self.profiler.phase("fast-path"):
+            noop = local_noop and self._remote_unchanged(self.session.snapshot)
+        if noop:
+            if not background:
+                console.print("[green]✅ Nothing to sync[/green]")
+            return True
+        self._start_backup()
+
+        self._clear_sync_state()
         self.config.update_sync_status("⚡")
 
         machine_id = self.config.get_machine_id()
         if not background:
             console.print(f"[blue]🔄 Starting sync from: {machine_id}[/blue]")
 
-        # Create backup
-        if not dry_run and not background:
-            self.create_backup()
+        # The backup started alongside the fetch has to be complete first
+        self._await_backup()
 
         # Handle uncommitted changes
         if self.repo.is_dirty():
@@ -91,7 +293,8 @@ class Syncer:
                     console.print(f"  {item.a_path}")
             else:
                 stash_msg = f"Auto-stash by sync from {machine_id} at {datetime.now():%Y-%m-%d %H:%M:%S}"
-                self.repo.git.stash("push", "-m", stash_msg)
+                with self.profiler.phase("stash"):
+                    self.repo.git.stash("push", "-m", stash_msg)
                 if not background:
                     console.print("[green]✅ Local changes stashed[/green]")
 
@@ -99,9 +302,8 @@ class Syncer:
         if force_push:
             console.print("[yellow]⬆️  Force pushing local changes...[/yellow]")
             if not dry_run:
-                self.repo.remotes.origin.push(
-                    refspec=f"{self.config.branch}:{self.config.branch}", force=True
-                )
+                if not self._push(force=True):
+                    return False
                 console.print("[green]✅ Force pushed to remote[/green]")
                 self.config.update_sync_status("✓")
             return True
@@ -109,18 +311,21 @@ class Syncer:
         if force_pull:
             console.print("[yellow]⬇️  Force pulling remote changes...[/yellow]")
             if not dry_run:
-                self.repo.git.reset("--hard", f"origin/{self.config.branch}")
+                with self.profiler.phase("reset"):
+                    self.repo.git.reset(
+                        "--hard", self.session.remote_sha(self.config.branch)
+                    )
                 console.print("[green]✅ Reset to remote state[/green]")
-                self.sync_marked_files()
+                with self.profiler.phase("marked-files"):
+                    self.sync_marked_files()
                 self.config.update_sync_status("✓")
             return True
 
-        # Normal sync
-        origin = self.repo.remotes.origin
-        origin.fetch()
+        # Normal sync, reusing the remote state fetched by check_network()
+        remote_sha = self.session.remote_sha(self.config.branch)
 
         local_commit = self.repo.head.commit
-        remote_commit = origin.refs[self.config.branch].commit
+        remote_commit = self.repo.commit(remote_sha)
 
         if local_commit != remote_commit:
             if not background:
@@ -129,50 +334,59 @@ class Syncer:
             if dry_run:
                 console.print("[blue]DRY RUN: Would pull and rebase[/blue]")
             else:
-                try:
-                    origin.pull(rebase=True)
-                    if not background:
-                        console.print("[green]✅ Pulled remote changes[/green]")
-                except git.GitCommandError:
-                    if not background:
-                        console.print(
-                            "[yellow]⚠️  Rebase failed, attempting merge...[/yellow]"
-                        )
-                    self.repo.git.rebase("--abort")
-
+                with self.profiler.phase("rebase"):
                     try:
-                        origin.pull(rebase=False)
+                        # Integrate the fetched tip directly; pull would fetch again
+                        self.repo.git.rebase(remote_sha)
+                        if not background:
+                            console.print("[green]✅ Pulled remote changes[/green]")
                     except git.GitCommandError:
-                        console.print(
-                            "[red]❌ Merge failed. Manual intervention required.[/red]"
-                        )
-                        console.print(
-                            "[yellow]💡 Try: --force-pull or --force-push[/yellow]"
-                        )
-                        self.config.update_sync_status("✗")
-                        return False
+                        if not background:
+                            console.print(
+                                "[yellow]⚠️  Rebase failed, attempting merge...[/yellow]"
+                            )
+                        self.repo.git.rebase("--abort")
+
+                        try:
+                            self.repo.git.merge(remote_sha)
+                        except git.GitCommandError:
+                            console.print(
+                                "[red]❌ Merge failed. "
+                                "Manual intervention required.[/red]"
+                            )
+                            console.print(
+                                "[yellow]💡 Try: --force-pull or --force-push[/yellow]"
+                            )
+                            self.config.update_sync_status("✗")
+                            return False
         else:
             if not background:
                 console.print("[green]✅ Already up to date with remote[/green]")
 
         # Apply stashed changes
-        if "Auto-stash by sync" in self.repo.git.stash("list"):
+        with self.profiler.phase("stash-list"):
+            stashes = self.repo.git.stash("list")
+        if "Auto-stash by sync" in stashes:
             if not background:
                 console.print("[yellow]📝 Applying stashed changes...[/yellow]")
 
             if not dry_run:
                 try:
-                    self.repo.git.stash("pop")
+                    with self.profiler.phase("stash-pop"):
+                        self.repo.git.stash("pop")
                 except git.GitCommandError:
                     console.print("[yellow]⚠️  Conflicts while applying stash[/yellow]")
                     self.config.update_sync_status("✗")
                     return False
 
         # Sync marked files
-        self.sync_marked_files()
+        with self.profiler.phase("marked-files"):
+            self.sync_marked_files(dry_run=dry_run)
 
         # Commit any changes
-        if self.repo.is_dirty():
+        with self.profiler.phase("dirty-check"):
+            dirty = self.repo.is_dirty()
+        if dirty:
             if not background:
                 console.print("[yellow]💾 Committing local changes...[/yellow]")
 
@@ -181,38 +395,43 @@ class Syncer:
             else:
                 # CRITICAL: Use git add with --all flag to respect .gitignore
                 # NEVER use repo.index.add(".") as it bypasses .gitignore!
-                self.repo.git.add("--all", ".")
-
-                # Safeguard: Verify no ignored files are staged
-                staged_files = [item.a_path for item in self.repo.index.diff("HEAD")]
-                dangerous_patterns = ["__pycache__", ".git/", ".pyc", ".local", ".env"]
-                for staged in staged_files:
-                    for pattern in dangerous_patterns:
-                        if pattern in staged:
-                            console.print(
-                                f"[red]⚠️  WARNING: Staged file '{staged}' matches ignored pattern '{pattern}'![/red]"
-                            )
-                            console.print(
-                                "[yellow]This should not happen. Please report this issue.[/yellow]"
-                            )
+                with self.profiler.phase("stage"):
+                    self.repo.git.add("--all", ".")
+
+                # Safeguard: abort if anything newly staged is ignored
+                verifier = StagingVerifier(self.repo)
+                with self.profiler.phase("verify-staged"):
+                    ignored = verifier.find_ignored()
+                if ignored:
+                    console.print(
+                        f"[red]❌ {len(ignored)} staged file(s) match .gitignore "
+                        "rules; commit aborted[/red]"
+                    )
+                    verifier.report(ignored)
+                    # Leave nothing staged behind for the next commit to pick up
+                    self.repo.git.reset("-q")
+                    self.config.update_sync_status("✗")
+                    return False
 
                 commit_msg = (
                     f"Sync from {machine_id} at {datetime.now():%Y-%m-%d %H:%M:%S}"
                 )
-                self.repo.index.commit(commit_msg)
+                with self.profiler.phase("commit"):
+                    self.repo.index.commit(commit_msg)
                 if not background:
                     console.print("[green]✅ Changes committed[/green]")
 
         # Push to remote
         local_commit = self.repo.head.commit
-        remote_commit = origin.refs[self.config.branch].commit
+        remote_commit = self.session.remote_commit(self.config.branch)
 
         if local_commit != remote_commit:
             if not background:
                 console.print("[yellow]⬆️  Pushing to remote...[/yellow]")
 
             if not dry_run:
-                origin.push()
+                if not self._push():
+                    return False
                 if not background:
                     console.print("[green]✅ Pushed to remote[/green]")
                 self.config.update_sync_status("✓")
@@ -224,13 +443,16 @@ class Syncer:
             self.config.last_sync_file.write_text(
                 datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             )
+            self._record_sync_state()
 
             if not background:
-                # Create/update symlinks
-                from csync.symlinks import SymlinkManager
+                if self.symlinks:
+                    # Create/update symlinks
+                    from csync.symlinks import SymlinkManager
 
-                symlink_mgr = SymlinkManager(self.config)
-                symlink_mgr.create_symlinks()
+                    symlink_mgr = SymlinkManager(self.config)
+                    with self.profiler.phase("symlinks"):
+                        symlink_mgr.create_symlinks()
 
                 console.print("[green]✅ Sync completed successfully![/green]")
         else:
@@ -238,47 +460,124 @@ class Syncer:
 
         return True
 
-    def sync_marked_files(self):
-        """Sync marked external files."""
-        if not self.config.marked_files.exists():
-            return
+    def is_noop(self) -> bool:
+        """Cheaply prove that a sync would have nothing to do.
+
+        True only when the last full sync succeeded, HEAD still matches both
+        the remote tip and the recorded state, ``.marked-files`` is unchanged,
+        no copy-mode file changed and no tracked file is modified. The status
+        check is the only subprocess.
+        """
+        snapshot = self.session.snapshot or self.session.cached()
+        return self._local_noop() and self._remote_unchanged(snapshot)
+
+    def _local_noop(self) -> bool:
+        """The part of :meth:`is_noop` that needs no remote refs."""
+        state = self._load_sync_state()
+        if state is None:
+            return False
 
-        marked_files = self.config.marked_files.read_text().strip().split("\n")
-        if not marked_files or marked_files == [""]:
-            return
+        try:
+            if self.config.sync_status_file.read_text().strip() != "✓":
+                return False
+        except OSError:
+            return False
 
-        console.print("[blue]📂 Syncing marked files...[/blue]")
-        synced_count = 0
+        if self.repo.head.commit.hexsha != state.get("head"):
+            return False
+
+        if self._marked_files_hash() != state.get("marked"):
+            return False
+
+        # Copy-mode files edited in $HOME don't show up in git status
+        if CopySync(self.config).has_changes():
+            return False
 
-        for rel_path in marked_files:
-            if not rel_path:
-                continue
+        return not self.repo.git.status("--porcelain", "--untracked-files=no")
 
-            file_path = Path.home() / rel_path
-            external_path = self.config.external_dir / rel_path
+    def _remote_unchanged(self, snapshot) -> bool:
+        """True if ``snapshot`` has the remote tip at the commit we synced to."""
+        if snapshot is None:
+            return False
+        return snapshot.refs.get(self.config.branch) == self.repo.head.commit.hexsha
 
-            if not external_path.exists():
-                console.print(f"  [yellow]⚠ External file missing: {rel_path}[/yellow]")
-                continue
+    def _marked_files_hash(self) -> str:
+        try:
+            return hashlib.sha1(self.config.marked_files.read_bytes()).hexdigest()
+        except FileNotFoundError:
+            return ""
 
-            # Create parent directory if needed
-            file_path.parent.mkdir(parents=True, exist_ok=True)
+    def _load_sync_state(self):
+        try:
+            return json.loads(self.config.sync_state_file.read_text())
+        except (OSError, ValueError):
+            return None
+
+    def _record_sync_state(self):
+        """Remember a successful sync so the next no-op run can fast-path."""
+        head_sha = self.repo.head.commit.hexsha
+        if head_sha != self.session.snapshot.refs.get(self.config.branch):
+            return
+        state = {"head": head_sha, "marked": self._marked_files_hash()}
+        self.config.sync_state_file.write_text(json.dumps(state))
 
-            # Create or update symlink
-            if (
-                not file_path.is_symlink()
-                or file_path.resolve() != external_path.resolve()
-            ):
-                if file_path.exists() or file_path.is_symlink():
-                    file_path.unlink()
+    def _clear_sync_state(self):
+        try:
+            self.config.sync_state_file.unlink()
+        except FileNotFoundError:
+            pass
+
+    def sync_marked_files(self, dry_run: bool = False):
+        """Sync marked external files.
+
+        Links are reconciled, then copy-mode entries are synced both ways.
+        With ``dry_run`` the changes are only listed. Returns the per-entry
+        action list from the link reconciler.
+        """
+        actions = LinkReconciler(self.config).reconcile(dry_run=dry_run)
+        copied = CopySync(self.config).sync(dry_run=dry_run)
+        if not actions and not copied:
+            return actions
+
+        if dry_run:
+            console.print("[blue]DRY RUN: Would sync marked files[/blue]")
+        else:
+            console.print("[blue]📂 Syncing marked files...[/blue]")
+        synced_count = 0
 
-                file_path.symlink_to(external_path)
+        for action in actions:
+            if action.action == MISSING:
+                console.print(
+                    f"  [yellow]⚠ External file missing: {action.path}[/yellow]"
+                )
+            elif action.action == CONFLICT:
+                console.print(
+                    f"  [yellow]⚠ Directory in the way, not linked: "
+                    f"{action.link}[/yellow]"
+                )
+            elif action.error:
+                console.print(f"  [red]✗ {action.link}: {action.error}[/red]")
+            elif action.action in CHANGES:
                 console.print(
-                    f"  [green]✓ Linked: {file_path} → {external_path}[/green]"
+                    f"  [green]✓ Linked ({action.action}): "
+                    f"{action.link} → {action.target}[/green]"
                 )
                 synced_count += 1
 
-        if synced_count > 0:
+        for action in copied:
+            if action.action == COPY_CONFLICT:
+                console.print(
+                    f"  [yellow]⚠ Both sides changed, kept yours as "
+                    f"~/{action.path}{CONFLICT_SUFFIX}[/yellow]"
+                )
+            else:
+                console.print(f"  [green]✓ {action.action}: {action.path}[/green]")
+            synced_count += 1
+
+        if synced_count > 0 and dry_run:
+            console.print(f"  [blue]Would sync {synced_count} marked file(s)[/blue]")
+        elif synced_count > 0:
             console.print(f"  [green]✅ Synced {synced_count} marked file(s)[/green]")
         else:
             console.print("  [cyan]ℹ️  All marked files already in sync[/cyan]")
+        return actions
@@ -0,0 +1,143 @@
+"""Moving and copying marked content without pushing bytes through Python.
+
+Within one filesystem a move is a ``rename``. Across filesystems each file
+is copied by the kernel: a reflink (``FICLONE``) where the filesystem
+shares extents (btrfs, XFS, bcachefs), otherwise ``copy_file_range`` or
+``sendfile``. Only when all of those are unavailable does the copy fall
+back to a buffered read/write loop.
+"""
+
+import errno
+import os
+import shutil
+import stat
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# ioctl(dst, FICLONE, src) from <linux/fs.h>
+FICLONE = 0x40049409
+
+# Errors meaning "this method can't copy between these files", not failure
+UNSUPPORTED = {
+    errno.EXDEV,
+    errno.ENOSYS,
+    errno.EOPNOTSUPP,
+    errno.ENOTTY,
+    errno.EINVAL,
+    errno.EBADF,
+    errno.ETXTBSY,
+}
+if hasattr(errno, "ENOTSUP"):
+    UNSUPPORTED.add(errno.ENOTSUP)
+
+
+def _reflink(src_fd: int, dst_fd: int, size: int) -> int:
+    if fcntl is None or not hasattr(os, "uname") or os.uname().sysname != "Linux":
+        raise OSError(errno.ENOSYS, "reflinks need Linux")
+    fcntl.ioctl(dst_fd, FICLONE, src_fd)
+    return size
+
+
+def _copy_file_range(src_fd: int, dst_fd: int, size: int) -> int:
+    if not hasattr(os, "copy_file_range"):
+        raise OSError(errno.ENOSYS, "copy_file_range is unavailable")
+    copied = 0
+    while copied < size:
+        sent = os.copy_file_range(src_fd, dst_fd, size - copied)
+        if sent == 0:
+            break
+        copied += sent
+    return copied
+
+
+def _sendfile(src_fd: int, dst_fd: int, size: int) -> int:
+    if not hasattr(os, "sendfile"):
+        raise OSError(errno.ENOSYS, "sendfile is unavailable")
+    copied = 0
+    while copied < size:
+        sent = os.sendfile(dst_fd, src_fd, None, size - copied)
+        if sent == 0:
+            break
+        copied += sent
+    return copied
+
+
+# Tried in order; each returns the bytes it copied from the current offsets
+METHODS = (
+    ("reflink", _reflink),
+    ("copy_file_range", _copy_file_range),
+    ("sendfile", _sendfile),
+)
+
+
+def copy_file(src, dst) -> str:
+    """Copy one file's data and metadata kernel-side; return the method used.
+
+    ``src`` and ``dst`` may be paths or strings, as for ``shutil.copy2``.
+    """
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        size = os.fstat(fsrc.fileno()).st_size
+        used = "read/write"
+        for name, method in METHODS if size else ():
+            try:
+                copied = method(fsrc.fileno(), fdst.fileno(), size)
+            except OSError as error:
+                if error.errno not in UNSUPPORTED:
+                    raise
+                continue
+            used = name
+            if copied >= size:
+                break
+            # Short copy (e.g. the file grew): finish with plain I/O
+            shutil.copyfileobj(fsrc, fdst)
+            break
+        else:
+            shutil.copyfileobj(fsrc, fdst)
+    shutil.copystat(src, dst)
+    return used
+
+
+def copy_tree(src: Path, dst: Path):
+    """Copy a directory or file to ``dst``, symlinks kept as links."""
+    if src.is_dir() and not src.is_symlink():
+        shutil.copytree(
+            src, dst, symlinks=True, copy_function=copy_file, dirs_exist_ok=True
+        )
+    elif src.is_symlink():
+        os.symlink(os.readlink(src), dst)
+    else:
+        copy_file(src, dst)
+
+
+def remove(path: Path):
+    """Delete a file, symlink or whole directory."""
+    if stat.S_ISDIR(path.lstat().st_mode):
+        shutil.rmtree(path)
+    else:
+        path.unlink()
+
+
+def move(src: Path, dst: Path) -> str:
+    """Move ``src`` to ``dst`` and return ``"rename"`` or ``"copy"``.
+
+    ``dst`` is merged into when it already exists (e.g. left over from an
+    earlier mark); otherwise a rename is tried first and the copy only
+    happens across filesystems.
+    """
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    if not dst.exists() and not dst.is_symlink():
+        try:
+            os.rename(src, dst)
+            return "rename"
+        except OSError as error:
+            if error.errno != errno.EXDEV:
+                raise
+    elif not (dst.is_dir() and src.is_dir()):
+        remove(dst)
+    copy_tree(src, dst)
+    remove(src)
+    return "copy"
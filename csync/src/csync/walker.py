@@ -0,0 +1,144 @@
+"""Tree walk deciding what goes into a backup.
+
+The walk honours the repository's own ignore rules (``.gitignore`` files,
+``info/exclude`` and ``core.excludesFile``) plus csync's exclude list, and
+never descends into an excluded directory. Everything left out is recorded
+so ``csync backup --report`` can show what was skipped and what it saved.
+"""
+
+import os
+from fnmatch import fnmatch
+from pathlib import Path
+
+import git
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+# Matched against each entry's name, or its relative path if it contains "/"
+DEFAULT_EXCLUDES = (
+    ".git",
+    ".sync",
+    "node_modules",
+    ".DS_Store",
+    "__pycache__",
+    ".venv",
+    "*.pyc",
+    "*.local",
+)
+
+
+def configured_excludes():
+    """Default excludes plus the comma-separated ``CSYNC_BACKUP_EXCLUDE``."""
+    extra = os.environ.get("CSYNC_BACKUP_EXCLUDE", "")
+    return DEFAULT_EXCLUDES + tuple(p.strip() for p in extra.split(",") if p.strip())
+
+
+class ExcludedEntry:
+    """A file or directory the walk skipped, and why."""
+
+    def __init__(self, path: str, reason: str, is_dir: bool):
+        self.path = path
+        self.reason = reason
+        self.is_dir = is_dir
+
+
+class BackupWalker:
+    """Walks a configs tree, yielding what a backup should contain."""
+
+    def __init__(self, root: Path, excludes=None):
+        self.root = Path(root)
+        self.excludes = configured_excludes() if excludes is None else excludes
+        self.excluded = []
+
+    def _git_ignored(self):
+        """Ignored untracked paths, directories collapsed to ``dir/``.
+
+        One ``git ls-files`` call; git itself prunes ignored directories.
+        Tracked files are never reported, so they are always backed up.
+        """
+        try:
+            repo = git.Repo(self.root)
+        except (git.InvalidGitRepositoryError, git.NoSuchPathError):
+            return set()
+        output = repo.git.ls_files(
+            "--others", "--ignored", "--exclude-standard", "--directory", "-z"
+        )
+        return set(filter(None, output.split("\0")))
+
+    def _excluded_by(self, rel: str, name: str):
+        for pattern in self.excludes:
+            target = rel if "/" in pattern else name
+            if fnmatch(target, pattern.rstrip("/")):
+                return pattern
+        return None
+
+    def _skip(self, rel: str, name: str, is_dir: bool, ignored) -> bool:
+        pattern = self._excluded_by(rel, name)
+        if pattern:
+            self.excluded.append(ExcludedEntry(rel, f"csync: {pattern}", is_dir))
+            return True
+        if (rel + "/" if is_dir else rel) in ignored:
+            self.excluded.append(ExcludedEntry(rel, "gitignore", is_dir))
+            return True
+        return False
+
+    def walk(self):
+        """Yield ``(relative path, lstat)`` for every file and symlink to keep."""
+        self.excluded = []
+        ignored = self._git_ignored()
+
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            base = Path(dirpath)
+            prefix = "" if base == self.root else base.relative_to(self.root).as_posix()
+            kept = []
+            for name in sorted(dirnames):
+                rel = f"{prefix}/{name}" if prefix else name
+                if (base / name).is_symlink():
+                    # Symlinked directories are recorded as links, not followed
+                    filenames.append(name)
+                elif not self._skip(rel, name, True, ignored):
+                    kept.append(name)
+            dirnames[:] = kept
+
+            for name in sorted(filenames):
+                rel = f"{prefix}/{name}" if prefix else name
+                if not self._skip(rel, name, False, ignored):
+                    yield rel, (base / name).lstat()
+
+    def excluded_size(self, entry: ExcludedEntry) -> int:
+        """Bytes under an excluded entry (only computed for the report)."""
+        path = self.root / entry.path
+        if not entry.is_dir:
+            return path.lstat().st_size
+        total = 0
+        for dirpath, _, filenames in os.walk(path):
+            for name in filenames:
+                try:
+                    total += os.lstat(os.path.join(dirpath, name)).st_size
+                except OSError:
+                    pass
+        return total
+
+    def report(self):
+        """Print what the last walk excluded and the bytes that saved."""
+        if not self.excluded:
+            console.print("[green]Nothing was excluded from the backup[/green]")
+            return 0
+
+        table = Table(title="Excluded from backup", show_header=True)
+        table.add_column("Path", style="cyan")
+        table.add_column("Reason", style="magenta")
+        table.add_column("Size", style="yellow", justify="right")
+
+        sizes = [(entry, self.excluded_size(entry)) for entry in self.excluded]
+        sizes.sort(key=lambda item: -item[1])
+        for entry, size in sizes:
+            name = entry.path + "/" if entry.is_dir else entry.path
+            table.add_row(name, entry.reason, f"{size / 1024:.1f} KB")
+
+        saved = sum(size for _, size in sizes)
+        console.print(table)
+        console.print(f"[cyan]💡 Exclusions saved {saved / 1024 / 1024:.1f} MB[/cyan]")
+        return saved
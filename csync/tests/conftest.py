@@ -0,0 +1,50 @@
+"""Shared fixtures: a configs checkout wired to a local bare remote."""
+
+from pathlib import Path
+
+import git
+import pytest
+
+from csync.config import Config
+
+
+@pytest.fixture
+def home(tmp_path, monkeypatch):
+    """Isolated $HOME so marked files and symlinks never touch the real one."""
+    home_dir = tmp_path / "home"
+    home_dir.mkdir()
+    monkeypatch.setenv("HOME", str(home_dir))
+    monkeypatch.setenv("USER", "tester")
+    return home_dir
+
+
+@pytest.fixture
+def remote(tmp_path):
+    """Bare repository seeded with a single commit on main."""
+    bare_dir = tmp_path / "remote.git"
+    bare = git.Repo.init(bare_dir, bare=True, initial_branch="main")
+
+    seed_dir = tmp_path / "seed"
+    seed = git.Repo.init(seed_dir, initial_branch="main")
+    (seed_dir / ".gitignore").write_text(".sync/\n*.local\n__pycache__/\n")
+    (seed_dir / "zshrc").write_text("# zshrc\n")
+    seed.index.add([".gitignore", "zshrc"])
+    seed.index.commit("Initial commit")
+    seed.create_remote("origin", str(bare_dir))
+    seed.remotes.origin.push("main:main")
+    return bare
+
+
+@pytest.fixture
+def configs(tmp_path, remote, home):
+    """Clone of ``remote`` together with a Config pointing at it."""
+    configs_dir = tmp_path / "configs"
+    repo = git.Repo.clone_from(remote.git_dir, configs_dir, branch="main")
+    repo.config_writer().set_value("user", "name", "tester").release()
+    repo.config_writer().set_value("user", "email", "tester@example.com").release()
+
+    config = Config()
+    config.configs_dir = Path(configs_dir)
+    config.setup_paths()
+    config.branch = "main"
+    return config, repo
@@ -0,0 +1,77 @@
+"""Tests for the backup catalog behind listings, status and restore."""
+
+import json
+
+import pytest
+
+from csync.backup import BackupManager
+from csync.backup_catalog import BackupCatalog
+from csync.status import StatusDisplay
+
+
+def no_scan(self):
+    raise AssertionError("the backup directory was scanned")
+
+
+class TestBackupCatalog:
+    """Catalog bookkeeping behind backup listings and repair."""
+
+    @pytest.fixture
+    def manager(self, configs):
+        config, _ = configs
+        config.backup_format = "tar"
+        manager = BackupManager(config)
+        manager.create_backup()
+        (config.configs_dir / "zshrc").write_text("# edited\n")
+        config.backup_format = "store"
+        manager.create_backup()
+        return manager
+
+    def test_catalog_records_backup_metadata(self, manager):
+        entries = BackupCatalog(manager.config).entries()
+
+        assert [entry["kind"] for entry in entries] == ["tar", "store"]
+        assert all(entry["files"] == 2 for entry in entries)
+        assert all(entry["size"] > 0 for entry in entries)
+        assert all(entry["fingerprint"] for entry in entries)
+
+    def test_views_read_the_catalog(self, manager, monkeypatch):
+        monkeypatch.setattr(BackupManager, "scan", no_scan)
+        stamp = manager.backups()[0].stamp
+
+        manager.list_backups()
+        StatusDisplay(manager.config).show_status()
+        assert manager.restore_backup(stamp)
+
+        assert (manager.config.configs_dir / "zshrc").read_text() == "# zshrc\n"
+
+    def test_repair_rebuilds_from_disk(self, manager):
+        first, second = manager.backups()
+        second.path.unlink()
+        manager.catalog.path.write_text("{torn")
+
+        manager.repair()
+
+        backups = BackupManager(manager.config).backups()
+        assert [backup.name for backup in backups] == [first.name]
+        assert backups[0].files == 2
+
+    def test_repair_keeps_fingerprints(self, manager):
+        latest = manager.backups()[-1]
+
+        manager.repair()
+
+        assert BackupManager(manager.config).backups()[-1].fingerprint == (
+            latest.fingerprint
+        )
+
+    def test_legacy_fingerprints_move_into_catalog(self, manager):
+        latest = manager.backups()[-1]
+        manager.legacy_fingerprints_file.write_text(
+            json.dumps({latest.name: latest.fingerprint})
+        )
+        manager.catalog.path.unlink()
+
+        assert manager.backups()[-1].fingerprint == latest.fingerprint
+        assert not manager.legacy_fingerprints_file.exists()
+        assert manager.unchanged_since(latest.fingerprint) == latest.name
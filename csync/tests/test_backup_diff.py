@@ -0,0 +1,99 @@
+"""Tests for diffing a backup against the live tree."""
+
+import os
+
+import pytest
+
+from csync.backup import BackupManager
+from csync.backup_diff import file_digest
+from csync.backup_index import BackupIndex
+from csync.backup_index import iter_tar_digests
+
+
+def changes(manager):
+    backup = manager.backups()[-1]
+    return {entry.path: entry.change for entry in manager.diff_backup(backup.name)}
+
+
+class TestBackupDiff:
+    """Comparing a backup with the working tree."""
+
+    @pytest.fixture(params=["store", "tar", "git"])
+    def backed_up(self, request, configs):
+        config, _ = configs
+        config.backup_format = request.param
+        (config.configs_dir / "gone.conf").write_text("bye\n")
+        (config.configs_dir / "same.conf").write_text("same\n" * 1000)
+        os.symlink("zshrc", config.configs_dir / "link")
+        manager = BackupManager(config)
+        manager.create_backup()
+        return manager
+
+    def test_unchanged_tree_has_no_diff(self, backed_up):
+        assert changes(backed_up) == {}
+
+    def test_diff_reports_every_kind_of_change(self, backed_up):
+        root = backed_up.config.configs_dir
+        (root / "gone.conf").unlink()
+        (root / "new.conf").write_text("hello\n")
+        (root / "zshrc").write_text("# zshrc!\n")
+        (root / "link").unlink()
+        os.symlink("same.conf", root / "link")
+
+        assert changes(backed_up) == {
+            "gone.conf": "removed",
+            "new.conf": "added",
+            "zshrc": "modified",
+            "link": "modified",
+        }
+
+    def test_same_size_edit_is_caught(self, backed_up):
+        (backed_up.config.configs_dir / "zshrc").write_text("# ZSHRC\n")
+
+        assert changes(backed_up) == {"zshrc": "modified"}
+
+    def test_unknown_backup(self, backed_up):
+        assert backed_up.diff_backup("backup-19990101-000000") is None
+
+
+class TestBackupDigests:
+    """Per-file digests streamed out of each kind of backup."""
+
+    def test_git_digest_matches_hash_object(self, configs):
+        config, repo = configs
+        path = config.configs_dir / "zshrc"
+
+        assert file_digest(path, "git", path.stat().st_size) == repo.git.hash_object(
+            str(path)
+        )
+
+    def test_tar_digests_stream_in_blocks(self, configs):
+        config, _ = configs
+        config.backup_format = "tar"
+        (config.configs_dir / "big.conf").write_bytes(os.urandom(300_000))
+        manager = BackupManager(config)
+        manager.create_backup()
+        archive = manager.backups()[-1].path
+
+        digests = {
+            name: digest for name, _, _, digest in iter_tar_digests(archive, 4096)
+        }
+
+        path = config.configs_dir / "big.conf"
+        assert digests["big.conf"] == file_digest(path, "sha256", path.stat().st_size)
+
+    def test_tar_digests_span_every_chunk(self, configs):
+        config, _ = configs
+        config.backup_format = "tar"
+        # 400 KB of noise each: the archive holds several 1 MiB chunks
+        for i in range(6):
+            (config.configs_dir / f"f{i}").write_bytes(os.urandom(400_000))
+        manager = BackupManager(config)
+        manager.create_backup()
+        backup = manager.backups()[-1]
+        assert len(BackupIndex.load(backup.path).data["chunks"]) > 1
+
+        names = {name for name, _, _, _ in iter_tar_digests(backup.path)}
+
+        assert {f"f{i}" for i in range(6)} <= names
+        assert changes(manager) == {}
@@ -0,0 +1,73 @@
+"""Tests for git-native backups on private refs."""
+
+import pytest
+
+from csync.backup import BackupManager
+from csync.backup_git import REF_PREFIX
+from csync.backup_git import GitBackups
+from csync.retention import RetentionPolicy
+from csync.sync import Syncer
+
+KEEP_NEWEST = RetentionPolicy(last=1, hourly=0, daily=0, weekly=0)
+
+
+class TestGitBackups:
+    """Backups kept as commits under private refs."""
+
+    @pytest.fixture
+    def git_config(self, configs):
+        config, repo = configs
+        config.backup_format = "git"
+        (config.configs_dir / "untracked.conf").write_text("fresh\n")
+        (config.configs_dir / "machine.local").write_text("ignored\n")
+        return config, repo
+
+    def test_backup_snapshots_untracked_but_not_ignored(self, git_config):
+        config, repo = git_config
+
+        commit = GitBackups(config).create("20240101-000000")
+
+        files = repo.git.ls_tree("-r", "--name-only", commit).splitlines()
+        assert "untracked.conf" in files
+        assert "zshrc" in files
+        assert "machine.local" not in files
+        assert GitBackups(config).list() == ["20240101-000000"]
+
+    def test_backup_leaves_index_and_head_alone(self, git_config):
+        config, repo = git_config
+        head = repo.head.commit.hexsha
+
+        GitBackups(config).create("20240101-000000")
+
+        assert repo.head.commit.hexsha == head
+        assert repo.untracked_files == ["untracked.conf"]
+        assert not repo.index.diff("HEAD")
+
+    def test_restore_checks_out_backup_tree(self, git_config):
+        config, repo = git_config
+        GitBackups(config).create("20240101-000000")
+
+        (config.configs_dir / "zshrc").write_text("broken\n")
+        (config.configs_dir / "untracked.conf").unlink()
+        assert BackupManager(config).restore_backup("20240101-000000")
+
+        assert (config.configs_dir / "zshrc").read_text() == "# zshrc\n"
+        assert (config.configs_dir / "untracked.conf").read_text() == "fresh\n"
+
+    def test_backup_refs_are_never_pushed(self, git_config, remote):
+        config, _ = git_config
+
+        assert Syncer(config).sync()
+
+        assert BackupManager(config).backups()[-1].kind == "git"
+        assert not remote.git.for_each_ref(REF_PREFIX)
+
+    def test_prune_deletes_old_refs(self, git_config):
+        config, _ = git_config
+        git_backups = GitBackups(config)
+        for second in range(3):
+            git_backups.create(f"20240101-00000{second}")
+
+        BackupManager(config).prune(KEEP_NEWEST)
+
+        assert git_backups.list() == ["20240101-000002"]
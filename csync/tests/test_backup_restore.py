@@ -0,0 +1,137 @@
+"""Tests for indexed tarballs, selective restore and restore previews."""
+
+import os
+import subprocess
+import tarfile
+
+import pytest
+
+from csync.backup import BackupManager
+from csync.backup_index import BackupIndex
+from csync.backup_index import IndexedTarWriter
+from csync.backup_index import index_path
+
+
+@pytest.fixture
+def tree(configs):
+    config, _ = configs
+    for name in ("nvim", "tmux"):
+        (config.configs_dir / name).mkdir()
+        for i in range(3):
+            (config.configs_dir / name / f"conf{i}").write_text(f"{name} {i}\n")
+    return config
+
+
+class TestChunkedArchives:
+    """Tarballs written as indexed, separately compressed chunks."""
+
+    def test_chunked_archive_is_a_plain_tar_gz(self, tree, tmp_path):
+        archive = tmp_path / "backup.tar.gz"
+        entries = ["zshrc", "nvim/conf0", "nvim/conf1", "tmux/conf0"]
+
+        index = IndexedTarWriter(archive, chunk_size=1).write(tree.configs_dir, entries)
+
+        assert len(index["chunks"]) == len(entries)
+        with tarfile.open(archive, "r:gz") as tar:
+            assert tar.getnames() == entries
+        subprocess.run(["gzip", "-t", str(archive)], check=True)
+
+    def test_index_reads_only_the_chunks_it_needs(self, tree, tmp_path, monkeypatch):
+        archive = tmp_path / "backup.tar.gz"
+        entries = ["zshrc", "nvim/conf0", "nvim/conf1", "tmux/conf0"]
+        IndexedTarWriter(archive, chunk_size=1).write(tree.configs_dir, entries)
+
+        index = BackupIndex.load(archive)
+        reads = []
+        original = index._read_chunk
+        monkeypatch.setattr(
+            index,
+            "_read_chunk",
+            lambda raw, chunk: reads.append(chunk) or original(raw, chunk),
+        )
+        found = {info.name: data for info, data in index.iter_entries(["tmux/*"])}
+
+        assert found == {"tmux/conf0": b"tmux 0\n"}
+        assert len(reads) == 1
+
+    def test_legacy_tarball_supports_selective_restore(self, tree):
+        tree.backup_format = "tar"
+        manager = BackupManager(tree)
+        manager.create_backup()
+        (backup,) = manager.backups()
+        index_path(backup.path).unlink()
+
+        (tree.configs_dir / "tmux" / "conf2").unlink()
+        assert manager.restore_backup(backup.name, paths=["tmux/conf2"])
+
+        assert (tree.configs_dir / "tmux" / "conf2").read_text() == "tmux 2\n"
+
+    def test_unindexed_chunked_tarball_restores_every_chunk(self, tree):
+        tree.backup_format = "tar"
+        for i in range(4):
+            (tree.configs_dir / f"big{i}").write_bytes(os.urandom(400_000))
+        manager = BackupManager(tree)
+        manager.create_backup()
+        (backup,) = manager.backups()
+        assert len(BackupIndex.load(backup.path).data["chunks"]) > 1
+        index_path(backup.path).unlink()
+
+        (tree.configs_dir / "big3").unlink()
+        (tree.configs_dir / "tmux" / "conf2").unlink()
+        assert manager.restore_backup(backup.name, paths=["big3", "tmux"])
+
+        assert (tree.configs_dir / "big3").stat().st_size == 400_000
+        assert (tree.configs_dir / "tmux" / "conf2").read_text() == "tmux 2\n"
+
+
+class TestSelectiveRestore:
+    """Restoring some paths and previewing a restore."""
+
+    @pytest.mark.parametrize("backup_format", ["tar", "store", "git"])
+    def test_restore_only_matching_paths(self, tree, backup_format):
+        tree.backup_format = backup_format
+        manager = BackupManager(tree)
+        manager.create_backup()
+        name = manager.backups()[-1].name
+
+        (tree.configs_dir / "nvim" / "conf1").write_text("broken\n")
+        (tree.configs_dir / "tmux" / "conf1").write_text("keep me\n")
+        assert manager.restore_backup(name, paths=["nvim"])
+
+        assert (tree.configs_dir / "nvim" / "conf1").read_text() == "nvim 1\n"
+        assert (tree.configs_dir / "tmux" / "conf1").read_text() == "keep me\n"
+
+    def test_diff_preview_writes_nothing(self, tree, capsys):
+        tree.backup_format = "store"
+        manager = BackupManager(tree)
+        manager.create_backup()
+        (backup,) = manager.backups()
+
+        (tree.configs_dir / "nvim" / "conf0").write_text("edited\n")
+        (tree.configs_dir / "tmux" / "conf0").unlink()
+        assert manager.restore_backup(backup.name, diff=True)
+
+        output = capsys.readouterr().out
+        assert "nvim/conf0" in output and "overwrite" in output
+        assert "tmux/conf0" in output and "create" in output
+        assert "nvim/conf1" not in output
+        assert (tree.configs_dir / "nvim" / "conf0").read_text() == "edited\n"
+        assert len(manager.backups()) == 1
+
+    @pytest.mark.parametrize("backup_format", ["tar", "store", "git"])
+    def test_diff_preview_of_symlinks(self, tree, backup_format, capsys):
+        tree.backup_format = backup_format
+        os.symlink("zshrc", tree.configs_dir / "same")
+        os.symlink("zshrc", tree.configs_dir / "moved")
+        manager = BackupManager(tree)
+        manager.create_backup()
+        (backup,) = manager.backups()
+
+        (tree.configs_dir / "moved").unlink()
+        os.symlink("nvim", tree.configs_dir / "moved")
+        assert manager.restore_backup(backup.name, diff=True)
+
+        output = capsys.readouterr().out
+        assert "moved" in output and "symlink → zshrc" in output
+        assert "same" not in output
+        assert os.readlink(tree.configs_dir / "moved") == "nvim"
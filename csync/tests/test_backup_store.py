@@ -0,0 +1,119 @@
+"""Tests for the content-addressed backup store."""
+
+import pytest
+
+from csync.backup import BackupManager
+from csync.backup_store import BackupStore
+from csync.backup_store import tree_fingerprint
+from csync.retention import RetentionPolicy
+from csync.walker import BackupWalker
+
+KEEP_NEWEST = RetentionPolicy(last=1, hourly=0, daily=0, weekly=0)
+
+
+def current_fingerprint(config):
+    root = config.configs_dir
+    return tree_fingerprint(root, list(BackupWalker(root).walk()))
+
+
+@pytest.fixture
+def tree(configs):
+    config, _ = configs
+    (config.configs_dir / "nested" / "deep").mkdir(parents=True)
+    (config.configs_dir / "nested" / "deep" / "a.conf").write_text("a = 1\n")
+    (config.configs_dir / "nested" / "b.conf").write_text("b = 2\n")
+    (config.configs_dir / "machine.local").write_text("secret\n")
+    (config.configs_dir / "link").symlink_to("zshrc")
+    return config
+
+
+class TestBackupStore:
+    """Manifests over a content-addressed object store."""
+
+    def test_manifest_records_files_and_symlinks(self, tree):
+        manifest = BackupStore(tree).load(BackupStore(tree).create())
+
+        assert set(manifest["files"]) == {
+            ".gitignore",
+            "zshrc",
+            "nested/deep/a.conf",
+            "nested/b.conf",
+        }
+        assert manifest["symlinks"] == {"link": "zshrc"}
+
+    def test_unchanged_content_is_stored_once(self, tree):
+        store = BackupStore(tree)
+        first = store.load(store.create("backup-20240101-000000.json"))
+        objects = sorted(p for p in store.objects_dir.rglob("*") if p.is_file())
+
+        (tree.configs_dir / "nested" / "b.conf").write_text("b = 3\n")
+        second = store.load(store.create("backup-20240101-000001.json"))
+
+        assert first["stored"] > 0
+        new_objects = sorted(p for p in store.objects_dir.rglob("*") if p.is_file())
+        assert len(new_objects) == len(objects) + 1
+        assert second["files"]["zshrc"]["hash"] == first["files"]["zshrc"]["hash"]
+
+    def test_restore_brings_back_content(self, tree):
+        store = BackupStore(tree)
+        manifest_path = store.create()
+
+        (tree.configs_dir / "nested" / "b.conf").write_text("clobbered\n")
+        (tree.configs_dir / "nested" / "deep" / "a.conf").unlink()
+        store.restore(manifest_path)
+
+        assert (tree.configs_dir / "nested" / "b.conf").read_text() == "b = 2\n"
+        assert (
+            tree.configs_dir / "nested" / "deep" / "a.conf"
+        ).read_text() == "a = 1\n"
+
+    def test_manager_prunes_and_collects_garbage(self, tree):
+        tree.backup_format = "store"
+        manager = BackupManager(tree)
+        store = manager.store
+        for i in range(3):
+            (tree.configs_dir / "nested" / "b.conf").write_text(f"b = {i}\n")
+            store.create(f"backup-20240101-00000{i}.json")
+
+        manager.prune(KEEP_NEWEST)
+
+        assert [p.name for p in manager.backups()] == ["backup-20240101-000002.json"]
+        live = {
+            e["hash"] for e in store.load(manager.backups()[0].path)["files"].values()
+        }
+        on_disk = {
+            p.parent.name + p.name for p in store.objects_dir.rglob("*") if p.is_file()
+        }
+        assert on_disk == live
+
+    def test_restore_reads_legacy_tarballs(self, tree):
+        tree.backup_format = "tar"
+        manager = BackupManager(tree)
+        manager.create_backup()
+        (tarball,) = tree.backup_dir.glob("backup-*.tar.gz")
+
+        (tree.configs_dir / "zshrc").write_text("changed\n")
+        tree.backup_format = "store"
+        assert manager.restore_backup(tarball.name)
+
+        assert (tree.configs_dir / "zshrc").read_text() == "# zshrc\n"
+
+
+class TestUnchangedTree:
+    """Skipping a backup when the tree has not changed."""
+
+    def test_unchanged_tree_is_not_backed_up_again(self, tree):
+        manager = BackupManager(tree)
+        manager.create_backup()
+        manager.create_backup()
+
+        assert len(manager.backups()) == 1
+
+    def test_changed_tree_no_longer_matches_latest_backup(self, tree):
+        manager = BackupManager(tree)
+        manager.create_backup()
+        assert manager.unchanged_since(current_fingerprint(tree))
+
+        (tree.configs_dir / "nested" / "b.conf").write_text("b = changed\n")
+
+        assert manager.unchanged_since(current_fingerprint(tree)) is None
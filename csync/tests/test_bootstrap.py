@@ -0,0 +1,99 @@
+"""Tests for blobless/shallow bootstrap against a local bare remote."""
+
+from pathlib import Path
+
+import git
+import pytest
+
+from csync.config import Config
+from csync.sync import Syncer
+
+
+def _missing_objects(repo):
+    listing = repo.git.rev_list("--objects", "--all", "--missing=print")
+    return [line for line in listing.splitlines() if line.startswith("?")]
+
+
+class TestBootstrap:
+    """Cloning on a fresh machine and deepening afterwards."""
+
+    @pytest.fixture
+    def history_remote(self, tmp_path, remote):
+        """Bare remote with several revisions of a large-ish file."""
+        remote.git.config("uploadpack.allowFilter", "true")
+        work_dir = tmp_path / "history"
+        work = git.Repo.clone_from(remote.git_dir, work_dir, branch="main")
+        writer = work.config_writer()
+        writer.set_value("user", "name", "tester")
+        writer.set_value("user", "email", "tester@example.com")
+        writer.release()
+        for revision in range(5):
+            (work_dir / "completions").write_text(f"rev {revision}\n" * 2000)
+            work.index.add(["completions"])
+            work.index.commit(f"Revision {revision}")
+        work.remotes.origin.push("main:main")
+        return remote
+
+    @pytest.fixture
+    def fresh_config(self, tmp_path, history_remote, home):
+        config = Config()
+        config.configs_dir = tmp_path / "fresh"
+        config.setup_paths()
+        config.branch = "main"
+        config.remote_url = f"file://{history_remote.git_dir}"
+        return config
+
+    def test_blobless_bootstrap_skips_historical_blobs(self, fresh_config):
+        fresh_config.clone_mode = "blobless"
+        syncer = Syncer(fresh_config)
+
+        assert (
+            (fresh_config.configs_dir / "completions").read_text().startswith("rev 4")
+        )
+        assert len(list(syncer.repo.iter_commits())) == 6
+        assert len(_missing_objects(syncer.repo)) == 4
+
+        assert syncer.deepen_history()
+        assert _missing_objects(syncer.repo) == []
+
+    def test_blobless_deepen_on_git_without_refetch(self, fresh_config, monkeypatch):
+        fresh_config.clone_mode = "blobless"
+        syncer = Syncer(fresh_config)
+        monkeypatch.setattr("csync.sync.REFETCH_GIT_VERSION", (99, 0))
+
+        assert syncer.deepen_history()
+        reader = syncer.repo.config_reader()
+        assert not reader.has_option('remote "origin"', "partialclonefilter")
+        # Still a promisor remote, so old contents download when needed
+        assert syncer.repo.git.show("HEAD~4:completions").startswith("rev 0")
+
+    def test_default_clone_mode_is_full(self, home, monkeypatch):
+        monkeypatch.delenv("CSYNC_CLONE_MODE", raising=False)
+        assert Config().clone_mode == "full"
+
+    def test_shallow_bootstrap_fetches_tip_only(self, fresh_config):
+        fresh_config.clone_mode = "shallow"
+        syncer = Syncer(fresh_config)
+
+        assert (Path(syncer.repo.git_dir) / "shallow").exists()
+        assert len(list(syncer.repo.iter_commits())) == 1
+
+        syncer.deepen_history(depth=2)
+        assert len(list(syncer.repo.iter_commits())) == 3
+
+        syncer.deepen_history()
+        assert not (Path(syncer.repo.git_dir) / "shallow").exists()
+        assert len(list(syncer.repo.iter_commits())) == 6
+
+    def test_bootstrapped_repo_tracks_remote_branch(self, fresh_config):
+        fresh_config.clone_mode = "blobless"
+        syncer = Syncer(fresh_config)
+
+        tracking = syncer.repo.heads.main.tracking_branch()
+        assert tracking is not None and tracking.name == "origin/main"
+        assert syncer.sync(background=True)
+
+    def test_unknown_clone_mode_rejected(self, fresh_config):
+        fresh_config.clone_mode = "sparse"
+        with pytest.raises(ValueError):
+            Syncer(fresh_config)
@@ -0,0 +1,111 @@
+"""Tests for marking and unmarking many paths in one go."""
+
+import git
+import pytest
+
+from csync.gittrace import GitStats
+from csync.marked import MarkedFilesManager
+from csync.marked_manifest import MarkedManifest
+
+
+def commits(repo):
+    return int(repo.git.rev_list("--count", "HEAD"))
+
+
+class TestBulkMark:
+    """Marking and unmarking many paths in one commit."""
+
+    @pytest.fixture
+    def dotfiles(self, home):
+        config_dir = home / ".config"
+        config_dir.mkdir()
+        for i in range(20):
+            (config_dir / f"tool{i}.toml").write_text(f"n = {i}\n")
+        (config_dir / "nvim").mkdir()
+        (config_dir / "nvim" / "init.lua").write_text("-- nvim\n")
+        return config_dir
+
+    def test_glob_marks_everything_in_one_commit(self, configs, home, dotfiles):
+        config, repo = configs
+        before = commits(repo)
+
+        with GitStats() as stats:
+            assert MarkedFilesManager(config).mark_files([str(home / ".config/*.toml")])
+
+        assert commits(repo) == before + 1
+        assert all((dotfiles / f"tool{i}.toml").is_symlink() for i in range(20))
+        assert len(MarkedManifest.load(config.marked_files)) == 20
+        assert not repo.untracked_files
+        # Staging and committing happen once, however many files there are
+        assert stats.spawns <= 5
+
+    def test_nested_and_missing_paths(self, configs, home, dotfiles):
+        config, repo = configs
+
+        ok = MarkedFilesManager(config).mark_files(
+            [
+                str(dotfiles / "nvim" / "init.lua"),
+                str(dotfiles / "nvim"),
+                str(home / ".missing"),
+            ]
+        )
+
+        assert not ok
+        assert MarkedManifest.load(config.marked_files).paths() == [".config/nvim"]
+        assert (dotfiles / "nvim").is_symlink()
+        assert (dotfiles / "nvim" / "init.lua").read_text() == "-- nvim\n"
+
+    def test_unmark_glob(self, configs, home, dotfiles):
+        config, repo = configs
+        manager = MarkedFilesManager(config)
+        manager.mark_files([str(home / ".config/*.toml"), str(dotfiles / "nvim")])
+        before = commits(repo)
+
+        assert manager.unmark_files([str(home / ".config/*.toml")])
+
+        assert commits(repo) == before + 1
+        assert MarkedManifest.load(config.marked_files).paths() == [".config/nvim"]
+        assert not (dotfiles / "tool3.toml").is_symlink()
+        assert (dotfiles / "tool3.toml").read_text() == "n = 3\n"
+        assert "Unmark 20 files from sync" in repo.head.commit.message
+
+    def test_ignored_paths_are_skipped_before_moving(self, configs, home):
+        config, repo = configs
+        (home / ".zshrc.local").write_text("secret\n")
+        (home / ".vimrc").write_text("set number\n")
+        before = commits(repo)
+
+        ok = MarkedFilesManager(config).mark_files(
+            [str(home / ".zshrc.local"), str(home / ".vimrc")]
+        )
+
+        assert not ok
+        assert not (home / ".zshrc.local").is_symlink()
+        assert (home / ".zshrc.local").read_text() == "secret\n"
+        assert MarkedManifest.load(config.marked_files).paths() == [".vimrc"]
+        assert commits(repo) == before + 1
+
+    def test_failed_commit_rolls_the_mark_back(
+        self, configs, home, dotfiles, monkeypatch
+    ):
+        config, repo = configs
+        manager = MarkedFilesManager(config)
+        manager.mark_file(str(dotfiles / "tool0.toml"))
+        before = commits(repo)
+
+        def refuse(self, *args):
+            raise git.GitCommandError("add", 1)
+
+        monkeypatch.setattr(git.cmd.Git, "add", refuse, raising=False)
+        assert not manager.mark_files(
+            [str(dotfiles / "tool1.toml"), str(dotfiles / "nvim")]
+        )
+
+        assert commits(repo) == before
+        assert MarkedManifest.load(config.marked_files).paths() == [
+            ".config/tool0.toml"
+        ]
+        assert not (dotfiles / "tool1.toml").is_symlink()
+        assert (dotfiles / "tool1.toml").read_text() == "n = 1\n"
+        assert (dotfiles / "nvim" / "init.lua").read_text() == "-- nvim\n"
+        assert not (config.external_dir / ".config" / "nvim").exists()
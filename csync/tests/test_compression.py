@@ -0,0 +1,110 @@
+"""Tests for the backup compression backends."""
+
+import gzip
+import subprocess
+
+import pytest
+
+from csync.backup import BackupManager
+from csync.backup_index import IndexedTarWriter
+from csync.compression import Compressor
+from csync.config import Config
+
+
+class TestCompressor:
+    """Parallel and serial gzip backends."""
+
+    @pytest.fixture
+    def tree(self, configs):
+        config, _ = configs
+        for i in range(40):
+            (config.configs_dir / f"file{i}.conf").write_text(f"value = {i}\n" * 200)
+        return config
+
+    def test_parallel_and_serial_archives_are_identical(self, tree, tmp_path):
+        entries = sorted(p.name for p in tree.configs_dir.glob("file*.conf"))
+        serial = tmp_path / "serial.tar.gz"
+        parallel = tmp_path / "parallel.tar.gz"
+
+        IndexedTarWriter(serial, Compressor("serial"), chunk_size=4096).write(
+            tree.configs_dir, entries
+        )
+        index = IndexedTarWriter(
+            parallel, Compressor("parallel", threads=4), chunk_size=4096
+        ).write(tree.configs_dir, entries)
+
+        assert len(index["chunks"]) > 4
+        assert parallel.read_bytes() == serial.read_bytes()
+
+    def test_parallel_archive_reads_with_standard_tools(self, tree, tmp_path):
+        entries = sorted(p.name for p in tree.configs_dir.glob("file*.conf"))
+        archive = tmp_path / "backup.tar.gz"
+        compressor = Compressor("parallel", level=1, threads=3)
+
+        IndexedTarWriter(archive, compressor, chunk_size=4096).write(
+            tree.configs_dir, entries
+        )
+
+        listing = subprocess.run(
+            ["tar", "tzf", str(archive)], check=True, capture_output=True, text=True
+        )
+        assert listing.stdout.split() == entries
+        assert gzip.decompress(archive.read_bytes())
+
+    def test_map_keeps_order(self):
+        compressor = Compressor("parallel", threads=4)
+
+        assert list(compressor.map(lambda n: n * n, range(50))) == [
+            n * n for n in range(50)
+        ]
+
+    def test_unknown_backend_is_rejected(self):
+        with pytest.raises(ValueError):
+            Compressor("zstd")
+        with pytest.raises(ValueError):
+            Compressor("serial", level=12)
+        with pytest.raises(ValueError, match="1 \\(fastest\\) to 9"):
+            Compressor("serial", level=0)
+
+    @pytest.mark.parametrize("backup_format", ["tar", "store"])
+    def test_fast_level_round_trips(self, tree, backup_format):
+        tree.backup_format = backup_format
+        tree.backup_level = 1
+        manager = BackupManager(tree)
+        manager.create_backup()
+
+        (tree.configs_dir / "file3.conf").write_text("lost\n")
+        assert manager.restore_backup(manager.backups()[-1].name)
+
+        assert (tree.configs_dir / "file3.conf").read_text() == "value = 3\n" * 200
+
+
+class TestBackupSettings:
+    """Compression settings read from the environment."""
+
+    @pytest.mark.parametrize(
+        "name, value",
+        [
+            ("CSYNC_BACKUP_LEVEL", "fast"),
+            ("CSYNC_BACKUP_LEVEL", "0"),
+            ("CSYNC_BACKUP_LEVEL", "10"),
+            ("CSYNC_BACKUP_THREADS", "many"),
+            ("CSYNC_BACKUP_THREADS", "-2"),
+        ],
+    )
+    def test_bad_backup_settings_fall_back_to_defaults(
+        self, home, monkeypatch, name, value
+    ):
+        monkeypatch.setenv(name, value)
+        config = Config()
+
+        assert config.backup_level == 6
+        assert config.backup_threads is None
+        assert Compressor.from_config(config).level == 6
+
+    def test_valid_backup_settings_are_used(self, home, monkeypatch):
+        monkeypatch.setenv("CSYNC_BACKUP_LEVEL", "9")
+        monkeypatch.setenv("CSYNC_BACKUP_THREADS", "2")
+        config = Config()
+
+        assert (config.backup_level, config.backup_threads) == (9, 2)
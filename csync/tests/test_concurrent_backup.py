@@ -0,0 +1,82 @@
+"""Tests for running the sync backup alongside the network fetch."""
+
+import threading
+import time
+
+import pytest
+
+from csync.gittrace import GitStats
+from csync.session import SyncSession
+from csync.sync import Syncer
+
+
+class TestConcurrentBackup:
+    """The pre-sync backup running alongside the fetch."""
+
+    def test_backup_overlaps_fetch(self, configs, monkeypatch):
+        config, _ = configs
+        fetch_started = threading.Event()
+        backup_started = threading.Event()
+        seen = {}
+        original_fetch = SyncSession.fetch
+
+        def slow_fetch(self, force=False):
+            fetch_started.set()
+            seen["backup during fetch"] = backup_started.wait(5)
+            return original_fetch(self, force)
+
+        def slow_backup(self):
+            backup_started.set()
+            seen["fetch during backup"] = fetch_started.wait(5)
+            return True
+
+        monkeypatch.setattr(SyncSession, "fetch", slow_fetch)
+        monkeypatch.setattr(Syncer, "create_backup", slow_backup)
+
+        assert Syncer(config, session=SyncSession(config, ttl=0)).sync()
+
+        assert seen == {"backup during fetch": True, "fetch during backup": True}
+
+    def test_backup_finishes_before_stash(self, configs, monkeypatch):
+        config, _ = configs
+        (config.configs_dir / "zshrc").write_text("# edited\n")
+        finished = []
+
+        def slow_backup(self):
+            time.sleep(0.2)
+            finished.append(time.perf_counter())
+            return True
+
+        monkeypatch.setattr(Syncer, "create_backup", slow_backup)
+
+        with GitStats() as stats:
+            assert Syncer(config).sync()
+
+        stashes = [call for call in stats.calls if call.subcommand == "stash"]
+        assert stashes
+        assert all(call.start >= finished[0] for call in stashes)
+
+    def test_backup_failure_aborts_sync(self, configs, monkeypatch):
+        config, repo = configs
+        (config.configs_dir / "zshrc").write_text("# edited\n")
+        head = repo.head.commit.hexsha
+
+        def broken_backup(self):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(Syncer, "create_backup", broken_backup)
+
+        with pytest.raises(OSError):
+            Syncer(config).sync()
+
+        assert repo.head.commit.hexsha == head
+        assert (config.configs_dir / "zshrc").read_text() == "# edited\n"
+
+    def test_background_sync_skips_backup(self, configs, monkeypatch):
+        config, _ = configs
+        calls = []
+        monkeypatch.setattr(Syncer, "create_backup", lambda self: calls.append(1))
+
+        assert Syncer(config).sync(background=True)
+
+        assert calls == []
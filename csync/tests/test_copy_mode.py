@@ -0,0 +1,142 @@
+"""Tests for copy-mode marked entries and their two-way incremental sync."""
+
+import os
+
+import pytest
+
+from csync import transfer
+from csync.copysync import CopySync
+from csync.marked import MarkedFilesManager
+from csync.marked_manifest import MarkedManifest
+from csync.sync import Syncer
+
+
+def edit(path, text):
+    path.write_text(text)
+    # Make sure the change is visible even on coarse mtime filesystems
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestCopyMode:
+    """Copy-mode marked files synced in both directions."""
+
+    @pytest.fixture
+    def app_dir(self, configs, home):
+        """~/.config/app with 30 files, marked in copy mode."""
+        config, _ = configs
+        app = home / ".config" / "app"
+        app.mkdir(parents=True)
+        for i in range(30):
+            (app / f"setting{i}.json").write_text(f'{{"n": {i}}}\n')
+        assert MarkedFilesManager(config).mark_files([str(app)], copy=True)
+        return config, app, config.external_dir / ".config" / "app"
+
+    @pytest.fixture
+    def copies(self, monkeypatch):
+        """Files copied by csync during the test."""
+        copied = []
+        copy_file = transfer.copy_file
+
+        def counting(src, dst):
+            copied.append(os.path.basename(src))
+            return copy_file(src, dst)
+
+        monkeypatch.setattr(transfer, "copy_file", counting)
+        return copied
+
+    def test_mark_copy_keeps_real_files(self, app_dir):
+        config, app, external = app_dir
+
+        assert app.is_dir() and not app.is_symlink()
+        assert (external / "setting3.json").read_text() == '{"n": 3}\n'
+        assert (
+            MarkedManifest.load(config.marked_files).get(".config/app").sync == "copy"
+        )
+        assert not CopySync(config).plan()
+
+    def test_home_edit_copies_only_that_file(self, app_dir, copies):
+        config, app, external = app_dir
+        edit(app / "setting7.json", '{"n": 70}\n')
+
+        Syncer(config).sync_marked_files()
+
+        assert (external / "setting7.json").read_text() == '{"n": 70}\n'
+        assert copies == ["setting7.json"]
+        assert not CopySync(config).plan()
+
+    def test_external_edit_reaches_home(self, app_dir, copies):
+        config, app, external = app_dir
+        edit(external / "setting2.json", '{"n": 20}\n')
+        (external / "new.json").write_text("{}\n")
+
+        Syncer(config).sync_marked_files()
+
+        assert (app / "setting2.json").read_text() == '{"n": 20}\n'
+        assert (app / "new.json").exists()
+        assert sorted(copies) == ["new.json", "setting2.json"]
+
+    def test_touch_without_change_copies_nothing(self, app_dir, copies):
+        config, app, _ = app_dir
+        edit(app / "setting1.json", '{"n": 1}\n')
+
+        Syncer(config).sync_marked_files()
+
+        assert copies == []
+
+    def test_both_sides_changed_keeps_home_version(self, app_dir):
+        config, app, external = app_dir
+        edit(app / "setting4.json", "mine\n")
+        edit(external / "setting4.json", "theirs\n")
+
+        Syncer(config).sync_marked_files()
+
+        assert (app / "setting4.json").read_text() == "theirs\n"
+        assert (app / "setting4.json.csync-conflict").read_text() == "mine\n"
+
+    def test_deletes_propagate_but_edits_win(self, app_dir):
+        config, app, external = app_dir
+        (app / "setting5.json").unlink()
+        (app / "setting6.json").unlink()
+        edit(external / "setting6.json", "edited elsewhere\n")
+
+        Syncer(config).sync_marked_files()
+
+        assert not (external / "setting5.json").exists()
+        assert (app / "setting6.json").read_text() == "edited elsewhere\n"
+
+    def test_home_edit_defeats_fast_path(self, app_dir):
+        config, app, _ = app_dir
+        assert Syncer(config).sync(background=True)
+        assert Syncer(config).is_noop()
+
+        edit(app / "setting0.json", '{"n": 100}\n')
+
+        assert not Syncer(config).is_noop()
+
+    def test_unmark_copy_entry(self, app_dir, home):
+        config, app, external = app_dir
+
+        assert MarkedFilesManager(config).unmark_files([str(app)])
+
+        assert (app / "setting3.json").read_text() == '{"n": 3}\n'
+        assert not external.exists()
+        assert not CopySync(config).state
+
+    def test_dry_run_sync_touches_nothing(self, app_dir, home):
+        config, app, external = app_dir
+        edit(app / "setting4.json", "mine\n")
+        edit(external / "setting4.json", "theirs\n")
+        edit(app / "setting5.json", "home edit\n")
+        (home / ".vimrc").write_text("set number\n")
+        MarkedFilesManager(config).mark_file(str(home / ".vimrc"))
+        (home / ".vimrc").unlink()
+        state = config.copy_state_file.read_text()
+
+        assert Syncer(config).sync(dry_run=True)
+
+        assert (app / "setting4.json").read_text() == "mine\n"
+        assert not (app / "setting4.json.csync-conflict").exists()
+        assert (external / "setting5.json").read_text() == '{"n": 5}\n'
+        assert not (home / ".vimrc").is_symlink()
+        assert config.copy_state_file.read_text() == state
@@ -0,0 +1,180 @@
+"""Tests for the daemon's filesystem watchers and its event loop."""
+
+import os
+import signal
+
+import pytest
+
+from csync.daemon import InotifyWatcher
+from csync.daemon import PollingWatcher
+from csync.daemon import SyncDaemon
+
+
+def _watchers():
+    watchers = [lambda roots: PollingWatcher(roots, poll_interval=0.05)]
+    if InotifyWatcher.available():
+        watchers.append(InotifyWatcher)
+    return watchers
+
+
+class FakeWatcher:
+    """Replays scripted ``wait`` results, calling any callables, then stops."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.drains = 0
+        self.closed = False
+
+    def wait(self, timeout):
+        if not self.results:
+            raise KeyboardInterrupt
+        result = self.results.pop(0)
+        return result() if callable(result) else result
+
+    def drain(self):
+        self.drains += 1
+
+    def close(self):
+        self.closed = True
+
+
+class Snapshot:
+    def __init__(self, refs):
+        self.refs = refs
+
+
+class FakeSession:
+    def __init__(self, sha=None, error=None):
+        self.sha = sha
+        self.error = error
+        self.fetches = 0
+
+    def fetch(self, force=False):
+        self.fetches += 1
+        if self.error:
+            raise self.error
+        return Snapshot({"main": self.sha})
+
+
+class FakeSyncer:
+    def __init__(self, repo, during=None):
+        self.repo = repo
+        self.during = during
+        self.syncs = 0
+        self.finished = 0
+
+    def sync(self, background=False):
+        self.syncs += 1
+        if self.during:
+            self.during()
+        self.finished += 1
+        return True
+
+
+def run(daemon, watcher):
+    daemon._create_watcher = lambda: watcher
+    assert daemon.run()
+    assert watcher.closed
+    assert not daemon.pid_file.exists()
+
+
+class TestWatchers:
+    """Filesystem watchers the daemon listens to."""
+
+    @pytest.mark.parametrize("make_watcher", _watchers())
+    def test_watcher_reports_edits(self, tmp_path, make_watcher):
+        (tmp_path / "nested").mkdir()
+        watcher = make_watcher([tmp_path])
+        try:
+            assert not watcher.wait(0.1)
+            (tmp_path / "nested" / "zshrc").write_text("edit")
+            assert watcher.wait(1.0)
+        finally:
+            watcher.close()
+
+    @pytest.mark.parametrize("make_watcher", _watchers())
+    def test_watcher_ignores_git_and_sync_dirs(self, tmp_path, make_watcher):
+        (tmp_path / ".git").mkdir()
+        (tmp_path / ".sync").mkdir()
+        watcher = make_watcher([tmp_path])
+        try:
+            (tmp_path / ".git" / "index").write_text("index")
+            (tmp_path / ".sync" / "sync-status").write_text("✓")
+            assert not watcher.wait(0.2)
+        finally:
+            watcher.close()
+
+    def test_inotify_watches_new_directories(self, tmp_path):
+        if not InotifyWatcher.available():
+            pytest.skip("inotify is Linux only")
+        watcher = InotifyWatcher([tmp_path])
+        try:
+            (tmp_path / "newdir").mkdir()
+            assert watcher.wait(1.0)
+            watcher.drain()
+            (tmp_path / "newdir" / "file").write_text("x")
+            assert watcher.wait(1.0)
+        finally:
+            watcher.close()
+
+
+class TestDaemon:
+    """Debouncing, remote polling and shutdown of the sync loop."""
+
+    @pytest.fixture
+    def daemon(self, configs):
+        config, repo = configs
+        daemon = SyncDaemon(config, debounce=0, fetch_interval=3600)
+        daemon.session = FakeSession(repo.head.commit.hexsha)
+        daemon.syncer = FakeSyncer(repo)
+        handler = signal.getsignal(signal.SIGTERM)
+        yield daemon
+        signal.signal(signal.SIGTERM, handler)
+
+    def test_burst_of_edits_syncs_once(self, daemon):
+        watcher = FakeWatcher(True, True, True, False)
+
+        run(daemon, watcher)
+
+        assert daemon.syncer.syncs == 1
+        # Our own sync's events are dropped, as are the remote poll's
+        assert watcher.drains == 2
+
+    def test_poll_remote_syncs_only_when_remote_moved(self, daemon):
+        run(daemon, FakeWatcher(False))
+        assert daemon.syncer.syncs == 0
+        assert daemon.config.sync_status_file.read_text() == "✓"
+
+        daemon.session.sha = "0" * 40
+        run(daemon, FakeWatcher(False))
+        assert daemon.syncer.syncs == 1
+        assert daemon.session.fetches == 2
+
+    def test_failed_fetch_marks_status(self, daemon):
+        daemon.session.error = OSError("offline")
+
+        run(daemon, FakeWatcher(False))
+
+        assert daemon.syncer.syncs == 0
+        assert daemon.config.sync_status_file.read_text() == "✗"
+
+    def test_sigterm_stops_the_loop(self, daemon):
+        def terminate():
+            os.kill(os.getpid(), signal.SIGTERM)
+            return True
+
+        watcher = FakeWatcher(terminate, False, False)
+
+        run(daemon, watcher)
+
+        assert daemon.syncer.syncs == 0
+        assert len(watcher.results) == 2
+
+    def test_sigterm_waits_for_the_running_sync(self, daemon):
+        daemon.syncer.during = lambda: os.kill(os.getpid(), signal.SIGTERM)
+        watcher = FakeWatcher(True, False, True, False)
+
+        run(daemon, watcher)
+
+        assert daemon.syncer.finished == 1
+        assert watcher.results == [True, False]
@@ -0,0 +1,110 @@
+"""Budgets for the number of git processes the hot paths may spawn.
+
+If one of these fails, a change added forks to sync/status/mark. Either
+avoid the extra git call or, if it is really needed, raise the budget here
+in the same change so the cost is visible in review.
+"""
+
+import pytest
+
+from csync.backup import BackupManager
+from csync.gittrace import GitStats
+from csync.marked import MarkedFilesManager
+from csync.session import SyncSession
+from csync.status import StatusDisplay
+from csync.sync import Syncer
+
+# (max git processes, max network round trips)
+SYNC_NOOP_BUDGET = (2, 0)
+SYNC_CHANGE_BUDGET = (16, 2)
+STATUS_BUDGET = (4, 0)
+MARK_BUDGET = (5, 0)
+
+
+def assert_within(stats, budget):
+    spawns, network = budget
+    breakdown = {name: count for name, (count, _) in stats.by_subcommand().items()}
+    assert stats.spawns <= spawns, f"{stats.spawns} git processes: {breakdown}"
+    assert stats.network_round_trips <= network, breakdown
+
+
+class TestGitBudget:
+    """Git process budgets of the hot commands."""
+
+    @pytest.fixture
+    def synced(self, configs):
+        """A checkout that has completed one full sync."""
+        config, repo = configs
+        assert Syncer(config).sync(background=True)
+        return config, repo
+
+    def test_noop_sync_budget(self, synced):
+        config, _ = synced
+
+        with GitStats() as stats:
+            assert Syncer(config).sync(background=True)
+
+        assert_within(stats, SYNC_NOOP_BUDGET)
+
+    def test_interactive_noop_sync_budget(self, synced):
+        config, _ = synced
+        backups = len(BackupManager(config).backups())
+
+        with GitStats() as stats:
+            assert Syncer(config).sync()
+
+        assert_within(stats, SYNC_NOOP_BUDGET)
+        assert len(BackupManager(config).backups()) == backups
+
+    def test_sync_with_changes_budget(self, synced):
+        config, _ = synced
+        (config.configs_dir / "zshrc").write_text("# changed\n")
+
+        with GitStats() as stats:
+            session = SyncSession(config, ttl=0)
+            assert Syncer(config, session=session).sync(background=True)
+
+        assert_within(stats, SYNC_CHANGE_BUDGET)
+
+    def test_status_budget(self, synced):
+        config, _ = synced
+
+        with GitStats() as stats:
+            StatusDisplay(config).show_status()
+
+        assert_within(stats, STATUS_BUDGET)
+
+    def test_mark_budget(self, configs, home):
+        config, _ = configs
+        target = home / ".vimrc"
+        target.write_text("set number\n")
+
+        with GitStats() as stats:
+            assert MarkedFilesManager(config).mark_file(str(target))
+
+        assert_within(stats, MARK_BUDGET)
+
+
+class TestGitStats:
+    """Counting git processes per subcommand."""
+
+    def test_stats_count_by_subcommand(self, configs):
+        _, repo = configs
+
+        with GitStats() as stats:
+            repo.git.status("--porcelain")
+            repo.git.rev_parse("HEAD")
+
+        assert stats.spawns == 2
+        assert set(stats.by_subcommand()) == {"status", "rev-parse"}
+
+    def test_stats_from_env(self, monkeypatch):
+        monkeypatch.delenv("CSYNC_GIT_STATS", raising=False)
+        assert GitStats.from_env() is None
+
+        monkeypatch.setenv("CSYNC_GIT_STATS", "1")
+        stats = GitStats.from_env()
+        try:
+            assert stats is not None
+        finally:
+            stats.stop()
@@ -9,6 +9,7 @@ import git
 import pytest
 
 from csync.config import Config
+from csync.staging import StagingVerifier
 from csync.sync import Syncer
 
 
@@ -385,6 +386,84 @@ class TestSyncerSafeguards:
             assert not any(".pyc" in s for s in staged)
 
 
+class TestStagingVerifier:
+    """Test the batched check of staged paths against the real ignore rules."""
+
+    @pytest.fixture
+    def repo(self, tmp_path):
+        """Repository with a .gitignore that includes a negated pattern."""
+        repo = git.Repo.init(tmp_path)
+        (tmp_path / ".gitignore").write_text(
+            "__pycache__/\n*.local\n*.log\n!keep.log\n"
+        )
+        repo.index.add([".gitignore"])
+        repo.index.commit("Add .gitignore")
+        return repo
+
+    def test_force_added_ignored_files_are_reported(self, repo):
+        root = Path(repo.working_dir)
+        (root / "__pycache__").mkdir()
+        (root / "__pycache__" / "bad.pyc").write_text("bytecode")
+        (root / "zshrc.local").write_text("local")
+        (root / "valid.txt").write_text("valid")
+
+        repo.git.add("--all", ".")
+        repo.git.add("--force", "__pycache__/bad.pyc", "zshrc.local")
+
+        ignored = StagingVerifier(repo).find_ignored()
+
+        assert sorted(entry.path for entry in ignored) == [
+            "__pycache__/bad.pyc",
+            "zshrc.local",
+        ]
+        local = next(entry for entry in ignored if entry.path == "zshrc.local")
+        assert local.rule == ".gitignore:2"
+        assert local.pattern == "*.local"
+
+    def test_negated_patterns_are_not_reported(self, repo):
+        root = Path(repo.working_dir)
+        (root / "keep.log").write_text("kept")
+        repo.git.add("--all", ".")
+
+        assert StagingVerifier(repo).find_ignored() == []
+
+    def test_thousands_of_staged_files_checked_in_one_pass(self, repo):
+        root = Path(repo.working_dir)
+        for i in range(3000):
+            (root / f"file{i}.txt").write_text(str(i))
+        (root / "debug.log").write_text("noise")
+        repo.git.add("--all", ".")
+        repo.git.add("--force", "debug.log")
+
+        verifier = StagingVerifier(repo)
+        assert len(verifier.staged_paths()) == 3001
+        assert [entry.path for entry in verifier.find_ignored()] == ["debug.log"]
+
+    def test_sync_aborts_commit_when_ignored_file_staged(self, configs):
+        config, repo = configs
+        (config.configs_dir / "zshrc.local").write_text("secret")
+        repo.git.add("--force", "zshrc.local")
+        (config.configs_dir / "zshrc").write_text("# edited")
+        head = repo.head.commit
+
+        assert Syncer(config).sync(background=True) is False
+        assert repo.head.commit == head
+        assert config.sync_status_file.read_text() == "✗"
+        assert not repo.index.diff("HEAD")
+
+    def test_tracked_ignored_files_do_not_block_sync(self, configs):
+        config, repo = configs
+        (config.configs_dir / "zshrc.local").write_text("secret")
+        repo.git.add("--force", "zshrc.local")
+        repo.index.commit("Track a local override on purpose")
+        (config.configs_dir / "zshrc.local").write_text("secret, edited")
+        (config.configs_dir / "zshrc").write_text("# edited")
+
+        assert Syncer(config).sync(background=True)
+        assert "zshrc.local" in repo.head.commit.stats.files
+        assert "zshrc" in repo.head.commit.stats.files
+
+
 class TestRegressionPrevention:
     """Tests to prevent regression of the gitignore bug."""
 
@@ -0,0 +1,117 @@
+"""Tests for the structured marked-files manifest."""
+
+import json
+
+import pytest
+
+from csync.marked import MarkedFilesManager
+from csync.marked_manifest import MarkedManifest
+from csync.status import StatusDisplay
+from csync.sync import Syncer
+
+
+class TestMarkedManifest:
+    """The .marked-files manifest and its metadata."""
+
+    @pytest.fixture
+    def marked(self, configs, home):
+        config, repo = configs
+        (home / ".vimrc").write_text("set number\n")
+        (home / ".config" / "k9s").mkdir(parents=True)
+        (home / ".config" / "k9s" / "skin.yaml").write_text("k9s: {}\n")
+        manager = MarkedFilesManager(config)
+        assert manager.mark_file(str(home / ".vimrc"))
+        assert manager.mark_file(str(home / ".config" / "k9s"))
+        return config, repo
+
+    def test_entries_record_metadata(self, marked):
+        config, _ = marked
+        data = json.loads(config.marked_files.read_text())
+
+        vimrc = data["entries"][".vimrc"]
+        assert vimrc["type"] == "file"
+        assert vimrc["size"] == len("set number\n")
+        assert vimrc["mtime"] == (config.external_dir / ".vimrc").stat().st_mtime_ns
+        assert data["entries"][".config/k9s"]["type"] == "dir"
+        assert not list(config.configs_dir.glob(".*.tmp"))
+
+    def test_plain_list_migrates(self, configs, home):
+        config, _ = configs
+        (config.external_dir / ".vimrc").parent.mkdir(parents=True, exist_ok=True)
+        (config.external_dir / ".vimrc").write_text("set number\n")
+        (config.external_dir / ".gitconfig").write_text("[user]\n")
+        config.marked_files.write_text(".vimrc\n.gitconfig\n")
+
+        assert MarkedManifest.load(config.marked_files).paths() == [
+            ".vimrc",
+            ".gitconfig",
+        ]
+        Syncer(config).sync_marked_files()
+        assert (home / ".vimrc").is_symlink()
+
+        (home / ".zshenv").write_text("export A=1\n")
+        assert MarkedFilesManager(config).mark_file(str(home / ".zshenv"))
+        data = json.loads(config.marked_files.read_text())
+        assert list(data["entries"]) == [".vimrc", ".gitconfig", ".zshenv"]
+
+    def test_manifest_is_parsed_once(self, marked, monkeypatch):
+        config, _ = marked
+        parses = []
+        parse = MarkedManifest._parse
+        monkeypatch.setattr(
+            MarkedManifest,
+            "_parse",
+            staticmethod(lambda text: parses.append(1) or parse(text)),
+        )
+        config.marked_files.write_text(config.marked_files.read_text() + "\n")
+
+        Syncer(config).sync_marked_files()
+        StatusDisplay(config).show_status()
+        MarkedFilesManager(config).list_marked()
+
+        assert parses == [1]
+
+    def test_unmark_removes_entry(self, marked, home):
+        config, _ = marked
+
+        assert MarkedFilesManager(config).unmark_file(str(home / ".vimrc"))
+
+        assert MarkedManifest.load(config.marked_files).paths() == [".config/k9s"]
+        assert (home / ".vimrc").read_text() == "set number\n"
+
+    def test_marking_never_reads_content(self, configs, home, monkeypatch):
+        config, _ = configs
+        big = home / ".cache" / "models"
+        big.mkdir(parents=True)
+        for i in range(5):
+            (big / f"blob{i}").write_bytes(b"x" * 100_000)
+        opened = []
+        real_open = open
+
+        def tracking_open(path, *args, **kwargs):
+            opened.append(str(path))
+            return real_open(path, *args, **kwargs)
+
+        monkeypatch.setattr("builtins.open", tracking_open)
+        assert MarkedFilesManager(config).mark_file(str(big))
+        monkeypatch.undo()
+
+        assert not [path for path in opened if "blob" in path]
+        entry = MarkedManifest.load(config.marked_files).get(".cache/models")
+        assert entry.size == 500_000
+
+    def test_hash_from_older_manifests_is_kept(self, configs):
+        config, _ = configs
+        config.marked_files.write_text(
+            json.dumps(
+                {"version": 1, "entries": {".vimrc": {"type": "file", "hash": "ab12"}}}
+            )
+        )
+
+        manifest = MarkedManifest.load(config.marked_files)
+        manifest.save()
+
+        assert (
+            json.loads(config.marked_files.read_text())["entries"][".vimrc"]["hash"]
+            == "ab12"
+        )
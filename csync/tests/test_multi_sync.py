@@ -0,0 +1,145 @@
+"""Tests for syncing several config repositories concurrently."""
+
+import os
+import re
+import time
+
+import git
+
+from csync.config import Config
+from csync.config import load_repositories
+from csync.multi import MultiSyncer
+from csync.sync import Syncer
+
+
+def _make_repo(tmp_path, name):
+    bare = git.Repo.init(tmp_path / f"{name}.git", bare=True, initial_branch=name)
+    work_dir = tmp_path / name
+    work = git.Repo.init(work_dir, initial_branch=name)
+    writer = work.config_writer()
+    writer.set_value("user", "name", "tester")
+    writer.set_value("user", "email", "tester@example.com")
+    writer.release()
+    (work_dir / ".gitignore").write_text(".sync/\n")
+    work.index.add([".gitignore"])
+    work.index.commit("Initial commit")
+    work.create_remote("origin", bare.git_dir)
+    work.remotes.origin.push(f"{name}:{name}")
+    return work_dir
+
+
+class TestRepositoriesFile:
+    """Loading the list of repositories to sync."""
+
+    def test_load_repositories_from_yaml(self, tmp_path, home, monkeypatch):
+        repos_file = tmp_path / "repos.yaml"
+        repos_file.write_text(
+            "repositories:\n"
+            "  - name: personal\n"
+            "    path: ~/configs\n"
+            "  - name: work\n"
+            "    path: ~/work-configs\n"
+            "    branch: work\n"
+            "    external_dir: dotfiles\n"
+            "    marked_files: .work-marked\n"
+        )
+        monkeypatch.setenv("CSYNC_REPOS_FILE", str(repos_file))
+
+        personal, work = load_repositories()
+
+        assert personal.name == "personal"
+        assert personal.configs_dir == home / "configs"
+        assert work.branch == "work"
+        assert work.external_dir == home / "work-configs" / "dotfiles"
+        assert work.marked_files == home / "work-configs" / ".work-marked"
+        assert work.sync_dir == home / "work-configs" / ".sync"
+
+    def test_load_repositories_defaults_to_detected_dir(
+        self, tmp_path, home, monkeypatch
+    ):
+        monkeypatch.setenv("CSYNC_REPOS_FILE", str(tmp_path / "missing.yaml"))
+
+        (config,) = load_repositories()
+
+        assert config.configs_dir == Config().configs_dir
+
+
+class TestMultiSync:
+    """Syncing several repositories on a worker pool."""
+
+    def test_sync_all_pushes_each_repo_to_its_branch(self, tmp_path, home):
+        configs = [
+            Config(configs_dir=_make_repo(tmp_path, name), branch=name, name=name)
+            for name in ("personal", "work")
+        ]
+        for config in configs:
+            (config.configs_dir / ".gitignore").write_text(".sync/\n*.local\n")
+
+        results = MultiSyncer(configs).sync_all()
+
+        assert [result.ok for result in results] == [True, True]
+        for config in configs:
+            remote = git.Repo(tmp_path / f"{config.name}.git")
+            assert remote.heads[config.name].commit.message.startswith("Sync from")
+
+    def test_sync_all_runs_repos_concurrently(self, tmp_path, home, monkeypatch):
+        def slow_sync(self, **kwargs):
+            time.sleep(0.3)
+            return True
+
+        monkeypatch.setattr(Syncer, "sync", slow_sync)
+        configs = [
+            Config(configs_dir=_make_repo(tmp_path, f"repo{i}"), branch=f"repo{i}")
+            for i in range(4)
+        ]
+
+        start = time.perf_counter()
+        results = MultiSyncer(configs, max_workers=4).sync_all()
+
+        assert all(result.ok for result in results)
+        assert time.perf_counter() - start < 0.9
+
+    def test_missing_repo_reported_not_raised(self, tmp_path, home):
+        config = Config(configs_dir=tmp_path / "absent", name="absent")
+
+        (result,) = MultiSyncer([config]).sync_all()
+
+        assert not result.ok
+        assert "does not exist" in str(result.error)
+
+    def test_sync_all_keeps_the_callers_mode(self, tmp_path, home, monkeypatch):
+        modes = []
+
+        def record_sync(self, dry_run=False, background=False):
+            modes.append(background)
+            return True
+
+        monkeypatch.setattr(Syncer, "sync", record_sync)
+        configs = [
+            Config(configs_dir=_make_repo(tmp_path, "personal"), branch="personal")
+        ]
+
+        MultiSyncer(configs).sync_all()
+        MultiSyncer(configs).sync_all(background=True)
+
+        assert modes == [False, True]
+
+    def test_interactive_sync_all_links_once_in_blocks(self, tmp_path, home, capsys):
+        primary = _make_repo(home, "configs")
+        work = _make_repo(tmp_path, "work")
+        for repo_dir in (primary, work):
+            (repo_dir / "zshrc").write_text(f"# {repo_dir.name}\n")
+        configs = [
+            Config(configs_dir=work, branch="work", name="work"),
+            Config(configs_dir=primary, branch="configs", name="configs"),
+        ]
+
+        results = MultiSyncer(configs).sync_all()
+
+        assert all(result.ok for result in results)
+        assert os.readlink(home / ".zshrc") == str(primary / "zshrc")
+        output = capsys.readouterr().out
+        # Each repo's lines follow its own "name ────" rule, none interleaved
+        blocks = re.split(r"^\w+ ─+$", output, flags=re.M)[1:]
+        assert len(blocks) == 2
+        assert all(block.count("Starting sync") == 1 for block in blocks)
@@ -0,0 +1,57 @@
+"""Tests for the per-phase profiler and its Chrome trace output."""
+
+import json
+
+from csync.profiler import Profiler
+from csync.session import SyncSession
+from csync.status import StatusDisplay
+from csync.sync import Syncer
+
+
+class TestProfiler:
+    """Profiling sync phases and git commands."""
+
+    def test_disabled_profiler_records_nothing(self, configs):
+        config, _ = configs
+        profiler = Profiler.disabled().start()
+
+        Syncer(config, profiler=profiler).sync(background=True)
+        profiler.stop()
+
+        assert profiler.phases == []
+        assert profiler.git_calls == []
+
+    def test_sync_phases_and_git_commands_recorded(self, configs):
+        config, _ = configs
+        (config.configs_dir / "zshrc").write_text("# edited\n")
+
+        with Profiler() as profiler:
+            session = SyncSession(config)
+            Syncer(config, session=session, profiler=profiler).sync(background=True)
+            StatusDisplay(config, session=session, profiler=profiler).show_status()
+
+        names = {record.name for record in profiler.phases}
+        assert {"sync", "fetch", "stash", "commit", "push", "sync-status"} <= names
+
+        fetch = next(record for record in profiler.phases if record.name == "fetch")
+        assert any(
+            call.network and call.subcommand == "fetch" for call in fetch.git_calls
+        )
+        push = next(record for record in profiler.phases if record.name == "push")
+        assert any(call.network and not call.spawn for call in push.git_calls)
+
+    def test_chrome_trace_is_valid_trace_event_json(self, configs, tmp_path):
+        config, _ = configs
+
+        with Profiler() as profiler:
+            Syncer(config, profiler=profiler).sync(background=True)
+
+        trace_file = profiler.write_chrome_trace(tmp_path / "trace.json")
+        events = json.loads(trace_file.read_text())["traceEvents"]
+
+        complete = [event for event in events if event["ph"] == "X"]
+        assert complete
+        assert all(event["dur"] >= 0 and "ts" in event for event in complete)
+        assert {event["cat"] for event in complete} >= {"phase", "git", "network"}
+        sync_event = next(event for event in complete if event["name"] == "sync")
+        assert "cpu_ms" in sync_event["args"]
@@ -0,0 +1,86 @@
+"""Tests for reconciling marked-file links in $HOME."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from csync.marked_manifest import MarkedEntry
+from csync.marked_manifest import MarkedManifest
+from csync.reconcile import LinkReconciler
+from csync.sync import Syncer
+
+
+def actions(reconciler):
+    return {action.path: action.action for action in reconciler.plan()}
+
+
+class TestReconcile:
+    """Planning and applying marked-file reconciliation."""
+
+    @pytest.fixture
+    def marked(self, configs, home):
+        """Marked entries in every state the reconciler distinguishes."""
+        config, _ = configs
+        external = config.external_dir
+        names = ["good", "relative", "absent", "stale", "real", "dir", "lost"]
+        manifest = MarkedManifest(config.marked_files)
+        for name in names:
+            manifest.add(MarkedEntry(f".{name}"))
+            if name != "lost":
+                external.mkdir(exist_ok=True)
+                (external / f".{name}").write_text(f"{name}\n")
+        manifest.save()
+
+        os.symlink(external / ".good", home / ".good")
+        os.symlink(os.path.relpath(external / ".relative", home), home / ".relative")
+        os.symlink(external / ".good", home / ".stale")
+        (home / ".real").write_text("local copy\n")
+        (home / ".dir").mkdir()
+        return config
+
+    def test_plan_classifies_every_entry(self, marked):
+        assert actions(LinkReconciler(marked)) == {
+            ".good": "ok",
+            ".relative": "ok",
+            ".absent": "link",
+            ".stale": "relink",
+            ".real": "replace",
+            ".dir": "conflict",
+            ".lost": "missing",
+        }
+
+    def test_plan_never_resolves(self, marked, monkeypatch):
+        def no_resolve(self, strict=False):
+            raise AssertionError("resolve() walks every path component")
+
+        monkeypatch.setattr(Path, "resolve", no_resolve)
+
+        assert len(LinkReconciler(marked, workers=4).plan()) == 7
+
+    def test_reconcile_touches_only_differing_entries(self, marked, home):
+        before = os.lstat(home / ".good")
+
+        LinkReconciler(marked).reconcile()
+
+        assert os.lstat(home / ".good").st_ino == before.st_ino
+        for name in ("absent", "stale", "real"):
+            assert (home / f".{name}").read_text() == f"{name}\n"
+        assert (home / ".dir").is_dir()
+        assert set(actions(LinkReconciler(marked)).values()) == {
+            "ok",
+            "conflict",
+            "missing",
+        }
+
+    def test_dry_run_changes_nothing(self, marked, home):
+        LinkReconciler(marked).reconcile(dry_run=True)
+
+        assert not (home / ".absent").exists()
+        assert (home / ".real").read_text() == "local copy\n"
+
+    def test_sync_reports_actions(self, marked):
+        result = Syncer(marked).sync_marked_files()
+
+        assert [a.path for a in result if a.action == "relink"] == [".stale"]
+        assert all(action.error is None for action in result)
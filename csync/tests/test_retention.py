@@ -0,0 +1,207 @@
+"""Tests for tiered backup retention and the backup catalog."""
+
+import os
+from datetime import datetime
+from datetime import timedelta
+
+import pytest
+
+from csync.backup import Backup
+from csync.backup import BackupManager
+from csync.backup_catalog import BackupCatalog
+from csync.retention import RetentionPolicy
+from csync.retention import parse_size
+
+START = datetime(2024, 1, 1)
+
+
+def make_backups(*offsets, size=0):
+    """Store backups at ``START + offset``, oldest first."""
+    return [
+        Backup(f"backup-{(START + offset):%Y%m%d-%H%M%S}.json", "store", size=size)
+        for offset in sorted(offsets)
+    ]
+
+
+def names(backups):
+    return [backup.stamp for backup in backups]
+
+
+class TestRetentionPolicy:
+    """Which backups tiered retention and the budget keep."""
+
+    def test_last_keeps_newest(self):
+        backups = make_backups(*(timedelta(minutes=m) for m in range(6)))
+        policy = RetentionPolicy(last=2, hourly=0, daily=0, weekly=0)
+
+        keep, remove = policy.select(backups)
+
+        assert names(keep) == ["20240101-000400", "20240101-000500"]
+        assert len(remove) == 4
+
+    def test_hourly_keeps_newest_per_hour(self):
+        backups = make_backups(
+            timedelta(hours=0, minutes=10),
+            timedelta(hours=0, minutes=50),
+            timedelta(hours=1, minutes=5),
+            timedelta(hours=1, minutes=40),
+            timedelta(hours=2, minutes=30),
+        )
+        policy = RetentionPolicy(last=0, hourly=2, daily=0, weekly=0)
+
+        keep, _ = policy.select(backups)
+
+        assert names(keep) == ["20240101-014000", "20240101-023000"]
+
+    def test_tiers_reach_back_further(self):
+        backups = make_backups(
+            *(timedelta(days=d, hours=h) for d in range(20) for h in (1, 13))
+        )
+        policy = RetentionPolicy(last=1, hourly=0, daily=3, weekly=2)
+
+        keep, _ = policy.select(backups)
+
+        # Newest of the last three days, plus the newest of the previous week
+        assert names(keep) == [
+            "20240114-130000",
+            "20240118-130000",
+            "20240119-130000",
+            "20240120-130000",
+        ]
+
+    def test_size_budget_drops_oldest_first(self):
+        backups = make_backups(*(timedelta(hours=h) for h in range(4)), size=100)
+        policy = RetentionPolicy(last=4, hourly=0, daily=0, weekly=0, max_bytes=250)
+
+        keep, remove = policy.select(backups)
+
+        assert names(keep) == ["20240101-020000", "20240101-030000"]
+        assert names(remove) == ["20240101-000000", "20240101-010000"]
+
+    def test_size_budget_keeps_newest_backup(self):
+        backups = make_backups(timedelta(0), timedelta(hours=1), size=500)
+        policy = RetentionPolicy(max_bytes=100)
+
+        keep, _ = policy.select(backups)
+
+        assert names(keep) == ["20240101-010000"]
+
+    def test_size_budget_asks_measure_only_when_over(self):
+        backups = make_backups(*(timedelta(hours=h) for h in range(3)), size=100)
+        asked = []
+
+        def measure(kept):
+            asked.append(len(kept))
+            return 100
+
+        assert len(RetentionPolicy(max_bytes=300).select(backups, measure)[0]) == 3
+        assert asked == []
+
+        keep, _ = RetentionPolicy(max_bytes=150).select(backups, measure)
+        assert len(keep) == 3
+        assert asked == [3]
+
+    def test_parse(self):
+        policy = RetentionPolicy.parse("last=3, daily=10", "500M")
+
+        assert (policy.last, policy.hourly, policy.daily, policy.weekly) == (
+            3,
+            24,
+            10,
+            4,
+        )
+        assert policy.max_bytes == 500 * 1024**2
+        assert parse_size("1.5K") == 1536
+        assert parse_size("0") == 0
+        with pytest.raises(ValueError):
+            RetentionPolicy.parse("monthly=3")
+        with pytest.raises(ValueError):
+            parse_size("lots")
+
+
+class TestPruning:
+    """Pruning real backups through the catalog."""
+
+    def test_size_budget_counts_shared_store_objects(self, configs):
+        config, _ = configs
+        config.backup_retention = "last=10,hourly=0,daily=0,weekly=0"
+        config.backup_max_size = "20K"
+        manager = BackupManager(config)
+        big = config.configs_dir / "big.bin"
+
+        big.write_bytes(os.urandom(30 * 1024))
+        manager.create_backup()
+        (config.configs_dir / "zshrc").write_text("# second\n")
+        manager.create_backup()
+        # The big file leaves the tree; only older backups still need it
+        big.unlink()
+        (config.configs_dir / "zshrc").write_text("# third\n")
+        manager.create_backup()
+
+        on_disk = sum(
+            path.stat().st_size
+            for path in config.backup_dir.rglob("*")
+            if path.is_file() and path.name != "catalog.jsonl"
+        )
+        assert on_disk <= 20 * 1024
+        assert len(manager.backups()) == 1
+
+    def test_catalog_replays_and_compacts(self, configs):
+        config, _ = configs
+        catalog = BackupCatalog(config)
+        for i in range(40):
+            catalog.add({"name": f"b{i:02}", "kind": "git", "created": f"{i:02}"})
+        for i in range(38):
+            catalog.remove(f"b{i:02}")
+
+        reloaded = BackupCatalog(config)
+        assert [entry["name"] for entry in reloaded.entries()] == ["b38", "b39"]
+        # Compaction kept the log from growing with every removal
+        assert len(catalog.path.read_text().splitlines()) < 40
+
+    def test_prune_uses_catalog(self, configs, monkeypatch):
+        config, _ = configs
+        config.backup_retention = "last=2,hourly=0,daily=0,weekly=0"
+        manager = BackupManager(config)
+        for i in range(3):
+            (config.configs_dir / "zshrc").write_text(f"# {i}\n")
+            manager.create_backup()
+
+        def no_scan(self):
+            raise AssertionError("backup creation scanned the backup directory")
+
+        monkeypatch.setattr(BackupManager, "scan", no_scan)
+        (config.configs_dir / "zshrc").write_text("# 3\n")
+        manager.create_backup()
+
+        monkeypatch.undo()
+        kept = [entry["name"] for entry in BackupCatalog(config).entries()]
+        assert [backup.name for backup in manager.scan()] == kept
+        assert len(kept) == 2
+
+    def test_quick_backups_stay_in_order_after_pruning(self, configs):
+        config, _ = configs
+        config.backup_retention = "last=1,hourly=0,daily=0,weekly=0"
+        manager = BackupManager(config)
+        for i in range(3):
+            (config.configs_dir / "zshrc").write_text(f"# {i}\n")
+            manager.create_backup()
+
+        (config.configs_dir / "zshrc").write_text("# lost\n")
+        assert manager.restore_backup(manager.backups()[-1].name)
+        assert (config.configs_dir / "zshrc").read_text() == "# 2\n"
+
+    @pytest.mark.parametrize("backup_format", ["store", "tar", "git"])
+    def test_restore_point_spares_the_restored_backup(self, configs, backup_format):
+        config, _ = configs
+        config.backup_format = backup_format
+        config.backup_retention = "last=1,hourly=0,daily=0,weekly=0"
+        manager = BackupManager(config)
+        manager.create_backup()
+        (backup,) = manager.backups()
+
+        (config.configs_dir / "zshrc").write_text("# broken\n")
+        assert manager.restore_backup(backup.name)
+
+        assert (config.configs_dir / "zshrc").read_text() != "# broken\n"
+        assert backup.name in [b.name for b in manager.backups()]
@@ -0,0 +1,90 @@
+"""Tests for cross-process sync serialization and request coalescing."""
+
+import threading
+import time
+
+import pytest
+
+from csync.config import Config
+from csync.lock import SyncLock
+
+
+def _start(target):
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread
+
+
+class TestSyncLock:
+    """Serialising syncs and coalescing the callers waiting."""
+
+    @pytest.fixture
+    def config(self, tmp_path):
+        config = Config()
+        config.configs_dir = tmp_path
+        config.setup_paths()
+        return config
+
+    def test_runs_never_overlap(self, config):
+        active = []
+        overlaps = []
+
+        def work():
+            active.append(1)
+            if len(active) > 1:
+                overlaps.append(1)
+            time.sleep(0.05)
+            active.pop()
+            return True
+
+        threads = [
+            _start(lambda: SyncLock(config).run(work, coalesce=False)) for _ in range(4)
+        ]
+        for thread in threads:
+            thread.join()
+
+        assert not overlaps
+
+    def test_waiters_share_one_follow_up_run(self, config):
+        runs = []
+        release_first = threading.Event()
+
+        def work():
+            runs.append(len(runs) + 1)
+            if len(runs) == 1:
+                release_first.wait(5)
+            return len(runs)
+
+        results = []
+        first = _start(lambda: results.append(SyncLock(config).run(work)))
+        time.sleep(0.1)
+
+        waiters = [
+            _start(lambda: results.append(SyncLock(config).run(work))) for _ in range(5)
+        ]
+        time.sleep(0.2)
+        release_first.set()
+
+        for thread in [first, *waiters]:
+            thread.join()
+
+        assert len(runs) == 2
+        assert sorted(results) == [1, 2, 2, 2, 2, 2]
+
+    def test_background_caller_skips_when_follow_up_queued(self, config):
+        release = threading.Event()
+
+        def slow():
+            release.wait(5)
+            return True
+
+        first = _start(lambda: SyncLock(config).run(slow))
+        time.sleep(0.1)
+        queued = _start(lambda: SyncLock(config).run(lambda: True))
+        time.sleep(0.1)
+
+        assert SyncLock(config).run(lambda: True, wait=False) is None
+
+        release.set()
+        first.join()
+        queued.join()
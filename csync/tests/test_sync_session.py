@@ -0,0 +1,134 @@
+"""Tests for the shared, TTL-cached remote snapshot."""
+
+import time
+from pathlib import Path
+
+import git
+import pytest
+
+from csync.session import SyncSession
+from csync.status import StatusDisplay
+from csync.sync import Syncer
+
+
+def _push_from_elsewhere(remote, tmp_path):
+    """Commit and push from another clone, as a second machine would."""
+    other = git.Repo.clone_from(remote.git_dir, tmp_path / "elsewhere", branch="main")
+    other.config_writer().set_value("user", "name", "other").release()
+    other.config_writer().set_value("user", "email", "other@example.com").release()
+    (tmp_path / "elsewhere" / "other.txt").write_text("from elsewhere\n")
+    other.index.add(["other.txt"])
+    other.index.commit("Edit elsewhere")
+    other.remotes.origin.push("main:main")
+
+
+class TestSyncSession:
+    """One fetch shared by sync and status, and pushes."""
+
+    @pytest.fixture
+    def fetch_calls(self, monkeypatch):
+        """Count every ``git fetch`` issued through GitPython."""
+        calls = []
+        original = git.Remote.fetch
+
+        def counting_fetch(self, *args, **kwargs):
+            calls.append(self.name)
+            return original(self, *args, **kwargs)
+
+        monkeypatch.setattr(git.Remote, "fetch", counting_fetch)
+        return calls
+
+    def test_sync_and_status_share_one_fetch(self, configs, fetch_calls):
+        config, repo = configs
+        (config.configs_dir / "new.txt").write_text("hello")
+
+        session = SyncSession(config)
+        syncer = Syncer(config, session=session)
+        assert syncer.sync(background=True)
+        assert StatusDisplay(config, session=session).check_sync_status() == "synced"
+
+        assert fetch_calls == ["origin"]
+
+    def test_snapshot_reused_across_sessions_within_ttl(self, configs, fetch_calls):
+        config, _ = configs
+
+        SyncSession(config).fetch()
+        SyncSession(config).fetch()
+
+        assert len(fetch_calls) == 1
+        assert config.remote_snapshot_file.exists()
+
+    def test_snapshot_expires_after_ttl(self, configs, fetch_calls):
+        config, _ = configs
+
+        SyncSession(config, ttl=0.05).fetch()
+        time.sleep(0.1)
+        SyncSession(config, ttl=0.05).fetch()
+
+        assert len(fetch_calls) == 2
+
+    def test_push_updates_snapshot(self, configs, remote):
+        config, _ = configs
+        (config.configs_dir / "pushed.txt").write_text("data")
+
+        session = SyncSession(config)
+        assert Syncer(config, session=session).sync(background=True)
+
+        remote_tip = remote.heads.main.commit.hexsha
+        assert session.snapshot.refs["main"] == remote_tip
+        assert SyncSession(config).fetch().refs["main"] == remote_tip
+
+    def test_sync_fetches_despite_fresh_snapshot(self, configs, remote, tmp_path):
+        config, _ = configs
+        assert Syncer(config).sync(background=True)
+        _push_from_elsewhere(remote, tmp_path)
+
+        (config.configs_dir / "zshrc").write_text("# local edit\n")
+        assert Syncer(config).sync(background=True)
+
+        tip = remote.heads.main.commit
+        assert tip.parents[0].message == "Edit elsewhere"
+        assert (config.configs_dir / "other.txt").exists()
+
+    def test_rejected_push_fails_the_sync(self, configs, remote):
+        config, _ = configs
+        hook = Path(remote.git_dir) / "hooks" / "pre-receive"
+        hook.write_text("#!/bin/sh\necho denied >&2\nexit 1\n")
+        hook.chmod(0o755)
+        (config.configs_dir / "zshrc").write_text("# local edit\n")
+
+        session = SyncSession(config)
+        assert not Syncer(config, session=session).sync(background=True)
+
+        assert config.sync_status_file.read_text() == "✗"
+        assert session.snapshot.refs["main"] == remote.heads.main.commit.hexsha
+
+
+class TestFastPath:
+    """Skipping a sync when neither side changed."""
+
+    def test_noop_sync_takes_fast_path(self, configs):
+        config, _ = configs
+        assert Syncer(config).sync(background=True)
+        last_sync = config.last_sync_file.read_text()
+
+        syncer = Syncer(config)
+        assert syncer.is_noop()
+        assert syncer.sync(background=True)
+        assert config.last_sync_file.read_text() == last_sync
+
+    def test_dirty_worktree_defeats_fast_path(self, configs):
+        config, _ = configs
+        assert Syncer(config).sync(background=True)
+
+        (config.configs_dir / "zshrc").write_text("# edited\n")
+        assert not Syncer(config).is_noop()
+
+    def test_marked_files_change_defeats_fast_path(self, configs):
+        config, repo = configs
+        assert Syncer(config).sync(background=True)
+
+        config.marked_files.write_text(".vimrc\n")
+        repo.index.add([str(config.marked_files)])
+        repo.index.commit("Mark .vimrc")
+        assert not Syncer(config).is_noop()
@@ -0,0 +1,116 @@
+"""Tests for zero-copy moves between $HOME and external/."""
+
+import errno
+import os
+import shutil
+
+import pytest
+
+from csync import transfer
+from csync.marked import MarkedFilesManager
+
+
+def unsupported(*args):
+    raise OSError(errno.EOPNOTSUPP, "not here")
+
+
+def assert_same_tree(expected, dst):
+    assert (dst / "skins" / "dark.yaml").read_bytes() == expected
+    assert (dst / "config.yaml").stat().st_mode & 0o777 == 0o600
+    assert os.readlink(dst / "current") == "config.yaml"
+
+
+class TestTransfer:
+    """Moving and copying trees with the fastest method available."""
+
+    @pytest.fixture
+    def tree(self, tmp_path):
+        src = tmp_path / "k9s"
+        (src / "skins").mkdir(parents=True)
+        (src / "skins" / "dark.yaml").write_bytes(os.urandom(200_000))
+        (src / "config.yaml").write_text("k9s: {}\n")
+        (src / "config.yaml").chmod(0o600)
+        os.symlink("config.yaml", src / "current")
+        return src
+
+    def test_same_filesystem_move_is_a_rename(self, tree, tmp_path):
+        inode = (tree / "skins" / "dark.yaml").stat().st_ino
+        dst = tmp_path / "external" / "k9s"
+
+        assert transfer.move(tree, dst) == "rename"
+
+        assert (dst / "skins" / "dark.yaml").stat().st_ino == inode
+        assert not tree.exists()
+
+    def test_cross_device_move_copies_in_kernel(self, tree, tmp_path, monkeypatch):
+        data = (tree / "skins" / "dark.yaml").read_bytes()
+        dst = tmp_path / "external" / "k9s"
+
+        def exdev(src, dst):
+            raise OSError(errno.EXDEV, "cross-device link")
+
+        def no_userspace_copy(fsrc, fdst, length=0):
+            raise AssertionError("bytes went through Python")
+
+        monkeypatch.setattr(os, "rename", exdev)
+        monkeypatch.setattr(shutil, "copyfileobj", no_userspace_copy)
+
+        assert transfer.move(tree, dst) == "copy"
+
+        assert_same_tree(data, dst)
+        assert not tree.exists()
+
+    def test_copy_falls_back_method_by_method(self, tree, tmp_path, monkeypatch):
+        src = tree / "skins" / "dark.yaml"
+        methods = list(transfer.METHODS)
+
+        for skip in range(len(methods) + 1):
+            patched = [(name, unsupported) for name, _ in methods[:skip]]
+            monkeypatch.setattr(transfer, "METHODS", patched + methods[skip:])
+            dst = tmp_path / f"copy{skip}"
+
+            used = transfer.copy_file(src, dst)
+
+            assert dst.read_bytes() == src.read_bytes()
+            expected = methods[skip][0] if skip < len(methods) else "read/write"
+            # A filesystem without reflinks moves on to copy_file_range by itself
+            assert used == expected or (skip == 0 and used != "read/write")
+
+    def test_real_errors_are_not_swallowed(self, tree, tmp_path, monkeypatch):
+        def disk_full(*args):
+            raise OSError(errno.ENOSPC, "No space left on device")
+
+        monkeypatch.setattr(transfer, "METHODS", [("reflink", disk_full)])
+
+        with pytest.raises(OSError):
+            transfer.copy_file(tree / "config.yaml", tmp_path / "copy")
+
+
+class TestUnmarkTransfer:
+    """Moving marked content back home on unmark."""
+
+    def test_unmark_moves_content_back(self, configs, home):
+        config, repo = configs
+        (home / ".vimrc").write_text("set number\n")
+        manager = MarkedFilesManager(config)
+        manager.mark_file(str(home / ".vimrc"))
+        inode = (config.external_dir / ".vimrc").stat().st_ino
+
+        manager.unmark_file(str(home / ".vimrc"))
+
+        assert (home / ".vimrc").stat().st_ino == inode
+        assert not (config.external_dir / ".vimrc").exists()
+        assert not repo.untracked_files
+
+    def test_unmark_without_link_keeps_content(self, configs, home):
+        config, _ = configs
+        (home / ".vimrc").write_text("set number\n")
+        manager = MarkedFilesManager(config)
+        manager.mark_file(str(home / ".vimrc"))
+        (config.external_dir / ".vimrc").write_text("set number\nset hlsearch\n")
+        (home / ".vimrc").unlink()
+
+        assert manager.unmark_file(str(home / ".vimrc"))
+
+        assert (home / ".vimrc").read_text() == "set number\nset hlsearch\n"
+        assert not (home / ".vimrc").is_symlink()
@@ -0,0 +1,89 @@
+"""Tests for the ignore-aware backup walker."""
+
+import os
+
+import pytest
+
+from csync.walker import BackupWalker
+
+
+class TestBackupWalker:
+    """Walking the tree a backup holds."""
+
+    @pytest.fixture
+    def tree(self, configs):
+        config, _ = configs
+        root = config.configs_dir
+        (root / ".gitignore").write_text(
+            ".sync/\n*.local\n__pycache__/\nbuild/\n*.log\n"
+        )
+        (root / "csync" / ".venv" / "lib").mkdir(parents=True)
+        (root / "csync" / ".venv" / "lib" / "big.so").write_bytes(b"\0" * 4096)
+        (root / "csync" / "pkg" / "__pycache__").mkdir(parents=True)
+        (root / "csync" / "pkg" / "__pycache__" / "mod.pyc").write_bytes(b"\0" * 100)
+        (root / "csync" / "pkg" / "mod.py").write_text("x = 1\n")
+        (root / "build" / "deep").mkdir(parents=True)
+        (root / "build" / "deep" / "out.bin").write_bytes(b"\0" * 2048)
+        (root / "notes.log").write_text("log\n")
+        (root / "plugins" / "vendored" / ".git").mkdir(parents=True)
+        (root / "plugins" / "vendored" / ".git" / "HEAD").write_text("ref\n")
+        (root / "plugins" / "vendored" / "plugin.zsh").write_text("# plugin\n")
+        return root
+
+    def test_walk_honours_gitignore_and_excludes(self, tree):
+        walker = BackupWalker(tree)
+
+        kept = {rel for rel, _ in walker.walk()}
+
+        assert kept == {
+            ".gitignore",
+            "zshrc",
+            "csync/pkg/mod.py",
+            "plugins/vendored/plugin.zsh",
+        }
+        excluded = {entry.path: entry.reason for entry in walker.excluded}
+        assert excluded["build"] == "gitignore"
+        assert excluded["notes.log"] == "gitignore"
+        assert excluded["csync/.venv"] == "csync: .venv"
+        assert excluded["plugins/vendored/.git"] == "csync: .git"
+
+    def test_excluded_directories_are_not_descended(self, tree, monkeypatch):
+        visited = []
+        original = os.walk
+
+        def recording_walk(top, *args, **kwargs):
+            for dirpath, dirnames, filenames in original(top, *args, **kwargs):
+                visited.append(dirpath)
+                yield dirpath, dirnames, filenames
+
+        monkeypatch.setattr("csync.walker.os.walk", recording_walk)
+        list(BackupWalker(tree).walk())
+
+        assert not any("build" in path or ".venv" in path for path in visited)
+
+    def test_tracked_files_are_kept_even_if_ignored(self, configs):
+        config, repo = configs
+        root = config.configs_dir
+        (root / "keep.log").write_text("tracked\n")
+        repo.index.add(["keep.log"])
+        repo.index.commit("Track a log")
+        (root / ".gitignore").write_text("*.log\n")
+
+        kept = {rel for rel, _ in BackupWalker(root).walk()}
+
+        assert "keep.log" in kept
+
+    def test_extra_excludes_from_environment(self, tree, monkeypatch):
+        monkeypatch.setenv("CSYNC_BACKUP_EXCLUDE", "plugins/*, zshrc")
+
+        kept = {rel for rel, _ in BackupWalker(tree).walk()}
+
+        assert kept == {".gitignore", "csync/pkg/mod.py"}
+
+    def test_report_counts_saved_bytes(self, tree):
+        walker = BackupWalker(tree)
+        list(walker.walk())
+
+        saved = walker.report()
+
+        assert saved >= 4096 + 2048 + 100